@@ -0,0 +1,147 @@
+# activity.py
+# Agregasi log aktivitas (merged_logs_data_cleaned.csv) jadi histogram
+# hari x jam (7x24) per user. File log dibaca per chunk sehingga memori
+# tetap kecil berapapun ukuran CSV-nya, dan hasilnya disimpan di
+# data/snapshot/activity agar boot berikutnya tinggal load .npy kecil.
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from snapshot import (DATA_DIR, SNAPSHOT_VERSION, commit_table_dir, is_fresh,
+                      load_segments, new_table_dir, read_meta, source_meta,
+                      table_dir)
+
+LOGS_FILE = "merged_logs_data_cleaned.csv"
+TABLE_NAME = "activity"
+CHUNK_ROWS = 500_000
+SLOTS = 7 * 24
+
+class ActivityTable:
+    """Histogram aktivitas per user: hist[i] berbentuk (7 hari, 24 jam)."""
+    def __init__(self, userids, hist):
+        if len(userids) > 1 and (np.diff(userids) < 0).any():
+            order = np.argsort(userids, kind="stable")
+            userids, hist = userids[order], hist[order]
+        # userids urut -> lookup pakai searchsorted, tanpa dict per user (array bisa di-mmap)
+        self.userids = userids
+        self.hist = hist
+        # Jam paling sering aktif per user, dihitung sekali saat load.
+        # argmax ambil jam terkecil jika seri (sama seperti Series.mode()[0])
+        if len(userids):
+            per_hour = hist.sum(axis=1)
+            self._modal = np.where(per_hour.sum(axis=1) > 0, per_hour.argmax(axis=1), -1).astype(np.int8)  # jam 0-23 / -1
+        else:
+            self._modal = np.empty(0, dtype=np.int8)
+
+    def _row(self, userid):
+        try:
+            i = int(np.searchsorted(self.userids, userid))
+        except (TypeError, ValueError, OverflowError):
+            return None
+        return i if i < len(self.userids) and self.userids[i] == userid else None
+
+    def histogram(self, userid):
+        i = self._row(userid)
+        return None if i is None else self.hist[i]
+
+    def modal_hour(self, userid):
+        i = self._row(userid)
+        if i is None or self._modal[i] < 0: return None
+        return int(self._modal[i])
+
+    def __len__(self):
+        return len(self.userids)
+
+def empty_activity():
+    return ActivityTable(np.empty(0, dtype=np.int64), np.zeros((0, 7, 24), dtype=np.int32))
+
+def aggregate_logs(logs_path, chunk_rows=CHUNK_ROWS):
+    """Streaming pass: baca CSV per chunk, akumulasi hitungan per (user, hari, jam)."""
+    row_of = {}
+    counts = np.zeros((1024, SLOTS), dtype=np.int32)
+
+    reader = pd.read_csv(logs_path, usecols=['actor_userid', 'Time_parsed'], chunksize=chunk_rows)
+    for chunk in reader:
+        ts = pd.to_datetime(chunk['Time_parsed'], errors='coerce')
+        valid = ts.notna().to_numpy() & chunk['actor_userid'].notna().to_numpy()
+        if not valid.any(): continue
+        uids = chunk['actor_userid'].to_numpy()[valid].astype(np.int64)
+        slot = (ts.dt.dayofweek.to_numpy()[valid] * 24 + ts.dt.hour.to_numpy()[valid]).astype(np.int64)
+
+        # Hitung histogram lokal chunk, lalu tambahkan ke baris global user
+        uniq, inv = np.unique(uids, return_inverse=True)
+        local = np.bincount(inv * SLOTS + slot, minlength=len(uniq) * SLOTS).reshape(len(uniq), SLOTS)
+
+        rows = np.empty(len(uniq), dtype=np.int64)
+        for j, uid in enumerate(uniq.tolist()):
+            r = row_of.get(uid)
+            if r is None:
+                r = row_of[uid] = len(row_of)
+            rows[j] = r
+        if len(row_of) > len(counts):
+            grown = np.zeros((max(len(row_of), len(counts) * 2), SLOTS), dtype=np.int32)
+            grown[:len(counts)] = counts
+            counts = grown
+        counts[rows] += local.astype(np.int32)
+
+    userids = np.fromiter(row_of.keys(), dtype=np.int64, count=len(row_of))
+    hist = counts[:len(row_of)]
+    order = np.argsort(userids)
+    return userids[order], hist[order].reshape(-1, 7, 24)
+
+def key_file_name(i):
+    return "keys.npy" if i == 0 else f"keys-{i}.npy"
+
+def write_activity(userids, hist, src, data_dir=DATA_DIR, source=None, origin=None, keys=None):
+    # source/origin/keys diisi ingest.py (sumber xlsx, bukan CSV log)
+    tmp_dir = new_table_dir(TABLE_NAME, data_dir)
+    np.save(os.path.join(tmp_dir, "userid.npy"), userids)
+    np.save(os.path.join(tmp_dir, "hist.npy"), hist)
+    meta = {"version": SNAPSHOT_VERSION, "rows": len(userids), "source": source or source_meta(src)}
+    if origin: meta["origin"] = origin
+    if keys is not None:
+        # Key event yang sudah masuk histogram, untuk dedupe saat append
+        # (list array terurut dari ingest.py: 1 file per workbook, tidak digabung di memori)
+        meta["keys"] = []
+        for i, part_keys in enumerate(keys if isinstance(keys, list) else [keys]):
+            np.save(os.path.join(tmp_dir, key_file_name(i)), part_keys)
+            meta["keys"].append(key_file_name(i))
+    commit_table_dir(TABLE_NAME, tmp_dir, meta, data_dir)
+
+def build_activity(data_dir=DATA_DIR):
+    src = os.path.join(data_dir, LOGS_FILE)
+    userids, hist = aggregate_logs(src)
+    write_activity(userids, hist, src, data_dir)
+    return ActivityTable(userids, hist)
+
+def merge_histograms(userids, hist):
+    # Gabung baris user yang sama (hasil segmen append), hasil urut userid
+    uniq, inv = np.unique(userids, return_inverse=True)
+    merged = np.zeros((len(uniq),) + hist.shape[1:], dtype=np.int32)
+    np.add.at(merged, inv, hist)
+    return uniq, merged
+
+def read_activity(data_dir=DATA_DIR):
+    tdir = table_dir(TABLE_NAME, data_dir)
+    segments = (read_meta(TABLE_NAME, data_dir) or {}).get("segments", [])
+    userids = load_segments(tdir, "userid.npy", segments)
+    hist = load_segments(tdir, "hist.npy", segments)
+    if segments:
+        # Segmen append berisi delta histogram user yang aktif di export baru
+        userids, hist = merge_histograms(userids, hist)
+    return ActivityTable(userids, hist)
+
+def load_activity(data_dir=DATA_DIR):
+    src = os.path.join(data_dir, LOGS_FILE)
+    if is_fresh(TABLE_NAME, data_dir, src=src):
+        return read_activity(data_dir)
+    t0 = time.time()
+    userids, hist = aggregate_logs(src)
+    print(f"✅ Histogram aktivitas dibangun: {len(userids)} user ({time.time() - t0:.1f}s)")
+    try:
+        write_activity(userids, hist, src, data_dir)
+    except OSError as e:
+        print(f"⚠️ Snapshot {TABLE_NAME} tidak bisa ditulis: {e}")
+    return ActivityTable(userids, hist)
@@ -0,0 +1,224 @@
+# bench_app.py
+# Benchmark end-to-end backend di atas data sintetis (gen_data.py) dengan Gemini stub:
+# waktu startup (cold = parse CSV + build snapshot, warm = dari snapshot),
+# peak RSS, dan latency p50/p99 semua route di main.py. Hasil ditulis ke JSON
+# supaya bisa dibandingkan antar commit.
+#
+#   python bench_app.py --users 1000 10000 [--requests 200] [--out bench_results.json]
+#
+# Data & database per skala disimpan di --work-dir dan dipakai ulang antar run.
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def peak_rss_mb():
+    import resource
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)  # Linux: KiB
+
+def summarize(latencies, errors):
+    lat = sorted(latencies)
+    if not lat: return {"n": 0, "errors": errors}
+    return {
+        "n": len(lat),
+        "errors": errors,
+        "mean_ms": round(statistics.fmean(lat) * 1000, 3),
+        "p50_ms": round(lat[len(lat) // 2] * 1000, 3),
+        "p99_ms": round(lat[min(len(lat) - 1, int(len(lat) * 0.99))] * 1000, 3),
+        "max_ms": round(lat[-1] * 1000, 3),
+    }
+
+ADMIN_AUTH = {"Authorization": "Bearer admin"}  # token = username (lihat /token)
+
+# --- SKENARIO PER ROUTE ---
+# "METHOD path" (sesuai app.routes) -> fungsi (client, rng, ctx, i) -> response
+# Route baru di main.py wajib ditambah di sini, route yang terlewat dilaporkan sebagai "uncovered"
+def route_cases(ctx):
+    def pick_user(rng): return rng.choice(ctx["userids"])
+    def pick_class(rng): return rng.choice(ctx["class_ids"])
+
+    def quiz_detail(c, rng, i):
+        uid, cid = rng.choice(ctx["user_classes"])
+        return c.get("/api/student/quiz_detail", params={"user_id": uid, "class_id": cid})
+
+    def chat_stream(c, rng, i):
+        with c.stream("POST", "/api/chat/stream", json={"user_id": pick_user(rng), "message": f"Pertanyaan {i}", "learning_style": "Visual"}) as r:
+            for _ in r.iter_bytes(): pass
+            return r
+
+    return {
+        "GET /api/student/{user_id}": (False, lambda c, rng, i: c.get(f"/api/student/{pick_user(rng)}")),
+        "GET /api/student/quiz_detail": (False, quiz_detail),
+        "POST /api/recommendation": (False, lambda c, rng, i: c.post("/api/recommendation", json={"user_id": pick_user(rng), "learning_style": rng.choice(["Visual", "Auditory", "Kinesthetic"]), "interest": "AI"})),
+        "POST /api/chat": (False, lambda c, rng, i: c.post("/api/chat", json={"user_id": pick_user(rng), "message": f"Pertanyaan {i}", "learning_style": "Visual"})),
+        "POST /api/chat/stream": (False, chat_stream),
+        "PUT /api/student/profile": (False, lambda c, rng, i: c.put("/api/student/profile", json={"user_id": str(pick_user(rng)), "full_name": f"Mahasiswa {i}", "learning_style": "Auditory", "interest": "AI"})),
+        "GET /api/admin/cache_stats": (False, lambda c, rng, i: c.get("/api/admin/cache_stats", headers=ADMIN_AUTH)),
+        "GET /metrics": (False, lambda c, rng, i: c.get("/metrics")),
+        "GET /api/admin/profiles": (False, lambda c, rng, i: c.get("/api/admin/profiles", headers=ADMIN_AUTH)),
+        "GET /api/admin/profiles/{profile_id}": (False, lambda c, rng, i: c.get(f"/api/admin/profiles/{ctx['profile_id']}", headers=ADMIN_AUTH)),
+        "GET /api/admin/summary": (False, lambda c, rng, i: c.get("/api/admin/summary")),
+        "GET /api/admin/classes": (False, lambda c, rng, i: c.get("/api/admin/classes")),
+        "GET /api/admin/students_by_class": (False, lambda c, rng, i: c.get("/api/admin/students_by_class", params={"class_id": pick_class(rng)})),
+        "POST /api/admin/student_dashboards": (False, lambda c, rng, i: c.post("/api/admin/student_dashboards", json={"class_id": pick_class(rng)}, headers=ADMIN_AUTH)),
+        "GET /api/admin/classes/page": (False, lambda c, rng, i: c.get("/api/admin/classes/page", params={"limit": 50})),
+        "GET /api/admin/students_by_class/page": (False, lambda c, rng, i: c.get("/api/admin/students_by_class/page", params={"class_id": pick_class(rng), "limit": 20})),
+        # Export seluruh cohort (streaming), request lebih sedikit
+        "GET /api/admin/export/students": (True, lambda c, rng, i: c.get("/api/admin/export/students", params={"format": rng.choice(["ndjson", "csv"])}, headers=ADMIN_AUTH)),
+        # Route bcrypt (~ratusan ms per request) pakai jumlah request lebih sedikit
+        "POST /token": (True, lambda c, rng, i: c.post("/token", data={"username": str(pick_user(rng)), "password": "mhs123"})),
+        "PUT /api/auth/change-password": (True, lambda c, rng, i: c.put("/api/auth/change-password", json={"user_id": str(ctx["userids"][0]), "old_password": "mhs123", "new_password": "mhs123"})),
+        "PUT /api/admin/reset-password/{target_user_id}": (True, lambda c, rng, i: c.put(f"/api/admin/reset-password/{pick_user(rng)}")),
+        # Trigger reload (202, atau 409 jika reload sebelumnya belum selesai) -> paling akhir
+        # supaya reload di background tidak mengganggu pengukuran route lain
+        "GET /api/admin/reload": (False, lambda c, rng, i: c.get("/api/admin/reload", headers=ADMIN_AUTH)),
+        "POST /api/admin/reload": (True, lambda c, rng, i: c.post("/api/admin/reload", headers=ADMIN_AUTH)),
+    }
+
+def child(args):
+    # Dijalankan di proses terpisah supaya startup & RSS terukur bersih
+    t0 = time.perf_counter()
+    import main
+    result = {"startup_s": round(time.perf_counter() - t0, 3), "peak_rss_mb_startup": peak_rss_mb()}
+    if args.startup_only:
+        return result
+
+    from fastapi.routing import APIRoute
+    from fastapi.testclient import TestClient
+
+    rng = random.Random(args.seed)
+    data = main.store.current
+    pairs = data.score_df[['userid', 'courseshortname']].drop_duplicates()
+    ctx = {
+        "userids": [int(u) for u in data.user_df['userid'].tolist()],
+        "class_ids": data.admin_aggs.students.key_list(),
+        "user_classes": [(int(u), c) for u, c in pairs.sample(min(len(pairs), 10_000), random_state=args.seed).itertuples(index=False)],
+    }
+    cases = route_cases(ctx)
+    app_routes = [f"{m} {r.path}" for r in main.app.routes if isinstance(r, APIRoute) for m in sorted(r.methods)]
+
+    routes = {}
+    with TestClient(main.app) as client:
+        # 1 request diprofile dulu supaya ada file untuk skenario download profile
+        r = client.get(f"/api/student/{ctx['userids'][0]}", headers=dict(ADMIN_AUTH, **{"X-Profile": "1"}))
+        ctx["profile_id"] = r.headers.get("x-profile-id", "tidak-ada")
+        for name, (slow, fn) in cases.items():
+            n = args.auth_requests if slow else args.requests
+            latencies, errors = [], 0
+            for i in range(args.warmup + n):
+                t = time.perf_counter()
+                r = fn(client, rng, i)
+                dt = time.perf_counter() - t
+                if i < args.warmup: continue
+                latencies.append(dt)
+                if r.status_code >= 400: errors += 1
+            routes[name] = summarize(latencies, errors)
+
+    result.update({
+        "peak_rss_mb": peak_rss_mb(),
+        "routes": routes,
+        "uncovered_routes": [r for r in app_routes if r not in cases],
+    })
+    return result
+
+def run_child(data_dir, args, startup_only):
+    env = dict(os.environ, EDUPULSE_DATA_DIR=data_dir, GEMINI_STUB="1",
+               DATABASE_URL=f"sqlite:///{os.path.join(data_dir, 'bench.db')}")
+    out = os.path.join(data_dir, "child_result.json")
+    cmd = [sys.executable, os.path.abspath(__file__), "--child", out, "--requests", str(args.requests),
+           "--auth-requests", str(args.auth_requests), "--warmup", str(args.warmup), "--seed", str(args.seed)]
+    if startup_only: cmd.append("--startup-only")
+    subprocess.run(cmd, cwd=BASE_DIR, env=env, check=True, stdout=subprocess.DEVNULL if not args.verbose else None)
+    with open(out) as f:
+        return json.load(f)
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+def main_bench(args):
+    from gen_data import generate
+
+    report = {
+        "meta": {"commit": git_commit(), "python": platform.python_version(), "platform": platform.platform(),
+                 "cpus": os.cpu_count(), "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "requests": args.requests,
+                 "auth_requests": args.auth_requests, "seed": args.seed},
+        "runs": [],
+    }
+    for n_users in args.users:
+        data_dir = os.path.join(args.work_dir, f"users_{n_users}_logs_{args.logs_per_user}_seed_{args.seed}")
+        stats_path = os.path.join(data_dir, "gen_stats.json")  # ditulis terakhir = data lengkap
+        if not os.path.exists(stats_path):
+            data_stats = generate(data_dir, n_users, args.logs_per_user, seed=args.seed)
+            with open(stats_path, "w") as f: json.dump(data_stats, f)
+        with open(stats_path) as f:
+            data_stats = json.load(f)
+
+        # Cold start: hapus snapshot & DB supaya CSV di-parse dan user di-seed ulang
+        shutil.rmtree(os.path.join(data_dir, "snapshot"), ignore_errors=True)
+        for suffix in ("", "-wal", "-shm"):
+            path = os.path.join(data_dir, "bench.db" + suffix)
+            if os.path.exists(path): os.remove(path)
+
+        print(f"▶️ {n_users:,} user: cold start...")
+        cold = run_child(data_dir, args, startup_only=True)
+        print(f"▶️ {n_users:,} user: warm start + {len(route_cases({}))} route...")
+        warm = run_child(data_dir, args, startup_only=False)
+        run = {
+            "data": data_stats,
+            "startup_cold_s": cold["startup_s"],
+            "peak_rss_mb_cold_startup": cold["peak_rss_mb_startup"],
+            "startup_warm_s": warm["startup_s"],
+            "peak_rss_mb_warm_startup": warm["peak_rss_mb_startup"],
+            "peak_rss_mb": warm["peak_rss_mb"],
+            "routes": warm["routes"],
+            "uncovered_routes": warm["uncovered_routes"],
+        }
+        report["runs"].append(run)
+        print_run(run)
+
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📄 Hasil: {args.out}")
+
+def print_run(run):
+    d = run["data"]
+    print(f"\n[{d['users']:,} user | {d['score_rows']:,} nilai | {d['log_rows']:,} log]")
+    print(f"   startup cold {run['startup_cold_s']:.2f}s ({run['peak_rss_mb_cold_startup']} MB) | warm {run['startup_warm_s']:.2f}s ({run['peak_rss_mb_warm_startup']} MB) | peak RSS {run['peak_rss_mb']} MB")
+    for name, s in run["routes"].items():
+        if not s["n"]: continue
+        print(f"   {name:48s} p50 {s['p50_ms']:8.2f} ms | p99 {s['p99_ms']:8.2f} ms | error {s['errors']}")
+    if run["uncovered_routes"]:
+        print(f"   ⚠️ Route tanpa skenario: {', '.join(run['uncovered_routes'])}")
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--users", type=int, nargs="+", default=[1000, 10000])
+    ap.add_argument("--logs-per-user", type=int, default=100)
+    ap.add_argument("--requests", type=int, default=200, help="request per route")
+    ap.add_argument("--auth-requests", type=int, default=10, help="request per route bcrypt (token, password)")
+    ap.add_argument("--warmup", type=int, default=5)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--work-dir", default=os.path.join(tempfile.gettempdir(), "edupulse-bench"))
+    ap.add_argument("--out", default="bench_results.json")
+    ap.add_argument("--verbose", action="store_true", help="tampilkan output proses backend")
+    ap.add_argument("--child", metavar="RESULT_PATH", help=argparse.SUPPRESS)
+    ap.add_argument("--startup-only", action="store_true", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        result = child(args)
+        with open(args.child, "w") as f: json.dump(result, f)
+    else:
+        main_bench(args)
@@ -0,0 +1,85 @@
+# bench_db.py
+# Benchmark throughput baca/tulis profil (UserDB) secara concurrent:
+# setup lama (engine default, journal DELETE, synchronous FULL) vs setup
+# baru di database.py (WAL, synchronous NORMAL, connection pool).
+#   python bench_db.py [--threads 8] [--seconds 5] [--write-ratio 0.2]
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database import Base, UserDB, create_tuned_engine
+
+N_USERS = 500
+
+def legacy_engine(url):
+    # Sama persis dengan database.py sebelum tuning
+    return create_engine(url, connect_args={"check_same_thread": False})
+
+def run(name, engine, threads, seconds, write_ratio):
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = Session()
+    db.bulk_insert_mappings(UserDB, [{"username": str(i), "hashed_password": "x", "role": "student", "full_name": f"Mahasiswa {i}"} for i in range(N_USERS)])
+    db.commit()
+    db.close()
+
+    latencies = {"read": [], "write": []}
+    errors = [0]
+    stop_at = time.perf_counter() + seconds
+    lock = threading.Lock()
+
+    def worker(seed):
+        rng = random.Random(seed)
+        local = {"read": [], "write": []}
+        while time.perf_counter() < stop_at:
+            uid = str(rng.randrange(N_USERS))
+            kind = "write" if rng.random() < write_ratio else "read"
+            t0 = time.perf_counter()
+            db = Session()  # 1 session per "request", seperti get_db()
+            try:
+                user = db.get(UserDB, uid)
+                if kind == "write":
+                    user.learning_style = rng.choice(["Visual", "Auditory", "Kinesthetic"])
+                    user.interest = f"Topik {rng.randrange(100)}"
+                    db.commit()
+                else:
+                    _ = (user.full_name, user.learning_style, user.interest)
+            except Exception:
+                errors[0] += 1
+                db.rollback()
+            finally:
+                db.close()
+            local[kind].append(time.perf_counter() - t0)
+        with lock:
+            for k in local: latencies[k].extend(local[k])
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for t in pool: t.start()
+    for t in pool: t.join()
+    engine.dispose()
+
+    total = len(latencies["read"]) + len(latencies["write"])
+    print(f"\n[{name}] {total / seconds:,.0f} ops/s ({threads} thread, {seconds}s, error: {errors[0]})")
+    for kind, lat in latencies.items():
+        if not lat: continue
+        lat.sort()
+        p99 = lat[min(len(lat) - 1, int(len(lat) * 0.99))]
+        print(f"   {kind:5s}: {len(lat) / seconds:8,.0f} ops/s | p50 {statistics.median(lat) * 1000:6.2f} ms | p99 {p99 * 1000:6.2f} ms")
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--threads", type=int, default=8)
+    ap.add_argument("--seconds", type=float, default=5)
+    ap.add_argument("--write-ratio", type=float, default=0.2)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        run("LAMA: default", legacy_engine(f"sqlite:///{os.path.join(tmp, 'legacy.db')}"), args.threads, args.seconds, args.write_ratio)
+        run("BARU: WAL + pool", create_tuned_engine(f"sqlite:///{os.path.join(tmp, 'tuned.db')}"), args.threads, args.seconds, args.write_ratio)
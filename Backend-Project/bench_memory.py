@@ -0,0 +1,91 @@
+# bench_memory.py
+# Laporan memori per DataFrame: reader CSV lama (clean_decimal per baris, ID
+# int64, nilai float64, nama kelas/kuis sebagai teks) vs reader sekarang di
+# snapshot.py (parse_decimal vektor + compact_dtypes: ID int32, nilai float32,
+# Categorical). Juga waktu parse & groupby agregat admin di kedua versi.
+#
+#   python bench_memory.py [--data-dir DIR] [--out laporan.json]
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from activity import load_activity
+from snapshot import DATA_DIR, TABLES, clean_decimal
+
+# --- READER LAMA (Sama persis dengan snapshot.py sebelum dtype ringkas) ---
+def legacy_read_users(path):
+    return pd.read_csv(path)
+
+def legacy_read_scores(path):
+    df = pd.read_csv(path, dtype={'final_quiz_grade': str})
+    df['final_quiz_grade'] = df['final_quiz_grade'].apply(clean_decimal)
+    df['courseshortname'] = df['courseshortname'].astype(str).str.strip()
+    return df
+
+LEGACY = {"users": legacy_read_users, "scores": legacy_read_scores}
+
+def timed(fn):
+    t0 = time.perf_counter()
+    out = fn()
+    return time.perf_counter() - t0, out
+
+def mb(n_bytes):
+    return round(n_bytes / 1024 ** 2, 2)
+
+def frame_report(old, new):
+    old_cols, new_cols = old.memory_usage(deep=True, index=False), new.memory_usage(deep=True, index=False)
+    return {
+        "rows": len(new),
+        "before_mb": mb(old_cols.sum()),
+        "after_mb": mb(new_cols.sum()),
+        "columns": {col: {"before": f"{old[col].dtype} {mb(old_cols[col])} MB", "after": f"{new[col].dtype} {mb(new_cols[col])} MB"} for col in new.columns},
+    }
+
+def admin_groupby(score_df):
+    # Sama dengan AdminAggregates._class_students (bagian groupby)
+    return score_df.groupby(['courseshortname', 'userid'], observed=True).agg(avg_grade=('final_quiz_grade', 'mean'), activity_count=('quizid', 'count'))
+
+def run(data_dir):
+    report = {"data_dir": os.path.abspath(data_dir), "frames": {}}
+    frames = {}
+    for name, (src_file, reader) in TABLES.items():
+        path = os.path.join(data_dir, src_file)
+        t_old, old = timed(lambda: LEGACY[name](path))
+        t_new, new = timed(lambda: reader(path))
+        frames[name] = (old, new)
+        report["frames"][name] = frame_report(old, new) | {"parse_before_s": round(t_old, 3), "parse_after_s": round(t_new, 3)}
+
+    old, new = frames["scores"]
+    t_old, _ = timed(lambda: admin_groupby(old))
+    t_new, _ = timed(lambda: admin_groupby(new))
+    report["groupby_class_user"] = {"before_s": round(t_old, 3), "after_s": round(t_new, 3)}
+
+    # Jam paling aktif per user (ActivityTable._modal): int64 -> int8
+    activity = load_activity(data_dir)
+    report["activity_modal_hour"] = {"users": len(activity), "before_mb": mb(len(activity) * np.dtype(np.int64).itemsize), "after_mb": mb(activity._modal.nbytes)}
+    return report
+
+def print_report(report):
+    for name, r in report["frames"].items():
+        print(f"\n[{name}] {r['rows']:,} baris: {r['before_mb']} MB -> {r['after_mb']} MB | parse {r['parse_before_s']}s -> {r['parse_after_s']}s")
+        for col, c in r["columns"].items():
+            if c["before"] != c["after"]: print(f"   {col:24s} {c['before']:>24s} -> {c['after']}")
+    g, a = report["groupby_class_user"], report["activity_modal_hour"]
+    print(f"\ngroupby kelas x user      {g['before_s']}s -> {g['after_s']}s")
+    print(f"jam aktif per user        {a['before_mb']} MB -> {a['after_mb']} MB ({a['users']:,} user)")
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--data-dir", default=DATA_DIR)
+    ap.add_argument("--out", help="simpan laporan JSON")
+    args = ap.parse_args()
+
+    report = run(args.data_dir)
+    print_report(report)
+    if args.out:
+        with open(args.out, "w") as f: json.dump(report, f, indent=2)
+        print(f"\n📄 Hasil: {args.out}")
@@ -0,0 +1,152 @@
+# bench_serialize.py
+# Benchmark biaya membangun + serialisasi response per endpoint:
+# cara lama (iterrows + fix_grade_value per baris + encoder JSON bawaan FastAPI)
+# vs cara baru di main.py (operasi kolom + FastJSONResponse/orjson).
+# Data di folder data/ diperbanyak N kali (userid digeser) untuk simulasi cohort besar.
+#   python bench_serialize.py [--scales 1 10 100] [--users 200]
+import argparse
+import os
+import re
+import time
+
+os.environ.setdefault("EDUPULSE_SEED_ON_STARTUP", "0")
+
+import numpy as np
+import pandas as pd
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+import main
+from data_index import RowIndex
+from json_response import FastJSONResponse
+
+# --- IMPLEMENTASI LAMA (Sama persis dengan main.py sebelum vektorisasi) ---
+def legacy_dashboard_courses(grades_raw):
+    course_performance = []
+    total_score, count = 0, 0
+    grouped = grades_raw.groupby(["courseshortname", "coursefullname"])['final_quiz_grade'].mean().reset_index()
+    for _, row in grouped.iterrows():
+        val = main.fix_grade_value(row['final_quiz_grade'])
+        if val > 0:
+            total_score += val
+            count += 1
+        course_performance.append({"class_id": row["courseshortname"], "subject": main.clean_course_name(row["coursefullname"]), "score": val})
+    return course_performance, (round(total_score / count, 1) if count > 0 else 0)
+
+def legacy_class_stats(class_data):
+    student_avgs = class_data.groupby(['courseshortname', 'coursefullname', 'userid'])['final_quiz_grade'].mean().reset_index()
+    class_stats = student_avgs.groupby(['courseshortname', 'coursefullname']).agg(student_count=('userid', 'count'), class_avg_score=('final_quiz_grade', 'mean')).reset_index()
+    classes_list = []
+    for _, row in class_stats.iterrows():
+        avg_score = main.fix_grade_value(row['class_avg_score']) if pd.notna(row['class_avg_score']) else 0
+        classes_list.append({"class_id": row['courseshortname'], "class_name": main.clean_course_name(row['coursefullname']), "student_count": int(row['student_count']), "avg_score": avg_score})
+    return classes_list
+
+def legacy_class_students(class_data, user_info, cluster_labels):
+    user_stats = class_data.groupby('userid').agg(avg_grade=('final_quiz_grade', 'mean'), activity_count=('quizid', 'count')).reset_index()
+    merged = pd.merge(user_info, user_stats, on='userid', how='inner')
+    result = []
+    for _, row in merged.iterrows():
+        score_val = main.fix_grade_value(row['avg_grade']) if pd.notna(row['avg_grade']) else 0
+        result.append({"id": int(row['userid']), "cluster": cluster_labels.get(row['cluster'], "Unknown"), "status": "Berisiko" if score_val < 50 else "Aman", "score": score_val, "activities": int(row['activity_count'])})
+    return sorted(result, key=lambda x: x['score'], reverse=True)
+
+def legacy_grouping_key(raw_name):
+    name = str(raw_name)
+    if "Midterm" in name or "UTS" in name: return "UTS"
+    if "Final" in name or "UAS" in name: return "UAS"
+    if "Online Quiz" in name: return name.split("(")[0].strip()
+    return name
+
+def legacy_sort_key(name):
+    name = name.lower()
+    if name == "uts": return 1000
+    if name == "uas": return 2000
+    m = re.search(r'\d+', name)
+    return int(m.group()) if m else 500
+
+def legacy_display_label(name):
+    if name in ["UTS", "UAS"]: return name
+    if "Online Quiz" in name:
+        parts = name.replace("Online Quiz", "Q").split(":")
+        if len(parts) > 1: return f"{parts[0].strip()}: {parts[1].strip()[:15]}"
+        return parts[0].strip()
+    return name[:15]
+
+def legacy_quiz_detail(rows):
+    details = rows.copy()
+    details['group_key'] = details['quizname'].apply(legacy_grouping_key)
+    grouped = details.groupby('group_key')['final_quiz_grade'].max().reset_index()
+    grouped['sort_val'] = grouped['group_key'].apply(legacy_sort_key)
+    grouped = grouped.sort_values('sort_val')
+    return [{"quiz_name": legacy_display_label(row['group_key']), "full_name": row['group_key'], "score": main.fix_grade_value(row['final_quiz_grade'])} for _, row in grouped.iterrows()]
+
+def old_encode(content):
+    return JSONResponse(jsonable_encoder(content)).body
+
+def new_encode(content):
+    return FastJSONResponse(content).body
+
+# --- DATA ---
+def scale_frames(user_df, score_df, n):
+    # Salin cohort n kali, userid digeser supaya unik
+    offset = int(user_df['userid'].max()) + 1
+    users = pd.concat([user_df.assign(userid=user_df['userid'] + i * offset) for i in range(n)], ignore_index=True)
+    scores = pd.concat([score_df.assign(userid=score_df['userid'] + i * offset) for i in range(n)], ignore_index=True)
+    return users, scores
+
+def timed(fn, repeat=1):
+    t0 = time.perf_counter()
+    for _ in range(repeat): out = fn()
+    return (time.perf_counter() - t0) / repeat, out
+
+def report(name, old, new):
+    print(f"   {name:32s} lama {old * 1000:10.2f} ms | baru {new * 1000:10.2f} ms | {old / new if new else float('inf'):6.1f}x")
+
+def run(data, scale, n_users):
+    user_df, score_df = scale_frames(data.user_df, data.score_df, scale)
+    user_idx, score_user_idx, class_idx = RowIndex(user_df, "userid"), RowIndex(score_df, "userid"), RowIndex(score_df, "courseshortname")
+    rng = np.random.default_rng(0)
+    sample = rng.choice(user_df['userid'].to_numpy(), size=min(n_users, len(user_df)), replace=False)
+    print(f"\n[x{scale}] {len(user_df):,} user, {len(score_df):,} baris nilai, {len(class_idx)} kelas")
+
+    # /api/student/{id}: per request (rata-rata dari sampel user)
+    def old_dash():
+        for uid in sample: old_encode(legacy_dashboard_courses(score_user_idx.rows(uid))[0])
+    def new_dash():
+        for uid in sample:
+            grouped = score_user_idx.rows(uid).groupby(["courseshortname", "coursefullname"])['final_quiz_grade'].mean()
+            scores = main.fix_grade_column(grouped)
+            new_encode([{"class_id": cid, "subject": main.clean_course_name(c_full), "score": val} for (cid, c_full), val in zip(grouped.index, scores.tolist())])
+    report("dashboard (per request)", timed(old_dash)[0] / len(sample), timed(new_dash)[0] / len(sample))
+
+    # /api/student/quiz_detail: lama = hitung per request, baru = tabel prekomputasi + lookup
+    pairs = score_df.loc[score_df['userid'].isin(sample[:50]), ['userid', 'courseshortname']].drop_duplicates()
+    pairs = list(pairs.itertuples(index=False, name=None))
+    t_old, _ = timed(lambda: [old_encode(legacy_quiz_detail(score_df[(score_df['userid'] == u) & (score_df['courseshortname'] == c)][['userid', 'courseshortname', 'quizname', 'final_quiz_grade']])) for u, c in pairs])
+    t_build, table = timed(lambda: main.build_quiz_detail_table(score_df))
+    t_new, _ = timed(lambda: [new_encode(table.records(int(u), main.QUIZ_DETAIL_FIELDS, where=("class_id", c))) for u, c in pairs])
+    report("quiz_detail (per request)", t_old / max(len(pairs), 1), t_new / max(len(pairs), 1))
+    print(f"   {'  + build tabel sekali':32s} {t_build * 1000:10.2f} ms")
+
+    # /api/admin/classes & students_by_class: bangun agregat semua kelas + serialisasi
+    user_info = user_df[['userid', 'cluster', 'performance_category']]
+    class_ids = class_idx.key_list()
+    t_old, old_students = timed(lambda: {cid: legacy_class_students(class_idx.rows(cid), user_info, data.cluster_labels) for cid in class_ids})
+    t_old_cls, old_classes = timed(lambda: [c for cid in sorted(class_ids) for c in legacy_class_stats(class_idx.rows(cid))])
+    t_new_all, aggs = timed(lambda: main.AdminAggregates(user_df, score_df, data.cluster_labels))
+    report("admin agregat (build semua)", t_old + t_old_cls, t_new_all)
+    report("classes (serialisasi)", timed(lambda: old_encode(old_classes), 5)[0], timed(lambda: new_encode(aggs.class_list), 5)[0])
+    biggest = max(class_ids, key=lambda cid: len(aggs.students.column(cid, "id")))
+    report(f"students_by_class ({len(old_students[biggest]):,} mhs)", timed(lambda: old_encode(old_students[biggest]), 5)[0], timed(lambda: new_encode(aggs.students.records(biggest, main.STUDENT_FIELDS)), 5)[0])
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    ap.add_argument("--users", type=int, default=200, help="jumlah user sampel untuk endpoint per request")
+    args = ap.parse_args()
+    data = main.store.current
+    if data.user_df.empty or data.score_df.empty:
+        raise SystemExit("Data di folder data/ kosong, benchmark butuh CSV user & nilai.")
+    for scale in args.scales:
+        run(data, scale, args.users)
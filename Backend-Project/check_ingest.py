@@ -0,0 +1,103 @@
+# check_ingest.py
+# Cek regresi dedupe/upsert ingest.py --append dengan export xlsx kecil buatan
+# sendiri (folder sementara, data/ asli tidak disentuh):
+#   - attempt yang sama persis di export berikutnya = duplikat (dibuang)
+#   - attempt inprogress lalu finished + nilai = upsert (baris lama disembunyikan)
+#   - regrade attempt finished & attempt kosong juga upsert, bukan duplikat
+#   - export yang sama di-append ulang tidak mengubah apa-apa
+#   - regrade balik ke nilai lama (70 -> 75 -> 70) tetap masuk
+#
+#   python check_ingest.py
+import os
+import shutil
+import tempfile
+
+import openpyxl
+
+from ingest import QUIZ_SHEET, ingest
+from snapshot import read_table
+
+HEADER = ["courseid", "courseshortname", "coursefullname", "userid", "quizid", "quizname",
+          "quiz_attempt_number", "quiz_state", "raw_quiz_score", "max_quiz_score", "final_quiz_grade"]
+
+def quiz_row(userid, attempt, state, grade):
+    return [1, "KLS-A", "Kelas A", userid, 10, "Kuis 1", attempt, state, grade, 100 if grade is not None else None, grade]
+
+WEEK1 = [
+    quiz_row(1, 1, "finished", 80),
+    quiz_row(2, 1, "inprogress", None),
+    quiz_row(3, None, "finished", 70),
+    quiz_row(5, 1, "finished", 60),
+]
+WEEK2 = [
+    quiz_row(1, 1, "finished", 80),     # duplikat persis
+    quiz_row(2, 1, "finished", 90),     # inprogress -> finished
+    quiz_row(3, None, "finished", 75),  # regrade, attempt kosong
+    quiz_row(4, 1, "finished", 65),     # baris baru
+    quiz_row(5, 1, "finished", 55),     # regrade dua kali di export yang sama:
+    quiz_row(5, 1, "finished", 85),     # yang terakhir dipakai, yang awal dihitung duplikat
+]
+EXPECTED = {1: ("finished", 80), 2: ("finished", 90), 3: ("finished", 75), 4: ("finished", 65), 5: ("finished", 85)}
+WEEK3 = [
+    quiz_row(2, 1, "finished", 90),     # sama dengan baris live
+    quiz_row(3, None, "finished", 70),  # regrade balik ke nilai minggu 1
+]
+
+def write_export(path, rows):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = QUIZ_SHEET
+    ws.append(HEADER)
+    for row in rows: ws.append(row)
+    wb.save(path)
+
+def grades(data_dir):
+    df = read_table("scores", data_dir)
+    return {int(u): (s, None if g != g else round(float(g))) for u, s, g in zip(df["userid"], df["quiz_state"], df["final_quiz_grade"])}, len(df)
+
+def check(label, ok, detail):
+    print(f"{'✅' if ok else '❌'} {label}: {detail}")
+    return ok
+
+def run():
+    tmp = tempfile.mkdtemp(prefix="check-ingest-")
+    try:
+        src, data_dir = os.path.join(tmp, "src"), os.path.join(tmp, "data")
+        os.makedirs(src)
+        week2, week3 = os.path.join(tmp, "week2.xlsx"), os.path.join(tmp, "week3.xlsx")
+        write_export(os.path.join(src, "week1.xlsx"), WEEK1)
+        write_export(week2, WEEK2)
+        write_export(week3, WEEK3)
+
+        ingest(src, data_dir, workers=1)
+        report = ingest([week2], data_dir, workers=1, append=True)
+        table, rows = grades(data_dir)
+        results = [
+            check("append", (report["score_rows"], report["score_rows_duplicate"], report.get("score_rows_replaced")) == (4, 2, 3),
+                  {k: report.get(k) for k in ("score_rows", "score_rows_duplicate", "score_rows_replaced")}),
+            check("isi tabel", rows == len(EXPECTED) and table == EXPECTED, f"{rows} baris {table}"),
+        ]
+
+        # Export minggu 2 di-append ulang: semua sama dengan baris live
+        report = ingest([week2], data_dir, workers=1, append=True)
+        table, rows = grades(data_dir)
+        results += [
+            check("append ulang export yang sama", (report["score_rows"], report["score_rows_duplicate"]) == (0, len(WEEK2)),
+                  {k: report.get(k) for k in ("score_rows", "score_rows_duplicate", "score_rows_replaced")}),
+            check("isi tabel tetap", rows == len(EXPECTED) and table == EXPECTED, f"{rows} baris"),
+        ]
+
+        report = ingest([week3], data_dir, workers=1, append=True)
+        table, rows = grades(data_dir)
+        expected = {**EXPECTED, 3: ("finished", 70)}
+        results += [
+            check("regrade balik", (report["score_rows"], report["score_rows_duplicate"], report.get("score_rows_replaced")) == (1, 1, 1),
+                  {k: report.get(k) for k in ("score_rows", "score_rows_duplicate", "score_rows_replaced")}),
+            check("isi tabel", rows == len(expected) and table == expected, f"{rows} baris {table}"),
+        ]
+        return all(results)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+if __name__ == "__main__":
+    raise SystemExit(0 if run() else 1)
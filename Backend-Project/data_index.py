@@ -0,0 +1,177 @@
+# data_index.py
+# Struktur lookup per key dalam format CSR (array datar): baris milik key ke-i
+# ada di [offsets[i], offsets[i+1]). Karena isinya hanya array numpy, struktur
+# ini bisa disimpan ke .npy dan di-mmap bersama oleh banyak worker (dataplane.py).
+import os
+
+import numpy as np
+import pandas as pd
+
+_EMPTY_POS = np.empty(0, dtype=np.intp)
+
+def _csr(key_values):
+    """key per baris (array / Series) -> (key unik urut, offsets, urutan baris). Key NaN dibuang (seperti groupby)."""
+    codes, uniques = pd.factorize(key_values, sort=True)
+    valid = np.flatnonzero(codes >= 0)
+    order = valid[np.argsort(codes[valid], kind="stable")]  # stable: urutan asli dalam 1 key tetap
+    offsets = np.zeros(len(uniques) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(codes[valid], minlength=len(uniques)), out=offsets[1:])
+    return np.asarray(uniques), offsets, order
+
+class GroupedTable:
+    """
+    Tabel kolom yang dikelompokkan per key (CSR). Kolom teks disimpan sebagai
+    kode int32 + daftar label, jadi seluruh isi tabel berupa array datar.
+    """
+    def __init__(self, keys, offsets, columns, labels=None):
+        self.keys = keys          # array key unik urut (angka) atau list (teks)
+        self.offsets = offsets
+        self.columns = columns    # nama -> array (angka atau kode label)
+        self.labels = labels or {}
+        self._numeric = isinstance(keys, np.ndarray) and keys.dtype.kind in "biuf"
+        self._lookup = None if self._numeric else {k: i for i, k in enumerate(keys)}
+        self._codes = {}
+
+    @classmethod
+    def from_frame(cls, df, key, columns):
+        keys, offsets, order = _csr(df[key])  # Series: kolom Categorical di-factorize lewat kodenya
+        cols, labels = {}, {}
+        for name in columns:
+            values = df[name].to_numpy()[order]
+            if values.dtype == object:
+                codes, uniques = pd.factorize(values)
+                cols[name], labels[name] = codes.astype(np.int32), uniques.tolist()
+            else:
+                cols[name] = values
+        if keys.dtype == object: keys = keys.tolist()
+        return cls(keys, offsets, cols, labels)
+
+    @classmethod
+    def positions(cls, key_values):
+        """Index key -> posisi baris (kolom "pos", urut posisi) dari key per baris."""
+        keys, offsets, order = _csr(key_values)
+        if keys.dtype == object: keys = keys.tolist()
+        return cls(keys, offsets, {"pos": order})
+
+    @classmethod
+    def empty(cls, columns=()):
+        return cls([], np.zeros(1, dtype=np.int64), {name: np.empty(0) for name in columns})
+
+    def find(self, key):
+        if self._lookup is not None:
+            try: return self._lookup.get(key, -1)
+            except TypeError: return -1  # key tidak hashable
+        try:
+            i = int(np.searchsorted(self.keys, key))
+        except (TypeError, ValueError, OverflowError):
+            return -1
+        return i if i < len(self.keys) and self.keys[i] == key else -1
+
+    def bounds(self, key):
+        i = self.find(key)
+        return (0, 0) if i < 0 else (int(self.offsets[i]), int(self.offsets[i + 1]))
+
+    def column(self, key, name):
+        start, end = self.bounds(key)
+        return self.columns[name][start:end]
+
+    def records(self, key, names, where=None, offset=0, limit=None):
+        """
+        List dict per baris milik key. where=(kolom label, nilai) untuk filter
+        tambahan. offset/limit: hanya sebagian baris milik key (1 halaman).
+        """
+        start, end = self.bounds(key)
+        start = min(start + offset, end)
+        if limit is not None: end = min(end, start + limit)
+        if start == end: return []
+        mask = None
+        if where is not None:
+            col, value = where
+            code = self.label_code(col, value)
+            if code < 0: return []
+            mask = self.columns[col][start:end] == code
+        values = []
+        for name in names:
+            arr = self.columns[name][start:end]
+            if mask is not None: arr = arr[mask]
+            if name in self.labels:
+                labels = self.labels[name]
+                values.append([labels[c] if c >= 0 else None for c in arr.tolist()])
+            else:
+                values.append(arr.tolist())
+        return [dict(zip(names, row)) for row in zip(*values)]
+
+    def label_code(self, name, value):
+        lookup = self._codes.get(name)
+        if lookup is None:
+            lookup = self._codes[name] = {v: i for i, v in enumerate(self.labels[name])}
+        return lookup.get(value, -1)
+
+    def to_frame(self, key):
+        # Kebalikan from_frame (label didekode), dipakai saat sebagian key dihitung ulang
+        counts = np.diff(self.offsets)
+        data = {key: np.repeat(np.asarray(self.keys, dtype=object if not self._numeric else None), counts)}
+        for name, arr in self.columns.items():
+            if name in self.labels:
+                data[name] = np.array(self.labels[name] + [None], dtype=object)[np.asarray(arr)]
+            else:
+                data[name] = np.asarray(arr)
+        return pd.DataFrame(data)
+
+    def key_list(self):
+        return self.keys.tolist() if self._numeric else list(self.keys)
+
+    def __contains__(self, key):
+        return self.find(key) >= 0
+
+    def __len__(self):
+        return len(self.keys)
+
+    # --- SIMPAN & MMAP (dataplane.py) ---
+    def dump(self, directory, name):
+        meta = {"columns": list(self.columns), "labels": self.labels, "keys": None if self._numeric else list(self.keys)}
+        if self._numeric: np.save(os.path.join(directory, f"{name}.keys.npy"), self.keys)
+        np.save(os.path.join(directory, f"{name}.offsets.npy"), self.offsets)
+        for col, arr in self.columns.items():
+            np.save(os.path.join(directory, f"{name}.{col}.npy"), np.asarray(arr))
+        return meta
+
+    @classmethod
+    def load(cls, directory, name, meta):
+        load = lambda suffix: np.load(os.path.join(directory, f"{name}.{suffix}.npy"), mmap_mode="r")
+        keys = load("keys") if meta["keys"] is None else meta["keys"]
+        return cls(keys, load("offsets"), {col: load(col) for col in meta["columns"]}, meta["labels"])
+
+class RowIndex:
+    """
+    Index posisi baris per key (misal userid -> posisi baris). Dibangun sekali
+    saat data di-load, jadi lookup per request cukup O(log n + baris milik key)
+    dan tidak perlu scan seluruh DataFrame.
+    """
+    def __init__(self, df, keys, groups=None):
+        self.df = df
+        self.keys = keys
+        if groups is not None:
+            self.groups = groups
+        elif df.empty or keys not in df.columns:
+            # Data gagal di-load -> index kosong, semua lookup hasilnya kosong
+            self.groups = GroupedTable.empty(["pos"])
+        else:
+            self.groups = GroupedTable.positions(df[keys])
+
+    def get_positions(self, key):
+        pos = self.groups.column(key, "pos")
+        return pos if len(pos) else _EMPTY_POS
+
+    def rows(self, key):
+        # Urutan baris tetap sama seperti filter boolean (posisi ascending)
+        return self.df.iloc[self.get_positions(key)]
+
+    def key_list(self):
+        return self.groups.key_list()
+
+    def __contains__(self, key):
+        return key in self.groups
+
+    def __len__(self):
+        return len(self.groups)
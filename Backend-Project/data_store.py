@@ -0,0 +1,90 @@
+# data_store.py
+# Hot reload data tanpa restart proses: dataset baru dibangun di thread background,
+# divalidasi, lalu ditukar secara atomik (1 assignment referensi). Endpoint mengambil
+# referensi dataset sekali di awal request (store.current), jadi request yang
+# sedang jalan tetap selesai memakai dataset lama.
+#
+# Trigger: POST /api/admin/reload, atau watcher yang mengecek perubahan file data
+# tiap EDUPULSE_RELOAD_WATCH detik (0 = mati).
+import threading
+import time
+
+class DataStore:
+    """
+    loader(previous) -> dataset baru; raise exception jika data tidak valid
+    (dataset lama tetap dipakai). signature() -> nilai yang berubah jika file
+    data berubah (untuk watcher). on_swap(dataset) dipanggil setelah swap.
+    """
+    def __init__(self, loader, signature=None, on_swap=None):
+        self._loader = loader
+        self._signature = signature
+        self._on_swap = on_swap
+        self._lock = threading.Lock()  # 1 reload sekaligus
+        self._loaded_signature = None
+        self.current = None
+        self.generation = 0
+        self.state = "idle"
+        self.last_result = None
+        self.results = {"success": 0, "failed": 0}
+
+    def load(self):
+        """Reload sinkron (dipakai saat startup). Hasil: dict status reload."""
+        if not self._lock.acquire(blocking=False):
+            return None
+        return self._load_locked()
+
+    def _load_locked(self):
+        try:
+            self.state = "loading"
+            t0 = time.perf_counter()
+            try:
+                dataset = self._loader(self.current)
+                signature = self._signature() if self._signature else None
+            except Exception as e:
+                # Signature tetap dicatat: watcher baru mencoba lagi jika file berubah lagi
+                self._loaded_signature = self._signature() if self._signature else None
+                self.results["failed"] += 1
+                self.last_result = {"ok": False, "error": f"{type(e).__name__}: {e}", "duration_s": round(time.perf_counter() - t0, 3),
+                                    "generation": self.generation, "finished_at": time.strftime("%Y-%m-%dT%H:%M:%S")}
+                print(f"❌ Load data gagal: {self.last_result['error']}" + (" (tetap memakai data lama)" if self.current is not None else ""))
+                return self.last_result
+
+            self.generation += 1
+            dataset.generation = self.generation
+            self.current = dataset  # swap atomik
+            self._loaded_signature = signature
+            if self._on_swap: self._on_swap(dataset)
+            self.results["success"] += 1
+            self.last_result = {"ok": True, "generation": self.generation, "duration_s": round(time.perf_counter() - t0, 3),
+                                "rows": dataset.rows, "finished_at": time.strftime("%Y-%m-%dT%H:%M:%S")}
+            return self.last_result
+        finally:
+            self.state = "idle"
+            self._lock.release()
+
+    def reload_in_background(self):
+        """False jika reload lain masih berjalan."""
+        if not self._lock.acquire(blocking=False):
+            return False
+        threading.Thread(target=self._load_locked, name="data-reload", daemon=True).start()
+        return True
+
+    def changed(self):
+        return self._signature is not None and self._signature() != self._loaded_signature
+
+    def watch(self, interval):
+        def loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    if self.state == "idle" and self.changed():
+                        print("🔄 File data berubah, reload di background...")
+                        self.reload_in_background()
+                except OSError as e:
+                    print(f"⚠️ Watcher data: {e}")
+        threading.Thread(target=loop, name="data-watch", daemon=True).start()
+
+    def status(self):
+        return {"state": self.state, "generation": self.generation,
+                "rows": self.current.rows if self.current is not None else {},
+                "last_reload": self.last_result, "reloads": dict(self.results)}
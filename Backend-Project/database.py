@@ -1,16 +1,62 @@
 # database.py
-from sqlalchemy import create_engine, Column, Integer, String
+import os
+
+from sqlalchemy import create_engine, event, Column, Integer, String
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
 # Buat file database SQLite bernama 'edupulse.db'
-SQLALCHEMY_DATABASE_URL = "sqlite:///./edupulse.db"
+SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./edupulse.db")
+ASYNC_DATABASE_URL = SQLALCHEMY_DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://", 1)
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+# --- TUNING SQLITE (Bisa diubah lewat environment variable) ---
+# WAL: pembaca tidak ter-block oleh penulis, cocok untuk banyak request baca
+# profil + sesekali update. synchronous=NORMAL aman di mode WAL dan jauh lebih
+# cepat dari FULL (default) karena tidak fsync di setiap commit.
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "busy_timeout": os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"),
+    "cache_size": os.getenv("SQLITE_CACHE_SIZE", "-16000"),  # negatif = KiB (16 MB)
+    "temp_store": "MEMORY",
+    "foreign_keys": "ON",
+}
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "8"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "8"))
+
+def apply_sqlite_pragmas(engine, pragmas=SQLITE_PRAGMAS):
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_conn, _record):
+        cursor = dbapi_conn.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+    return engine
+
+def create_tuned_engine(url=SQLALCHEMY_DATABASE_URL, pragmas=SQLITE_PRAGMAS, pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW):
+    engine = create_engine(
+        url, connect_args={"check_same_thread": False},
+        poolclass=QueuePool, pool_size=pool_size, max_overflow=max_overflow,
+    )
+    return apply_sqlite_pragmas(engine, pragmas) if url.startswith("sqlite") else engine
+
+engine = create_tuned_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Engine async (aiosqlite) untuk endpoint async def, pragma sama dengan engine sync
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL, poolclass=AsyncAdaptedQueuePool, pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW,
+)
+if ASYNC_DATABASE_URL.startswith("sqlite"):
+    apply_sqlite_pragmas(async_engine.sync_engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False, autoflush=False)
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
 Base = declarative_base()
 
 # Definisi Tabel User
@@ -20,8 +66,8 @@ class UserDB(Base):
     username = Column(String, primary_key=True, index=True) # Ini User ID (String biar aman)
     hashed_password = Column(String)
     role = Column(String) # 'admin' atau 'student'
-    
+
     # Kita simpan preferensi user di sini biar PERMANEN
     full_name = Column(String, nullable=True)
-    learning_style = Column(String, default="Visual") 
-    interest = Column(String, default="Computer Science")
\ No newline at end of file
+    learning_style = Column(String, default="Visual")
+    interest = Column(String, default="Computer Science")
@@ -0,0 +1,90 @@
+# dataplane.py
+# Data plane bersama untuk deployment multi-worker (uvicorn --workers N).
+# 1 proses loader membangun Dataset sekali (tabel, index, agregat admin, pool,
+# dst, lihat main.Dataset), menyimpannya sebagai file .npy di
+# data/snapshot/plane/<id>/, lalu menunjuknya lewat file CURRENT. Worker dengan
+# EDUPULSE_DATA_PLANE=1 cukup mmap file tsb: halaman memori dibagi lewat page
+# cache OS, jadi tiap worker tambahan hampir tidak menambah RSS / waktu startup.
+#
+#   python dataplane.py [--force]   (loader, sekali sebelum worker dijalankan)
+#
+# Plane hanya dipakai jika file data (CSV, pkl, meta snapshot) sama persis
+# dengan saat plane dibuat. Jika basi, worker membangun data sendiri lalu
+# mempublish plane baru (worker lain ikut attach saat reload).
+import json
+import os
+import shutil
+import sys
+import time
+
+from snapshot import DATA_DIR
+
+PLANE_ENABLED = os.getenv("EDUPULSE_DATA_PLANE", "0") == "1"
+KEEP_PLANES = 2  # plane lama masih bisa dipakai worker yang belum reload
+MANIFEST = "plane.json"
+
+def plane_root(data_dir=DATA_DIR):
+    return os.path.join(data_dir, "snapshot", "plane")
+
+def current_file(data_dir=DATA_DIR):
+    return os.path.join(plane_root(data_dir), "CURRENT")
+
+def as_json(value):
+    # Signature berisi tuple, setelah lewat JSON jadi list
+    return json.loads(json.dumps(value, default=str))
+
+def open_plane(signature, data_dir=DATA_DIR):
+    """(folder, manifest) plane terbaru jika masih cocok dengan signature file data, selain itu None."""
+    try:
+        with open(current_file(data_dir)) as f:
+            directory = os.path.join(plane_root(data_dir), f.read().strip())
+        with open(os.path.join(directory, MANIFEST)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("signature") != as_json(signature): return None
+    return directory, manifest
+
+def publish(dataset, signature, data_dir=DATA_DIR):
+    root = plane_root(data_dir)
+    os.makedirs(root, exist_ok=True)
+    plane_id = f"{time.time_ns() // 1_000_000}-{os.getpid()}"
+    tmp_dir = os.path.join(root, f".tmp-{plane_id}")
+    os.makedirs(tmp_dir)
+    try:
+        manifest = dataset.dump(tmp_dir)
+        manifest.update(signature=as_json(signature), created=time.strftime("%Y-%m-%dT%H:%M:%S"))
+        with open(os.path.join(tmp_dir, MANIFEST), "w") as f:
+            json.dump(manifest, f, default=str)
+        os.rename(tmp_dir, os.path.join(root, plane_id))
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    # Ganti pointer secara atomik, worker yang attach setelah ini memakai plane baru
+    with open(current_file(data_dir) + ".tmp", "w") as f:
+        f.write(plane_id)
+    os.replace(current_file(data_dir) + ".tmp", current_file(data_dir))
+    prune_planes(data_dir)
+    return os.path.join(root, plane_id), manifest
+
+def prune_planes(data_dir=DATA_DIR, keep=KEEP_PLANES):
+    # File yang sudah di-mmap worker tetap valid walau foldernya dihapus
+    root = plane_root(data_dir)
+    planes = sorted((d for d in os.listdir(root) if d[0].isdigit()), key=lambda d: int(d.split("-")[0]))
+    for name in planes[:-keep]:
+        shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+
+if __name__ == "__main__":
+    # Loader: load data + seeding user sekali, lalu publish plane untuk semua worker.
+    # Jika plane yang ada masih cocok, cukup attach (restart container tetap cepat).
+    if "--force" in sys.argv:
+        try: os.remove(current_file())
+        except OSError: pass
+    os.environ.update(EDUPULSE_DATA_PLANE="1", EDUPULSE_SEED_ON_STARTUP="1", EDUPULSE_RELOAD_WATCH="0")
+    import main
+    result = main.store.last_result
+    if result and result["ok"]:
+        with open(current_file()) as f:
+            print(f"✅ Data plane siap: {f.read()} {result['rows']} ({result['duration_s']}s)")
+    sys.exit(0 if result and result["ok"] else 1)
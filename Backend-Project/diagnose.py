@@ -0,0 +1,182 @@
+# diagnose.py
+# Diagnostik data (pengganti script cek_*.py). Semua cek dijalankan untuk SEMUA
+# user & kelas sekaligus, di atas snapshot kolom backend (snapshot.py, mmap),
+# 1 proses per cek. Hasilnya laporan anomali JSON.
+#
+#   python diagnose.py [--data-dir DIR] [--out laporan.json] [--limit 20] [--workers N]
+#
+# Cek:
+#   grades_over_100         nilai > 100 (bonus / max_quiz_score salah, di app di-cap 100)
+#   unparseable_decimals    teks nilai di CSV yang gagal di-parse (jadi 0 di app)
+#   empty_charts            kelas tanpa satupun nilai > 0, dan pasangan user-kelas yang chart-nya kosong
+#   users_missing_features  user yang punya nilai tapi tidak ada di fitur ML (user_level_features)
+#   suspicious_ids          userid < 1000 (akun admin/test)
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from snapshot import DATA_DIR, TABLES, is_fresh, load_table, read_meta, read_table
+
+MIN_USER_ID = 1000
+LIMIT = 20  # jumlah sampel baris per cek
+CHUNK_ROWS = 500_000
+
+def to_records(df):
+    # NaN -> null supaya JSON valid
+    return df.astype(object).where(df.notna(), None).to_dict("records")
+
+# --- CEK ---
+def check_grades_over_100(data_dir, limit):
+    scores = read_table("scores", data_dir, columns=["courseshortname", "userid", "quizid", "quizname", "max_quiz_score", "final_quiz_grade", "final_quiz_grade_raw"])
+    over = scores[scores["final_quiz_grade"].to_numpy() > 100]
+    report = {"count": len(over), "users": int(over["userid"].nunique())}
+    if "final_quiz_grade_raw" in scores.columns:
+        # Snapshot hasil ingest.py: nilai sudah dinormalisasi, yang mentah > 100 hanya info
+        report["raw_over_100_normalized"] = int((scores["final_quiz_grade_raw"].to_numpy() > 100).sum())
+    if over.empty: return report
+
+    agg = {"rows": ("userid", "size"), "users": ("userid", "nunique"), "max_grade": ("final_quiz_grade", "max")}
+    if "max_quiz_score" in over.columns: agg["max_quiz_score"] = ("max_quiz_score", "max")
+    quizzes = over.groupby(["courseshortname", "quizid", "quizname"], observed=True).agg(**agg).reset_index()
+    report["quizzes"] = to_records(quizzes.sort_values("rows", ascending=False, kind="stable").rename(columns={"courseshortname": "class_id"}))
+    report["samples"] = to_records(over.nlargest(limit, "final_quiz_grade").drop(columns="final_quiz_grade_raw", errors="ignore").rename(columns={"courseshortname": "class_id"}))
+    return report
+
+def check_unparseable_decimals(data_dir, limit):
+    # Teks asli nilai hanya ada di CSV sumber (snapshot menyimpan hasil parse-nya)
+    meta = read_meta("scores", data_dir)
+    if meta.get("origin") == "ingest":
+        return {"count": 0, "skipped": "snapshot scores dari ingest.py (xlsx), tidak ada CSV sumber"}
+    path = os.path.join(data_dir, TABLES["scores"][0])
+    report = {"count": 0, "comma_values": 0, "samples": []}
+    reader = pd.read_csv(path, usecols=["userid", "courseshortname", "quizname", "final_quiz_grade"], dtype={"final_quiz_grade": str}, chunksize=CHUNK_ROWS)
+    for chunk in reader:
+        text = chunk["final_quiz_grade"].str.strip()
+        has_comma = text.str.contains(",", regex=False, na=False)
+        parsed = pd.to_numeric(text.str.replace(",", ".", regex=False), errors="coerce")
+        # Kandidat gagal: ada teks tapi hasil NaN; "nan"/"inf" tetap valid seperti float() di snapshot.clean_decimal
+        candidates = np.flatnonzero((text.notna() & parsed.isna()).to_numpy())
+        bad = [i for i in candidates.tolist() if not parses_as_float(text.iat[i].replace(",", "."))]
+        report["comma_values"] += int((has_comma & parsed.notna()).sum())
+        report["count"] += len(bad)
+        if bad and len(report["samples"]) < limit:
+            rows = chunk.iloc[bad[:limit - len(report["samples"])]]
+            # line = nomor baris di file CSV (baris 1 = header)
+            report["samples"] += to_records(rows.assign(line=rows.index + 2).rename(columns={"courseshortname": "class_id", "final_quiz_grade": "raw_value"}))
+    return report
+
+def parses_as_float(text):
+    try:
+        float(text)
+        return True
+    except ValueError:
+        return False
+
+def check_empty_charts(data_dir, limit):
+    scores = read_table("scores", data_dir, columns=["courseshortname", "userid", "final_quiz_grade"])
+    # Chart = nilai per kuis (NaN -> 0), kosong jika tidak ada satupun nilai > 0
+    graded = pd.DataFrame({"class_id": scores["courseshortname"], "userid": scores["userid"], "graded": scores["final_quiz_grade"].to_numpy() > 0})
+    pairs = graded.groupby(["class_id", "userid"], observed=True)["graded"].any().reset_index()
+    pairs["empty"] = ~pairs["graded"]
+    classes = pairs.groupby("class_id", observed=True).agg(users=("userid", "size"), empty_users=("empty", "sum")).reset_index()
+    rows = graded.groupby("class_id", observed=True).agg(rows=("graded", "size"), graded_rows=("graded", "sum")).reset_index()
+    classes = classes.merge(rows, on="class_id")
+
+    empty_classes = classes[classes["graded_rows"] == 0]
+    partial = classes[(classes["empty_users"] > 0) & (classes["graded_rows"] > 0)]
+    empty_pairs = pairs[pairs["empty"]]
+    return {
+        "count": len(empty_classes),
+        "classes": len(classes),
+        "empty_classes": to_records(empty_classes),
+        "empty_user_class_pairs": len(empty_pairs),
+        "classes_with_empty_users": to_records(partial.sort_values("empty_users", ascending=False, kind="stable").head(limit)),
+        "samples": to_records(empty_pairs[["userid", "class_id"]].head(limit)),
+    }
+
+def check_users_missing_features(data_dir, limit):
+    score_ids = pd.unique(read_table("scores", data_dir, columns=["userid"])["userid"].dropna())
+    user_ids = pd.unique(read_table("users", data_dir, columns=["userid"])["userid"].dropna())
+    missing = np.setdiff1d(score_ids, user_ids)
+    return {
+        "count": len(missing),
+        "score_users": len(score_ids),
+        "feature_users": len(user_ids),
+        "features_without_scores": len(np.setdiff1d(user_ids, score_ids)),
+        "samples": np.sort(missing)[:limit].tolist(),
+    }
+
+def check_suspicious_ids(data_dir, limit):
+    users = read_table("users", data_dir, columns=["userid", "cluster"])
+    score_ids = read_table("scores", data_dir, columns=["userid"])["userid"].to_numpy()
+    small = users[users["userid"].to_numpy() < MIN_USER_ID].sort_values("userid", kind="stable")
+    small_scores = score_ids[score_ids < MIN_USER_ID]
+    return {
+        "count": len(small),
+        "min_id": MIN_USER_ID,
+        "in_features": to_records(small.head(limit)),
+        "score_rows": len(small_scores),
+        "score_users": len(np.unique(small_scores)),
+    }
+
+CHECKS = {
+    "grades_over_100": check_grades_over_100,
+    "unparseable_decimals": check_unparseable_decimals,
+    "empty_charts": check_empty_charts,
+    "users_missing_features": check_users_missing_features,
+    "suspicious_ids": check_suspicious_ids,
+}
+
+def run_check(name, data_dir, limit):
+    t0 = time.perf_counter()
+    try:
+        report = CHECKS[name](data_dir, limit)
+    except Exception as e:
+        report = {"count": None, "error": f"{type(e).__name__}: {e}"}
+    report["seconds"] = round(time.perf_counter() - t0, 3)
+    return report
+
+def diagnose(data_dir=DATA_DIR, limit=LIMIT, workers=None, checks=None):
+    # Snapshot dibangun dulu jika belum ada / basi, setelah itu tiap proses cukup mmap kolomnya
+    for name in TABLES:
+        if not is_fresh(name, data_dir): load_table(name, data_dir)
+        if read_meta(name, data_dir) is None: raise SystemExit(f"❌ Snapshot {name} tidak tersedia di {data_dir}")
+    names = checks or list(CHECKS)
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers or min(len(names), os.cpu_count() or 1)) as pool:
+        jobs = {name: pool.submit(run_check, name, data_dir, limit) for name in names}
+        results = {name: job.result() for name, job in jobs.items()}
+    return {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "data_dir": os.path.abspath(data_dir),
+        "tables": {name: {"rows": read_meta(name, data_dir)["rows"], "origin": read_meta(name, data_dir).get("origin", "csv")} for name in TABLES},
+        "summary": {name: r["count"] for name, r in results.items()},
+        "checks": results,
+        "seconds": round(time.perf_counter() - t0, 3),
+    }
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--data-dir", default=DATA_DIR)
+    ap.add_argument("--out", help="file laporan JSON (default: stdout)")
+    ap.add_argument("--limit", type=int, default=LIMIT, help="jumlah sampel baris per cek")
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--check", nargs="+", choices=list(CHECKS), help="hanya jalankan cek tertentu")
+    args = ap.parse_args()
+
+    report = diagnose(args.data_dir, args.limit, args.workers, args.check)
+    for name, r in report["checks"].items():
+        status = "❌" if r["count"] is None else "⚠️" if r["count"] else "✅"
+        print(f"{status} {name}: {r.get('error', r['count'])}", file=sys.stderr)
+    text = json.dumps(report, indent=1, ensure_ascii=False, default=str)
+    if args.out:
+        with open(args.out, "w") as f: f.write(text)
+        print(f"📄 Laporan: {args.out}", file=sys.stderr)
+    else:
+        print(text)
@@ -0,0 +1,209 @@
+# gen_data.py
+# Generator data sintetis dengan skema sama seperti file asli di data/
+# (yang di repo hanya pointer Git LFS), untuk benchmark & CI:
+#   user_level_features_final_for_ML.csv, merged_score_data_cleaned.csv,
+#   merged_logs_data_cleaned.csv, recommendation_engine.pkl
+#
+#   python gen_data.py --out /tmp/edupulse-data --users 10000 [--logs-per-user 100] [--seed 0]
+#
+# Hasil deterministik untuk kombinasi (users, logs, seed) yang sama. Semua file
+# ditulis per chunk, jadi memori tetap kecil walau 1 juta user / 100 juta log.
+import argparse
+import os
+import pickle
+import time
+
+import numpy as np
+import pandas as pd
+
+CLASS_SIZE = 40          # mahasiswa per kelas paralel (IF-48-01PJJ, 02, ...)
+USER_CHUNK = 50_000      # user per chunk saat menulis nilai
+LOG_CHUNK = 1_000_000    # baris per chunk saat menulis log
+LECTURERS = ["IZA", "DTO", "LZD", "FTY", "ABC", "RNA"]
+
+# (kode matkul, nama matkul) -> tiap mahasiswa ikut semua matkul di kelasnya
+COURSES = [("CAK1DAB3", "LOGIKA MATEMATIKA"), ("CAK1EAB3", "MATEMATIKA DISKRIT")]
+
+# (nama kuis, nilai maksimal) -> mirip export Moodle asli (termasuk remedial & tryout)
+QUIZZES = [
+    ("Online Quiz 1: Logika Proposisi", 10), ("Online Quiz 2: Inferensi", 10),
+    ("Online Quiz 3: Himpunan", 20), ("Online Quiz 4: Relasi dan Fungsi", 20),
+    ("Online Quiz 5: Induksi Matematika", 10), ("Online Quiz 5: Induksi Matematika (Remedial)", 10),
+    ("Online Quiz 6: Graf", 20), ("Online Quiz 7: Pohon (Bagian 1)", 10),
+    ("Midterm Exam", 100), ("Midterm Exam Tryout", 100), ("Final Exam", 100), ("UAS Remedial", 100),
+]
+
+CLUSTER_LABELS = {0: 'At Risk / Passive', 1: 'Hard Worker / Struggling', 2: 'Active Learner', 3: 'Balanced Learner'}
+FEATURES = ['mean_score_pct', 'engagement_score', 'consistency_score', 'num_attempts']
+
+# --- USER ---
+def make_userids(rng, n):
+    # ID acak unik >= 10000, plus beberapa ID < 1000 (akun admin/test seperti data asli)
+    ids = 10_000 + rng.permutation(n * 3)[:n]
+    n_small = min(n, max(1, n // 500))
+    ids[:n_small] = rng.choice(np.arange(2, 1000), n_small, replace=False)
+    return ids.astype(np.int64)
+
+def make_users(rng, userids, train_rows=20_000):
+    from sklearn.cluster import KMeans
+    from sklearn.preprocessing import MinMaxScaler
+
+    n = len(userids)
+    users = pd.DataFrame({
+        "userid": userids,
+        "mean_score_pct": (rng.beta(5, 2, n) * 100).round(2),
+        "engagement_score": rng.integers(0, 101, n),
+        "consistency_score": rng.beta(2, 2, n).round(4),
+        "num_attempts": rng.integers(1, 60, n),
+    })
+    # Model cluster sama seperti pkl asli (MinMaxScaler + KMeans 4 cluster),
+    # di-fit pada sampel supaya cepat untuk jutaan user
+    scaler = MinMaxScaler().fit(users[FEATURES])
+    sample = users[FEATURES].sample(min(n, train_rows), random_state=int(rng.integers(1 << 31)))
+    model = KMeans(n_clusters=4, n_init=1, random_state=0).fit(scaler.transform(sample))
+    users["cluster"] = model.predict(scaler.transform(users[FEATURES]))
+    engine = {"model": model, "scaler": scaler, "cluster_labels": CLUSTER_LABELS, "features": FEATURES}
+    return users, engine
+
+# --- NILAI ---
+def class_names(section):
+    sec = f"IF-48-{section + 1:02d}PJJ"
+    lecturer = LECTURERS[section % len(LECTURERS)]
+    return [(f"{code}-{sec}", f"{name} {sec} [{lecturer}]") for code, name in COURSES]
+
+def format_grades(rng, grades):
+    # Campuran format seperti data asli: titik, koma desimal, dan sel kosong
+    text = pd.Series(np.round(grades, 5)).astype(str).to_numpy(dtype=object)
+    r = rng.random(len(grades))
+    comma = r < 0.4
+    text[comma] = pd.Series(text[comma], dtype=object).str.replace(".", ",", regex=False).to_numpy(dtype=object)
+    text[r > 0.97] = ""
+    return text
+
+def score_chunk(rng, userids, sections):
+    n_c, n_q = len(COURSES), len(QUIZZES)
+    per_user = n_c * n_q
+    u = np.repeat(np.arange(len(userids)), per_user)
+    course = np.tile(np.repeat(np.arange(n_c), n_q), len(userids))
+    quiz = np.tile(np.arange(n_q), len(userids) * n_c)
+
+    # Tidak semua mahasiswa mengerjakan semua kuis, sebagian mengulang (attempt 2)
+    keep = rng.random(len(u)) < 0.85
+    u, course, quiz = u[keep], course[keep], quiz[keep]
+    retry = rng.random(len(u)) < 0.1
+    attempt = np.concatenate([np.ones(len(u), np.int64), np.full(retry.sum(), 2)])
+    u, course, quiz = np.concatenate([u, u[retry]]), np.concatenate([course, course[retry]]), np.concatenate([quiz, quiz[retry]])
+
+    section = sections[u]
+    class_key = section * n_c + course
+    uniq, inv = np.unique(class_key, return_inverse=True)
+    names = [class_names(k // n_c)[k % n_c] for k in uniq.tolist()]
+    short = np.array([s for s, _ in names], dtype=object)
+    # Sebagian kode kelas punya spasi di depan (ada di export asli, di-strip saat load)
+    short = np.where(uniq % 7 == 3, " " + short, short)
+    full = np.array([f for _, f in names], dtype=object)
+
+    max_score = np.array([m for _, m in QUIZZES], dtype=float)[quiz]
+    raw = np.round(rng.beta(4, 2, len(u)) * max_score, 2)
+    final = raw / max_score * 100
+    # Sebagian nilai > 100 (bonus / max_quiz_score salah) seperti data asli
+    over = rng.random(len(u)) < 0.03
+    final[over] = final[over] * rng.uniform(1.05, 10, over.sum())
+
+    courseid = 1900 + class_key
+    return pd.DataFrame({
+        "courseid": courseid,
+        "courseshortname": short[inv],
+        "coursefullname": full[inv],
+        "userid": userids[u],
+        "quizid": 18_000 + courseid * len(QUIZZES) + quiz,
+        "quizname": np.array([q for q, _ in QUIZZES], dtype=object)[quiz],
+        "quiz_attempt_number": attempt,
+        "quiz_state": np.where(rng.random(len(u)) < 0.98, "finished", "inprogress"),
+        "raw_quiz_score": raw,
+        "max_quiz_score": max_score,
+        "final_quiz_grade": format_grades(rng, final),
+    })
+
+def write_scores(rng, path, userids, sections):
+    rows = 0
+    for start in range(0, len(userids), USER_CHUNK):
+        chunk = score_chunk(rng, userids[start:start + USER_CHUNK], sections[start:start + USER_CHUNK])
+        chunk.to_csv(path, mode="w" if start == 0 else "a", header=start == 0, index=False)
+        rows += len(chunk)
+    return rows
+
+# --- LOG AKTIVITAS ---
+def time_strings(days, start="2025-09-01"):
+    # String tanggal & jam dibuat sekali, tiap baris log tinggal ambil index-nya
+    dates = pd.date_range(start, periods=days, freq="D")
+    iso = np.array(dates.strftime("%Y-%m-%d ").tolist(), dtype=object)
+    moodle = np.array(dates.strftime("%d/%m/%y, ").tolist(), dtype=object)
+    secs = np.arange(86_400)
+    hms = np.array([f"{h:02d}:{m:02d}:{s:02d}" for h, m, s in zip(secs // 3600, secs // 60 % 60, secs % 60)], dtype=object)
+    return iso, moodle, hms
+
+def write_logs(rng, path, userids, total_rows, days=90):
+    iso, moodle, hms = time_strings(days)
+    events = np.array(["Course viewed", "Course module viewed", "Quiz attempt started", "Quiz attempt submitted", "Discussion viewed"], dtype=object)
+    components = np.array(["System", "Page", "Quiz", "Quiz", "Forum"], dtype=object)
+    # Aktivitas tiap user tidak rata (sebagian sangat aktif), jam puncak beda per user
+    weights = rng.pareto(1.5, len(userids)) + 0.1
+    weights /= weights.sum()
+    peak_hour = rng.integers(6, 24, len(userids))
+
+    written = 0
+    while written < total_rows:
+        n = min(LOG_CHUNK, total_rows - written)
+        who = rng.choice(len(userids), n, p=weights)
+        day = rng.integers(0, days, n)
+        hour = (peak_hour[who] + np.round(rng.normal(0, 3, n)).astype(np.int64)) % 24
+        sec = hour * 3600 + rng.integers(0, 3600, n)
+        ev = rng.integers(0, len(events), n)
+        actor = userids[who].astype(float)
+        actor[rng.random(n) < 0.01] = np.nan  # baris log tanpa user (guest/sistem)
+        chunk = pd.DataFrame({
+            "Time": moodle[day] + hms[sec],
+            "actor_userid": actor,
+            "Event context": "Course",
+            "Component": components[ev],
+            "Event name": events[ev],
+            "Time_parsed": iso[day] + hms[sec],
+        })
+        chunk.to_csv(path, mode="w" if written == 0 else "a", header=written == 0, index=False, float_format="%.0f")
+        written += n
+    return written
+
+def generate(out_dir, n_users, logs_per_user=100, log_rows=None, seed=0):
+    os.makedirs(out_dir, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    t0 = time.time()
+
+    userids = make_userids(rng, n_users)
+    users, engine = make_users(rng, userids)
+    users.to_csv(os.path.join(out_dir, "user_level_features_final_for_ML.csv"), index=False)
+    with open(os.path.join(out_dir, "recommendation_engine.pkl"), "wb") as f:
+        pickle.dump(engine, f)
+
+    # ~1% mahasiswa punya nilai tapi tidak masuk fitur ML (seperti data asli)
+    extra = 10_000 + n_users * 3 + np.arange(max(1, n_users // 100))
+    score_users = np.concatenate([userids, extra])
+    sections = rng.permutation(len(score_users)) // CLASS_SIZE
+    score_rows = write_scores(rng, os.path.join(out_dir, "merged_score_data_cleaned.csv"), score_users, sections)
+
+    total_logs = log_rows if log_rows is not None else n_users * logs_per_user
+    log_rows = write_logs(rng, os.path.join(out_dir, "merged_logs_data_cleaned.csv"), score_users, total_logs)
+
+    stats = {"users": n_users, "score_rows": score_rows, "log_rows": log_rows, "classes": int(sections.max() + 1) * len(COURSES), "seconds": round(time.time() - t0, 2)}
+    print(f"✅ Data sintetis di {out_dir}: {stats}")
+    return stats
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--out", required=True)
+    ap.add_argument("--users", type=int, default=1000)
+    ap.add_argument("--logs-per-user", type=int, default=100)
+    ap.add_argument("--log-rows", type=int, default=None, help="total baris log (override --logs-per-user)")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+    generate(args.out, args.users, args.logs_per_user, args.log_rows, args.seed)
@@ -0,0 +1,637 @@
+# ingest.py
+# Pipeline ingest export Moodle mentah (matkul/nilai/*.xlsx) langsung ke snapshot
+# kolom backend (data/snapshot/scores & data/snapshot/activity), tanpa lewat CSV.
+#
+#   python ingest.py [--src ../matkul/nilai] [--workers N] [--chunk-rows 20000]
+#   python ingest.py --append export_minggu_ini.xlsx logs_minggu_ini.xlsx
+#
+# - Workbook dibaca pakai openpyxl read_only (streaming baris), 1 proses per file.
+# - Tiap proses menulis kolom per chunk ke file biner sementara (nilai & log), jadi
+#   memori tetap kecil berapapun ukuran export. Hasil semua file lalu digabung ke
+#   .npy per chunk; event log langsung dilipat ke histogram per user.
+# - Nilai dinormalisasi: koma desimal, dan kuis yang grade maksimalnya > 100
+#   (misal 108: nilai 15/15 tercatat 108) diskalakan balik ke 0-100.
+# - Tabel "users" (fitur ML) tidak ada di export, tetap dari CSV seperti biasa.
+#
+# Mode --append hanya membaca file export baru, ditulis sebagai segmen baru di
+# snapshot (lihat snapshot.segment_file). Log: event yang key-nya (waktu+user+event)
+# sudah pernah masuk dibuang. Nilai: attempt (userid+quizid+attempt) yang isinya sama
+# dengan baris live dibuang, isi beda = upsert (baris lama disembunyikan).
+# Biayanya sebanding dengan data baru, data lama tidak dibaca / ditulis ulang.
+#
+# Snapshot hasil ingest dianggap fresh terus (tidak dibandingkan dengan CSV);
+# jalankan "python snapshot.py --force" untuk kembali memakai CSV.
+import argparse
+import glob
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+from snapshot import (DATA_DIR, GRADE_COLUMNS, ID_COLUMNS, SNAPSHOT_VERSION, commit_table_dir, load_segments,
+                      new_table_dir, read_meta, segment_file, table_dir, write_meta)
+from activity import LOGS_FILE, SLOTS, TABLE_NAME as ACTIVITY_TABLE, key_file_name, write_activity
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(BASE_DIR, "..", "matkul", "nilai")
+CHUNK_ROWS = 20_000
+QUIZ_SHEET = "Quiz"
+
+# Skema tabel scores hasil ingest: kolom -> dtype numpy (None = kolom teks/kategori)
+SCORE_COLUMNS = {
+    "courseid": np.int64,
+    "courseshortname": None,
+    "coursefullname": None,
+    "userid": np.int64,
+    "quizid": np.int64,
+    "quizname": None,
+    "quiz_attempt_number": np.float64,
+    "quiz_state": None,
+    "raw_quiz_score": np.float64,
+    "max_quiz_score": np.float64,
+    "final_quiz_grade": np.float64,      # sudah dinormalisasi (0-100)
+    "final_quiz_grade_raw": np.float64,  # nilai asli export (bisa > 100)
+    "time_spent_seconds": np.float64,
+}
+
+# Spool per workbook log: 1 baris per event (teks log tidak disimpan)
+LOG_COLUMNS = {"key": np.uint64, "userid": np.int64, "slot": np.int16}
+
+def store_dtype(col, dtype):
+    # Spool per file tetap int64/float64 (normalisasi butuh presisi penuh),
+    # snapshot akhir memakai dtype ringkas yang sama dengan snapshot.compact_dtypes
+    if col in ID_COLUMNS: return np.int32
+    if col in GRADE_COLUMNS: return np.float32
+    return dtype or np.int32
+
+# --- NORMALISASI NILAI ---
+def to_float(val):
+    # Angka dari Excel bisa float, int, atau teks "75,5" / "" / "-"
+    if val is None: return np.nan
+    if isinstance(val, (int, float)): return float(val)
+    try: return float(str(val).strip().replace(",", "."))
+    except ValueError: return np.nan
+
+def quiz_scale(ratios, min_samples=3):
+    """
+    Skala grade kuis = modus rasio final_quiz_grade / (raw/max*100).
+    Hanya kuis dengan skala > 1 (grade maksimal > 100) yang dikoreksi.
+    """
+    if sum(ratios.values()) < min_samples: return 1.0
+    scale = ratios.most_common(1)[0][0]
+    return scale if scale > 1.005 else 1.0
+
+# --- KEY DEDUPE ---
+# Dua key per baris nilai:
+#   identitas (userid, quizid, attempt) -> attempt yang sama di export lain
+#   isi (identitas + quiz_state + nilai) -> dibandingkan dengan baris live attempt tsb
+# Isi sama dengan baris live = duplikat. Isi beda (inprogress -> finished, regrade,
+# termasuk regrade balik ke nilai lama) = upsert: baris live lama disembunyikan.
+KEY_VERSION = 3
+NO_ATTEMPT = 0xFFFFFFFF  # attempt kosong, tidak bentrok dengan attempt 0
+
+def mix64(x):
+    # Finalizer splitmix64
+    x = x ^ (x >> np.uint64(30))
+    x *= np.uint64(0xBF58476D1CE4E5B9)
+    x ^= x >> np.uint64(27)
+    x *= np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+def score_keys(userid, quizid, attempt):
+    # Hash 64-bit dari (userid, quizid, attempt)
+    attempt = np.asarray(attempt, dtype=np.float64)
+    attempt = np.where(np.isnan(attempt), NO_ATTEMPT, np.nan_to_num(attempt)).astype(np.uint64)
+    return mix64(np.asarray(userid).astype(np.uint64) * np.uint64(0x9E3779B97F4A7C15)
+                 ^ np.asarray(quizid).astype(np.uint64) * np.uint64(0xC2B2AE3D27D4EB4F)
+                 ^ attempt * np.uint64(0x165667B19E3779F9))
+
+def text_hash(text):
+    return int.from_bytes(hashlib.blake2b(str(text).encode(), digest_size=8).digest(), "little")
+
+def content_keys(ids, state_codes, states, grade):
+    # Nilai dibandingkan sebagai float32 (dtype snapshot), quiz_state lewat kode kategori
+    state_hash = np.array([text_hash(s) for s in states] + [0], dtype=np.uint64)  # kode -1 -> 0
+    grade = np.asarray(grade, dtype=np.float32) + np.float32(0)  # -0.0 -> 0.0
+    bits = np.where(np.isnan(grade), np.uint32(0x7FC00000), grade.view(np.uint32)).astype(np.uint64)
+    return mix64(ids ^ mix64(state_hash[state_codes] * np.uint64(0x9E3779B97F4A7C15) ^ bits * np.uint64(0xC2B2AE3D27D4EB4F)))
+
+def part_keys(part):
+    ids = score_keys(read_bin(part, "userid"), read_bin(part, "quizid"), read_bin(part, "quiz_attempt_number"))
+    return ids, content_keys(ids, read_bin(part, "quiz_state"), part["categories"]["quiz_state"], read_bin(part, "final_quiz_grade"))
+
+def event_key(ts, userid, event):
+    # Hanya kolom yang pasti ada di xlsx log & CSV log hasil cleaning
+    raw = f"{ts:%Y-%m-%d %H:%M:%S}|{userid}|{event}".encode()
+    return int.from_bytes(hashlib.blake2b(raw, digest_size=8).digest(), "little")
+
+def seen_mask(keys, key_sets):
+    """True untuk key yang sudah ada di salah satu array key (masing-masing sudah urut)."""
+    seen = np.zeros(len(keys), dtype=bool)
+    for known in key_sets:
+        if not len(known): continue
+        idx = np.minimum(np.searchsorted(known, keys), len(known) - 1)
+        seen |= known[idx] == keys
+    return seen
+
+# --- SPOOL KOLOM (Tulis per chunk ke file biner) ---
+class ColumnSpool:
+    def __init__(self, directory, schema):
+        self.directory = directory
+        self.schema = schema
+        self.rows = 0
+        self.categories = {col: {} for col, dtype in schema.items() if dtype is None}
+        self._files = {col: open(self.path(col), "wb") for col in schema}
+
+    def path(self, col):
+        return os.path.join(self.directory, f"{col}.bin")
+
+    def append(self, columns):
+        for col, dtype in self.schema.items():
+            values = columns[col]
+            if dtype is None:
+                lookup = self.categories[col]
+                codes = np.fromiter((-1 if v is None else lookup.setdefault(v, len(lookup)) for v in values), dtype=np.int32, count=len(values))
+                codes.tofile(self._files[col])
+            else:
+                np.asarray(values, dtype=dtype).tofile(self._files[col])
+        self.rows += len(columns[next(iter(self.schema))])
+
+    def close(self):
+        for fh in self._files.values(): fh.close()
+        return {"dir": self.directory, "rows": self.rows, "categories": {c: list(m) for c, m in self.categories.items()}}
+
+def iter_bin(path, dtype, chunk_rows=CHUNK_ROWS * 10):
+    with open(path, "rb") as fh:
+        while True:
+            arr = np.fromfile(fh, dtype=dtype, count=chunk_rows)
+            if not len(arr): return
+            yield arr
+
+def read_bin(part, col):
+    return np.fromfile(os.path.join(part["dir"], f"{col}.bin"), dtype=SCORE_COLUMNS[col] or np.int32)
+
+# --- WORKER: 1 WORKBOOK NILAI ---
+def ingest_quiz_file(path, work_dir, chunk_rows=CHUNK_ROWS):
+    out_dir = tempfile.mkdtemp(prefix="quiz-", dir=work_dir)
+    spool = ColumnSpool(out_dir, SCORE_COLUMNS)
+    ratios = {}  # quizid -> Counter rasio grade (untuk deteksi skala > 100)
+    skipped = 0
+
+    wb = openpyxl.load_workbook(path, read_only=True)
+    try:
+        if QUIZ_SHEET not in wb.sheetnames:
+            return {**spool.close(), "file": path, "skipped": 0, "scales": {}}
+        rows = wb[QUIZ_SHEET].iter_rows(values_only=True)
+        header = {name: i for i, name in enumerate(next(rows, ()))}
+        buf = {col: [] for col in SCORE_COLUMNS}
+
+        def flush():
+            if buf["userid"]:
+                spool.append(buf)
+                for values in buf.values(): values.clear()
+
+        for row in rows:
+            get = lambda col: row[header[col]] if col in header and header[col] < len(row) else None
+            userid, quizid = to_float(get("userid")), to_float(get("quizid"))
+            if np.isnan(userid) or np.isnan(quizid):
+                skipped += 1
+                continue
+            raw, max_score, final = to_float(get("raw_quiz_score")), to_float(get("max_quiz_score")), to_float(get("final_quiz_grade"))
+            if raw > 0 and max_score > 0 and final > 0:
+                ratios.setdefault(int(quizid), Counter())[round(final / (raw / max_score * 100), 2)] += 1
+
+            buf["courseid"].append(to_float(get("courseid")))
+            buf["courseshortname"].append(str(get("courseshortname") or "").strip() or None)
+            buf["coursefullname"].append(get("coursefullname") or None)
+            buf["userid"].append(userid)
+            buf["quizid"].append(quizid)
+            buf["quizname"].append(get("quizname") or None)
+            buf["quiz_attempt_number"].append(to_float(get("quiz_attempt_number")))
+            buf["quiz_state"].append(get("quiz_state") or None)
+            buf["raw_quiz_score"].append(raw)
+            buf["max_quiz_score"].append(max_score)
+            buf["final_quiz_grade"].append(final)
+            buf["final_quiz_grade_raw"].append(final)
+            buf["time_spent_seconds"].append(to_float(get("time_spent_seconds")))
+            if len(buf["userid"]) >= chunk_rows: flush()
+        flush()
+    finally:
+        wb.close()
+    part = spool.close()
+
+    # Pass kedua (di file biner, bukan xlsx): skalakan kuis yang grade maksimalnya > 100
+    scales = {q: quiz_scale(c) for q, c in ratios.items()}
+    scaled = {q: s for q, s in scales.items() if s != 1.0}
+    final_path = spool.path("final_quiz_grade")
+    tmp_path = final_path + ".tmp"
+    with open(tmp_path, "wb") as out:
+        for final, quizid in zip(iter_bin(final_path, np.float64), iter_bin(spool.path("quizid"), np.int64)):
+            factor = np.ones(len(final))
+            for q, s in scaled.items():
+                factor[quizid == q] = s
+            # Sisa nilai > 100 (kuis tanpa data raw untuk deteksi skala) dipotong di 100
+            np.minimum(final / factor, 100.0).tofile(out)
+    os.replace(tmp_path, final_path)
+    return {**part, "file": path, "skipped": skipped, "scales": scaled}
+
+# --- WORKER: 1 WORKBOOK LOG ---
+USER_ID_RE = re.compile(r"user with id (?:&#039;|')(\d+)")
+
+def parse_log_time(val):
+    if isinstance(val, datetime): return val
+    try: return datetime.strptime(str(val).strip(), "%d/%m/%y, %H:%M:%S")
+    except ValueError: return None
+
+def ingest_log_file(path, work_dir, chunk_rows=CHUNK_ROWS):
+    # Per event cukup disimpan (key, user, slot jam) ke spool biner; teks log tidak disimpan
+    out_dir = tempfile.mkdtemp(prefix="log-", dir=work_dir)
+    spool = ColumnSpool(out_dir, LOG_COLUMNS)
+    rows_read = skipped = 0
+    wb = openpyxl.load_workbook(path, read_only=True)
+    try:
+        rows = wb.worksheets[0].iter_rows(values_only=True)
+        header = {name: i for i, name in enumerate(next(rows, ()))}
+        i_time, i_desc = header.get("Time"), header.get("Description")
+        if i_time is not None and i_desc is not None:
+            i_event = header.get("Event name")
+            buf = {col: [] for col in LOG_COLUMNS}
+            for row in rows:
+                rows_read += 1
+                ts = parse_log_time(row[i_time])
+                match = USER_ID_RE.search(row[i_desc] or "")
+                if ts is None or match is None:
+                    skipped += 1
+                    continue
+                uid = int(match.group(1))
+                buf["key"].append(event_key(ts, uid, row[i_event] if i_event is not None else None))
+                buf["userid"].append(uid)
+                buf["slot"].append(ts.weekday() * 24 + ts.hour)
+                if len(buf["key"]) >= chunk_rows:
+                    spool.append(buf)
+                    for values in buf.values(): values.clear()
+            if buf["key"]: spool.append(buf)
+    finally:
+        wb.close()
+    return {**spool.close(), "file": path, "events": spool.rows, "rows": rows_read, "skipped": skipped}
+
+def iter_log_chunks(part):
+    return zip(*(iter_bin(os.path.join(part["dir"], f"{col}.bin"), dtype) for col, dtype in LOG_COLUMNS.items()))
+
+class EventHistogram:
+    """Histogram user x slot jam yang diisi per chunk (memori sebanding jumlah user, bukan event)."""
+    def __init__(self):
+        self.userids = np.empty(0, np.int64)
+        self.hist = np.zeros((0, SLOTS), dtype=np.int32)
+
+    def add(self, userids, slots):
+        new = np.setdiff1d(userids, self.userids)
+        if len(new):
+            # Baris user baru disisipkan supaya userids tetap urut
+            pos = np.searchsorted(self.userids, new)
+            self.userids = np.insert(self.userids, pos, new)
+            self.hist = np.insert(self.hist, pos, 0, axis=0)
+        rows = np.searchsorted(self.userids, userids)
+        np.add.at(self.hist.reshape(-1), rows * SLOTS + slots, 1)
+
+    def result(self):
+        return self.userids, self.hist.reshape(-1, 7, 24)
+
+def new_events(parts, key_sets):
+    """
+    Buang event yang key-nya sudah tercatat (snapshot lama / file lain di batch yang sama).
+    Dibaca per chunk dari spool: histogram langsung digabung, key baru per file disimpan
+    terurut di folder spool (mmap). Yang tersisa di memori hanya histogram (per user) dan
+    key 8 byte per event dari 1 file. Hasil: (userid, histogram, list array key, duplikat).
+    """
+    key_sets = list(key_sets)
+    histogram = EventHistogram()
+    added, dupes = [], 0
+    for i, part in enumerate(parts):
+        fresh_keys = []
+        for keys, users, slots in iter_log_chunks(part):
+            fresh = ~seen_mask(keys, key_sets)
+            dupes += int((~fresh).sum())
+            # Duplikat di dalam 1 file tetap dihitung (event berbeda di detik yang sama)
+            histogram.add(users[fresh], slots[fresh])
+            fresh_keys.append(np.unique(keys[fresh]))
+        path = os.path.join(part["dir"], f"fresh_keys-{i}.npy")
+        np.save(path, np.unique(np.concatenate(fresh_keys)) if fresh_keys else np.empty(0, np.uint64))
+        added.append(np.load(path, mmap_mode="r"))
+        key_sets.append(added[-1])
+    return (*histogram.result(), added, dupes)
+
+# --- GABUNG HASIL WORKER KE SNAPSHOT ---
+def merge_score_parts(parts, data_dir=DATA_DIR):
+    total = sum(p["rows"] for p in parts)
+    tmp_dir = new_table_dir("scores", data_dir)
+    columns = []
+    for i, (col, dtype) in enumerate(SCORE_COLUMNS.items()):
+        fname = f"{i}.npy"
+        out = np.lib.format.open_memmap(os.path.join(tmp_dir, fname), mode="w+", dtype=store_dtype(col, dtype), shape=(total,))
+        pos = 0
+        if dtype is None:
+            # Kode kategori lokal per file -> kode global
+            global_cats = {}
+            for part in parts:
+                remap = np.array([global_cats.setdefault(c, len(global_cats)) for c in part["categories"][col]] + [-1], dtype=np.int32)
+                for codes in iter_bin(os.path.join(part["dir"], f"{col}.bin"), np.int32):
+                    out[pos:pos + len(codes)] = remap[codes]  # -1 -> elemen terakhir (-1)
+                    pos += len(codes)
+            columns.append({"name": col, "kind": "cat", "file": fname, "categories": list(global_cats)})
+        else:
+            for part in parts:
+                for arr in iter_bin(os.path.join(part["dir"], f"{col}.bin"), dtype):
+                    out[pos:pos + len(arr)] = arr
+                    pos += len(arr)
+            columns.append({"name": col, "kind": "num", "file": fname})
+        out.flush()
+        del out
+
+    keys = [part_keys(p) for p in parts]
+    ids, content = (np.concatenate([k[i] for k in keys]) if keys else np.empty(0, np.uint64) for i in (0, 1))
+    index = write_row_index(tmp_dir, ids, content, np.arange(total))
+    meta = {
+        "version": SNAPSHOT_VERSION,
+        "rows": total,
+        "columns": columns,
+        "origin": "ingest",
+        "source": {"files": [os.path.basename(p["file"]) for p in parts]},
+        "index": [index],
+        "key_version": KEY_VERSION,
+    }
+    commit_table_dir("scores", tmp_dir, meta, data_dir)
+    return total
+
+def merge_log_parts(parts, data_dir=DATA_DIR):
+    userids, hist, keys, dupes = new_events(parts, [])
+    source = {"files": [os.path.basename(p["file"]) for p in parts]}
+    write_activity(userids, hist, None, data_dir, source=source, origin="ingest", keys=keys or [np.empty(0, np.uint64)])
+    return len(userids), dupes
+
+# --- APPEND (Export baru saja, data lama tidak disentuh) ---
+def load_key_sets(meta, tdir):
+    return [np.load(os.path.join(tdir, f), mmap_mode="r") for f in meta.get("keys", [])]
+
+def next_segment(meta):
+    return max(meta.get("segments", [0])) + 1 if meta.get("segments") else 1
+
+# Index identitas -> baris per segmen (base + tiap append), file urut key identitas:
+# cari baris live untuk export baru cukup searchsorted, kolom lama tidak dibaca.
+INDEX_FILES = ("index_keys.npy", "index_rows.npy", "index_content.npy")
+
+def write_row_index(tdir, ids, content, positions, seg=None):
+    order = np.argsort(ids, kind="stable")
+    files = [fname if seg is None else segment_file(fname, seg) for fname in INDEX_FILES]
+    for fname, values in zip(files, (ids[order], np.asarray(positions, dtype=np.int64)[order], content[order])):
+        np.save(os.path.join(tdir, fname), values)
+    return files
+
+def live_rows(meta, tdir, ids):
+    """
+    Baris live untuk identitas di ids (unik): (key identitas, posisi baris, key isi).
+    Segmen terbaru yang memuat identitas tsb menang (baris di segmen lebih lama sudah disembunyikan).
+    """
+    found_ids, positions, contents = [], [], []
+    pending = ids
+    for files in reversed(meta["index"]):
+        if not len(pending): break
+        keys, rows, content = (np.load(os.path.join(tdir, f), mmap_mode="r") for f in files)
+        lo, hi = np.searchsorted(keys, pending, "left"), np.searchsorted(keys, pending, "right")
+        found = hi > lo
+        if not found.any(): continue
+        counts = (hi - lo)[found]
+        idx = np.repeat(lo[found] - (np.cumsum(counts) - counts), counts) + np.arange(counts.sum())
+        found_ids.append(keys[idx])
+        positions.append(rows[idx])
+        contents.append(content[idx])
+        pending = pending[~found]
+    if not positions:
+        return np.empty(0, np.uint64), np.empty(0, np.int64), np.empty(0, np.uint64)
+    return np.concatenate(found_ids), np.concatenate(positions), np.concatenate(contents)
+
+def physical_rows(meta, tdir):
+    # Jumlah baris fisik (termasuk yang disembunyikan) = posisi awal segmen berikutnya (header .npy saja)
+    fname = meta["columns"][0]["file"]
+    files = [fname] + [segment_file(fname, seg) for seg in meta.get("segments", [])]
+    return sum(len(np.load(os.path.join(tdir, f), mmap_mode="r")) for f in files)
+
+def table_score_keys(meta, tdir):
+    # Key per baris fisik tabel (semua segmen), dihitung dari kolomnya
+    segs = meta.get("segments", [])
+    cols = {c["name"]: c for c in meta["columns"]}
+    load = lambda name: load_segments(tdir, cols[name]["file"], segs)
+    userid = load("userid")
+    missing = np.full(len(userid), np.nan)
+    ids = score_keys(userid, load("quizid"), load("quiz_attempt_number") if "quiz_attempt_number" in cols else missing)
+    state = cols.get("quiz_state", {})
+    if state.get("kind") == "cat":
+        state_codes, states = load("quiz_state"), state["categories"]
+    else:
+        state_codes, states = np.full(len(userid), -1, dtype=np.int32), []
+    grade = load("final_quiz_grade") if "final_quiz_grade" in cols else missing
+    return ids, content_keys(ids, state_codes, states, grade)
+
+def rebuild_row_index(meta, tdir):
+    # Snapshot dari CSV / key versi lama: index dibangun sekali dari kolomnya (baris live saja)
+    ids, content = table_score_keys(meta, tdir)
+    hidden = np.concatenate([np.load(os.path.join(tdir, f)) for f in meta.get("dropped", [])] or [np.empty(0, np.int64)])
+    live = np.delete(np.arange(len(ids)), hidden)
+    meta["index"] = [write_row_index(tdir, ids[live], content[live], live)]
+    meta["key_version"] = KEY_VERSION
+    for old in ("keys", "content_keys"): meta.pop(old, None)
+
+def csv_event_keys(data_dir, chunk_rows=500_000):
+    src = os.path.join(data_dir, LOGS_FILE)
+    keys = []
+    if not os.path.exists(src): return np.empty(0, np.uint64)
+    for chunk in pd.read_csv(src, usecols=["Time_parsed", "actor_userid", "Event name"], chunksize=chunk_rows):
+        ts = pd.to_datetime(chunk["Time_parsed"], errors="coerce")
+        valid = ts.notna() & chunk["actor_userid"].notna()
+        chunk = chunk[valid]
+        keys.append(np.fromiter((event_key(t, int(u), ev) for t, u, ev in zip(ts[valid], chunk["actor_userid"], chunk["Event name"])), dtype=np.uint64, count=len(chunk)))
+    return np.unique(np.concatenate(keys)) if keys else np.empty(0, np.uint64)
+
+def append_score_parts(parts, data_dir=DATA_DIR):
+    meta = read_meta("scores", data_dir)
+    if meta is None:
+        return {"score_rows": merge_score_parts(parts, data_dir), "score_rows_duplicate": 0, "score_rows_replaced": 0, "affected_classes": None}
+    tdir = table_dir("scores", data_dir)
+    if meta.get("key_version") != KEY_VERSION:
+        rebuild_row_index(meta, tdir)
+
+    # Data baru saja yang masuk memori (kolom per file export)
+    new = {col: [] for col in SCORE_COLUMNS}
+    ids, content = [], []
+    for part in parts:
+        part_ids, part_content = part_keys(part)
+        ids.append(part_ids)
+        content.append(part_content)
+        for col, dtype in SCORE_COLUMNS.items():
+            values = read_bin(part, col)
+            if dtype is None:
+                values = np.array(part["categories"][col] + [None], dtype=object)[values]
+            new[col].append(values)
+    new = {col: np.concatenate(v) if v else np.empty(0) for col, v in new.items()}
+    ids, content = (np.concatenate(k) if k else np.empty(0, np.uint64) for k in (ids, content))
+
+    # Attempt yang sama lebih dari sekali di export baru: versi terakhir yang dipakai,
+    # versi sebelumnya dihitung sebagai duplikat
+    _, last = np.unique(ids[::-1], return_index=True)
+    latest = np.sort(len(ids) - 1 - last)
+    dupes = len(ids) - len(latest)
+
+    # Dibandingkan dengan baris live attempt yang sama: isi sama = duplikat, beda = upsert
+    live_ids, live_pos, live_content = live_rows(meta, tdir, ids[latest])
+    fresh = latest[~np.isin(content[latest], live_content)]
+    dupes += len(latest) - len(fresh)
+    new, ids, content = {col: v[fresh] for col, v in new.items()}, ids[fresh], content[fresh]
+    rows = len(ids)
+    if not rows:
+        return {"score_rows": 0, "score_rows_duplicate": dupes, "score_rows_replaced": 0, "affected_classes": []}
+    start = physical_rows(meta, tdir)
+
+    # Segmen baru mengikuti kolom snapshot yang ada (snapshot CSV bisa beda kolom)
+    seg = next_segment(meta)
+    for col in meta["columns"]:
+        fname = os.path.join(tdir, segment_file(col["file"], seg))
+        values = new.get(col["name"])
+        if col["kind"] == "cat":
+            # Kategori baru ditambah di belakang, kode segmen lama tetap valid
+            lookup = {c: i for i, c in enumerate(col["categories"])}
+            if values is None: values = np.full(rows, None, dtype=object)
+            codes = np.fromiter((-1 if v is None or v != v else lookup.setdefault(v if isinstance(v, str) else str(v), len(lookup)) for v in values), dtype=np.int32, count=rows)
+            col["categories"] = list(lookup)
+            np.save(fname, codes)
+        else:
+            base_dtype = np.load(os.path.join(tdir, col["file"]), mmap_mode="r").dtype
+            if values is None or values.dtype == object:
+                values = np.zeros(rows) if base_dtype.kind in "biu" else np.full(rows, np.nan)
+            np.save(fname, np.asarray(values).astype(base_dtype))
+    hidden = live_pos[np.isin(live_ids, ids)]
+    if len(hidden):
+        # Upsert: baris live lama disembunyikan (kelasnya sama dengan baris baru)
+        drop_file = segment_file("dropped.npy", seg)
+        np.save(os.path.join(tdir, drop_file), np.sort(hidden))
+        meta.setdefault("dropped", []).append(drop_file)
+        meta["rows"] -= len(hidden)
+    meta["index"].append(write_row_index(tdir, ids, content, start + np.arange(rows), seg))
+
+    classes = sorted(set(pd.unique(new["courseshortname"]).tolist()) - {None})
+    meta.setdefault("segments", []).append(seg)
+    meta.setdefault("appends", []).append({"segment": seg, "rows": rows, "replaced": len(hidden), "files": [os.path.basename(p["file"]) for p in parts],
+                                           "classes": classes, "created": time.strftime("%Y-%m-%dT%H:%M:%S")})
+    meta["rows"] += rows
+    write_meta("scores", meta, data_dir)  # commit: segmen baru terlihat reader mulai dari sini
+    return {"score_rows": rows, "score_rows_duplicate": dupes, "score_rows_replaced": len(hidden), "affected_classes": classes}
+
+def append_log_parts(parts, data_dir=DATA_DIR):
+    meta = read_meta(ACTIVITY_TABLE, data_dir)
+    if meta is None:
+        users, dupes = merge_log_parts(parts, data_dir)
+        return {"activity_users": users, "log_rows_duplicate": dupes}
+    tdir = table_dir(ACTIVITY_TABLE, data_dir)
+    if not meta.get("keys"):
+        np.save(os.path.join(tdir, "keys.npy"), csv_event_keys(data_dir))
+        meta["keys"] = ["keys.npy"]
+
+    userids, hist, keys, dupes = new_events(parts, load_key_sets(meta, tdir))
+    if not len(userids):
+        return {"activity_users": 0, "log_rows_duplicate": dupes}
+    # Segmen = delta histogram user yang aktif di export baru (digabung saat load)
+    seg = next_segment(meta)
+    np.save(os.path.join(tdir, segment_file("userid.npy", seg)), userids)
+    np.save(os.path.join(tdir, segment_file("hist.npy", seg)), hist)
+    for i, part_keys in enumerate(keys):
+        key_file = segment_file(key_file_name(i), seg)
+        np.save(os.path.join(tdir, key_file), part_keys)
+        meta["keys"].append(key_file)
+
+    meta.setdefault("segments", []).append(seg)
+    meta.setdefault("appends", []).append({"segment": seg, "events": sum(len(k) for k in keys), "users": len(userids),
+                                           "files": [os.path.basename(p["file"]) for p in parts], "created": time.strftime("%Y-%m-%dT%H:%M:%S")})
+    write_meta(ACTIVITY_TABLE, meta, data_dir)
+    return {"activity_users": len(userids), "log_rows_duplicate": dupes}
+
+def compact_activity(data_dir=DATA_DIR):
+    """Gabung segmen append jadi 1 histogram (opsional, supaya load tetap cepat)."""
+    meta = read_meta(ACTIVITY_TABLE, data_dir)
+    if not meta or not meta.get("segments"): return False
+    from activity import read_activity
+    table = read_activity(data_dir)
+    tdir = table_dir(ACTIVITY_TABLE, data_dir)
+    keys = np.unique(np.concatenate([np.load(os.path.join(tdir, f)) for f in meta["keys"]]))
+    write_activity(np.asarray(table.userids), np.asarray(table.hist), None, data_dir, source=meta["source"], origin=meta.get("origin"), keys=keys)
+    return True
+
+# --- ENTRY POINT ---
+def find_exports(paths):
+    files = []
+    for path in paths:
+        files += sorted(glob.glob(os.path.join(path, "*.xlsx"))) if os.path.isdir(path) else [path]
+    logs = [f for f in files if os.path.basename(f).startswith("logs_")]
+    return [f for f in files if f not in logs], logs
+
+def run_workers(quiz_files, log_files, work_dir, workers, chunk_rows):
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        quiz_jobs = [pool.submit(ingest_quiz_file, f, work_dir, chunk_rows) for f in quiz_files]
+        log_jobs = [pool.submit(ingest_log_file, f, work_dir, chunk_rows) for f in log_files]
+        return [j.result() for j in quiz_jobs], [j.result() for j in log_jobs]
+
+def ingest(src=SRC_DIR, data_dir=DATA_DIR, workers=None, chunk_rows=CHUNK_ROWS, append=False):
+    """
+    Full ingest (append=False): snapshot scores & activity dibangun ulang dari src.
+    Append: src = file/folder export baru, ditambahkan ke snapshot yang ada.
+    """
+    quiz_files, log_files = find_exports([src] if isinstance(src, str) else src)
+    if not quiz_files and not log_files:
+        raise FileNotFoundError(f"Tidak ada file .xlsx di {src}")
+    t0 = time.time()
+    os.makedirs(os.path.join(data_dir, "snapshot"), exist_ok=True)
+    work_dir = tempfile.mkdtemp(prefix="ingest-", dir=os.path.join(data_dir, "snapshot"))
+    workers = workers or min(len(quiz_files) + len(log_files), os.cpu_count() or 1)
+    try:
+        quiz_parts, log_parts = run_workers(quiz_files, log_files, work_dir, workers, chunk_rows)
+        report = {"mode": "append" if append else "full", "workers": workers, "files": len(quiz_files) + len(log_files)}
+        if quiz_parts:
+            if append:
+                report.update(append_score_parts(quiz_parts, data_dir))
+            else:
+                report["score_rows"] = merge_score_parts(quiz_parts, data_dir)
+            report["score_rows_skipped"] = sum(p["skipped"] for p in quiz_parts)
+            report["rescaled_quizzes"] = {q: s for p in quiz_parts for q, s in p["scales"].items()}
+        if log_parts:
+            if append:
+                report.update(append_log_parts(log_parts, data_dir))
+            else:
+                report["activity_users"], report["log_rows_duplicate"] = merge_log_parts(log_parts, data_dir)
+            report["log_rows"] = sum(p["rows"] for p in log_parts)
+            report["log_rows_skipped"] = sum(p["skipped"] for p in log_parts)
+        report["seconds"] = round(time.time() - t0, 1)
+        return report
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--src", default=SRC_DIR, help="folder export .xlsx (full ingest)")
+    ap.add_argument("--append", nargs="+", metavar="XLSX", help="file/folder export baru, ditambahkan ke snapshot")
+    ap.add_argument("--compact", action="store_true", help="gabung segmen append histogram aktivitas")
+    ap.add_argument("--data-dir", default=DATA_DIR)
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    args = ap.parse_args()
+    if args.compact:
+        print("✅ Segmen aktivitas digabung" if compact_activity(args.data_dir) else "✅ Tidak ada segmen untuk digabung")
+    else:
+        report = ingest(args.append or args.src, args.data_dir, args.workers, args.chunk_rows, append=bool(args.append))
+        print(f"✅ Ingest selesai: {report}")
@@ -0,0 +1,13 @@
+# json_response.py
+import orjson
+from fastapi.responses import JSONResponse
+
+class FastJSONResponse(JSONResponse):
+    """
+    Response JSON via orjson (jauh lebih cepat dari json bawaan untuk list besar).
+    Scalar/array numpy langsung didukung, jadi hasil pandas tidak perlu dikonversi.
+    Kembalikan instance-nya langsung dari endpoint supaya FastAPI tidak
+    menjalankan jsonable_encoder dulu.
+    """
+    def render(self, content):
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
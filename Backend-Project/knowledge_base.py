@@ -1,41 +1,120 @@
 # knowledge_base.py
+import json
+import os
+import threading
+import time
+from collections import deque
 
-# Kamus Video (Berdasarkan Data yang Anda Berikan)
-VIDEO_DB = {
-    # --- LOGIKA MATEMATIKA ---
-    "Proposisi": ["U5eWAywK1Mo"],
-    "Predikat": ["XY5koUZMV2Q", "sDkqHWixI30"],
-    "Pemrograman Logika": ["gxIMC0rBeno"],
-    "Matematika SMA": ["4XPmXP2LtX4"],
-    "Pembuktian": ["2FI9CaBkrQg", "O53d4eU2YR0"],
-    "Induksi": ["eV-r_EnD7ec", "tHNVX3e9zd0", "ptivxK4duyk"],
-    "Himpunan": ["iWxbTkL1XUg", "2Jnop1XF9I0"],
-    
-    # --- MATEMATIKA DISKRIT ---
-    "Relasi": ["2EXkd9booXE", "79DUDA-EGH0", "RPA3NYn9syE"],
-    "Fungsi": ["EWe3_gkQ1DY", "MXiD6i4G8sg"],
-    "Rekurensi": ["Z9s-Q664ORU", "gI4sv5wB_Ck"],
-    "Berhitung": ["aHry-lRSEpE", "eRPCRoBiFxA"],
-    "Sarang Merpati": ["Y1SyrMEO-HA"],
-    "Permutasi": ["OzNqLkWzerw", "YG835TfQPPY"],
-    "Kombinasi": ["OzNqLkWzerw"],
-    "Graf": ["DkL3EoRgeq4", "p4r7GPAZaLs", "YOKyNy4mjd0", "Xqevm8rGY_A", "5-LN8GdJ2qE"],
-    "Pohon": ["_PYAYCQo8mk", "MaQZ4Ws9hBY", "qC8GcUkuX0A"],
-    "Teori Bilangan": ["egJvN0asZvI", "CJ7Fr3Zb5UQ", "oBoBwuO2xGs"]
-}
+from cache import LRUCache
+from metrics import phase
 
-def get_curated_videos(topic_name):
+# Kamus Video dibaca dari data/knowledge_base.json (urutan di file = prioritas).
+# File bisa diedit tanpa redeploy: perubahan terdeteksi otomatis lewat mtime.
+KB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "knowledge_base.json")
+RELOAD_CHECK_SECONDS = 2.0
+
+class TopicMatcher:
     """
-    Mencari video spesifik berdasarkan kata kunci di nama topik.
-    Mengembalikan list object materi.
+    Aho-Corasick sederhana: semua keyword dicocokkan dalam 1x scan nama topik,
+    jadi waktu cocok tidak bergantung jumlah keyword di katalog.
+    Mengembalikan index keyword pertama (prioritas tertinggi) yang muncul.
     """
-    found_videos = []
-    topic_lower = topic_name.lower()
-    
-    for key, video_ids in VIDEO_DB.items():
-        # Cek apakah keyword (misal 'Pohon') ada di nama topik user (misal 'Pohon Bagian 2')
-        if key.lower() in topic_lower:
-            for vid in video_ids[:2]: # Ambil maksimal 2 video per topik biar ga penuh
+    def __init__(self, keywords):
+        self.goto = [{}]
+        self.best = [None]  # index keyword terkecil yang berakhir di node ini
+        for i, kw in enumerate(keywords):
+            if not kw: continue
+            node = 0
+            for ch in kw:
+                nxt = self.goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[node][ch] = nxt
+                    self.goto.append({})
+                    self.best.append(None)
+                node = nxt
+            if self.best[node] is None:
+                self.best[node] = i
+
+        # Failure link (BFS), sekalian gabungkan prioritas dari suffix
+        self.fail = [0] * len(self.goto)
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self.goto[node].items():
+                queue.append(nxt)
+                f = self.fail[node]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                inherited = self.best[self.fail[nxt]]
+                if inherited is not None and (self.best[nxt] is None or inherited < self.best[nxt]):
+                    self.best[nxt] = inherited
+
+    def first_match(self, text):
+        node, found = 0, None
+        for ch in text:
+            while node and ch not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(ch, 0)
+            hit = self.best[node]
+            if hit is not None and (found is None or hit < found):
+                found = hit
+                if found == 0: break
+        return found
+
+class KnowledgeBase:
+    def __init__(self, path):
+        self.path = path
+        self.mtime_ns = None
+        self.catalog = ([], TopicMatcher([]))  # (entries, matcher), diganti sekaligus
+        self.cache = LRUCache("kb_topic", maxsize=4096)
+        self._lock = threading.Lock()
+        self._last_check = 0.0
+        self.reload()
+
+    def reload(self):
+        mtime_ns = None
+        try:
+            mtime_ns = os.stat(self.path).st_mtime_ns
+            with open(self.path, encoding="utf-8") as f:
+                entries = json.load(f)["topics"]
+            matcher = TopicMatcher([e["keyword"].lower() for e in entries])
+        except (OSError, ValueError, KeyError) as e:
+            # File rusak/hilang -> tetap pakai katalog terakhir yang valid
+            print(f"⚠️ Knowledge base gagal di-load: {e}")
+            # Catat mtime supaya tidak dicoba ulang sampai file diubah lagi
+            self.mtime_ns = mtime_ns
+            return False
+        # Swap sekaligus, request yang sedang jalan tetap pakai objek lama
+        self.catalog, self.mtime_ns = (entries, matcher), mtime_ns
+        self.cache.clear()
+        return True
+
+    def maybe_reload(self):
+        now = time.monotonic()
+        if now - self._last_check < RELOAD_CHECK_SECONDS: return
+        with self._lock:
+            if now - self._last_check < RELOAD_CHECK_SECONDS: return
+            self._last_check = now
+            try:
+                changed = os.stat(self.path).st_mtime_ns != self.mtime_ns
+            except OSError:
+                changed = False
+            if changed:
+                self.reload()
+
+    def lookup(self, topic_name):
+        self.maybe_reload()
+        cached = self.cache.get(topic_name)
+        if cached is not None: return cached
+
+        entries, matcher = self.catalog
+        found_videos = []
+        i = matcher.first_match(topic_name.lower())
+        if i is not None:
+            key = entries[i]["keyword"]
+            for vid in entries[i]["videos"][:2]: # Ambil maksimal 2 video per topik biar ga penuh
                 found_videos.append({
                     "title": f"Video Spesifik: {key}",
                     "type": "Specific_Video", # Tipe Khusus untuk Frontend Grid
@@ -43,7 +122,15 @@ def get_curated_videos(topic_name):
                     "thumbnail": f"https://img.youtube.com/vi/{vid}/0.jpg",
                     "video_id": vid
                 })
-            # Jika sudah ketemu kategorinya, stop pencarian agar tidak duplikat
-            break
-            
-    return found_videos
\ No newline at end of file
+        self.cache.set(topic_name, found_videos)
+        return found_videos
+
+knowledge_base = KnowledgeBase(KB_PATH)
+
+def get_curated_videos(topic_name):
+    """
+    Mencari video spesifik berdasarkan kata kunci di nama topik.
+    Mengembalikan list object materi (keyword yang lebih atas di file menang).
+    """
+    with phase("kb"):
+        return knowledge_base.lookup(topic_name)
@@ -0,0 +1,111 @@
+# llm.py
+# Wrapper Gemini untuk endpoint chat. Panggilan SDK Gemini bersifat sinkron,
+# jadi dijalankan di thread pool terbatas (dengan antrian + timeout) supaya
+# event loop tidak ke-block saat menunggu jawaban AI.
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import google.generativeai as genai
+
+from metrics import phase
+
+# ==========================================
+# KONFIGURASI GEMINI AI (LEWAT SECRET)
+# ==========================================
+# Baca dari Environment Variable (Secret di Hugging Face)
+api_key = os.getenv("GEMINI_API_KEY")
+
+if not api_key:
+    # Fallback untuk di laptop lokal (Ganti dengan key baru Anda jika testing lokal)
+    api_key = "AIzaSy..."
+
+MODEL_NAME = "gemini-2.5-flash"
+# Maksimal panggilan Gemini yang jalan bersamaan & batas waktu per jawaban
+CHAT_CONCURRENCY = int(os.getenv("GEMINI_CHAT_CONCURRENCY", "8"))
+CHAT_TIMEOUT = float(os.getenv("GEMINI_CHAT_TIMEOUT", "30"))
+
+FALLBACK_REPLY = "Maaf, saya sedang pusing (Koneksi ke AI bermasalah). Coba tanya lagi nanti ya!"
+
+# --- STUB MODEL (Untuk testing lokal tanpa API Key) ---
+class _StubResponse:
+    def __init__(self, text):
+        self.text = text
+
+class _StubChat:
+    def __init__(self, delay):
+        self.delay = delay
+
+    def send_message(self, content, stream=False):
+        question = str(content).rsplit("USER BERTANYA:", 1)[-1].strip()
+        words = f"(stub) Kamu bertanya: {question}".split(" ")
+        if not stream:
+            time.sleep(self.delay)
+            return _StubResponse(" ".join(words))
+        return self._stream(words)
+
+    def _stream(self, words):
+        for i, word in enumerate(words):
+            time.sleep(self.delay / len(words))
+            yield _StubResponse(word if i == 0 else f" {word}")
+
+class StubModel:
+    """Pengganti genai.GenerativeModel, aktif jika GEMINI_STUB=1."""
+    def __init__(self, delay=0.0):
+        self.delay = delay
+
+    def start_chat(self, history=None):
+        return _StubChat(self.delay)
+
+if os.getenv("GEMINI_STUB") == "1":
+    model = StubModel(delay=float(os.getenv("GEMINI_STUB_DELAY", "0")))
+else:
+    genai.configure(api_key=api_key)
+    model = genai.GenerativeModel(MODEL_NAME)
+
+# Thread pool khusus Gemini: jumlah thread = batas concurrency
+_executor = ThreadPoolExecutor(max_workers=CHAT_CONCURRENCY, thread_name_prefix="gemini")
+# Request yang melebihi batas menunggu di sini (antri), bukan menumpuk thread
+_semaphore = asyncio.Semaphore(CHAT_CONCURRENCY)
+
+def _send(prompt):
+    chat = model.start_chat(history=[])
+    return chat.send_message(prompt).text
+
+async def ask(prompt):
+    """Kirim prompt ke Gemini tanpa mem-block event loop. Raise TimeoutError jika lewat batas."""
+    loop = asyncio.get_running_loop()
+    async with _semaphore:
+        with phase("gemini"):
+            return await asyncio.wait_for(loop.run_in_executor(_executor, _send, prompt), CHAT_TIMEOUT)
+
+async def ask_stream(prompt):
+    """Async generator potongan teks jawaban Gemini (stream=True)."""
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    done = object()
+
+    def worker():
+        try:
+            chat = model.start_chat(history=[])
+            for chunk in chat.send_message(prompt, stream=True):
+                if chunk.text:
+                    loop.call_soon_threadsafe(queue.put_nowait, chunk.text)
+            loop.call_soon_threadsafe(queue.put_nowait, done)
+        except Exception as e:
+            loop.call_soon_threadsafe(queue.put_nowait, e)
+
+    async with _semaphore:
+        with phase("gemini"):  # total durasi stream sampai potongan terakhir
+            loop.run_in_executor(_executor, worker)
+            while True:
+                # Timeout dihitung per potongan, bukan total durasi stream
+                item = await asyncio.wait_for(queue.get(), CHAT_TIMEOUT)
+                if item is done: break
+                if isinstance(item, Exception): raise item
+                yield item
+
+def sse_event(payload):
+    return f"data: {json.dumps(payload)}\n\n"
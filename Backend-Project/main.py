@@ -2,47 +2,53 @@ from knowledge_base import get_curated_videos # <-- Tambahkan ini
 from fastapi import FastAPI, HTTPException, Query, Request, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from pydantic import BaseModel
-from passlib.context import CryptContext
+from pydantic import BaseModel, conint
+from typing import List, Literal, Optional
 from sqlalchemy.orm import Session
 import pandas as pd
 import pickle
+import copy
+import base64
+import csv
+import functools
+import hashlib
+import io
+import json
 import os
 import math
 import numpy as np
 import random
 import re
-from database import Base, engine, SessionLocal, UserDB
-import google.generativeai as genai # LIBRARY BARU
-# ==========================================
-# KONFIGURASI GEMINI AI (PASTE KEY DISINI)
-# ==========================================
-# Ganti teks di bawah dengan API Key 
-# ==========================================
-# KONFIGURASI GEMINI AI (LEWAT SECRET)
-# ==========================================
-# Baca dari Environment Variable (Secret di Hugging Face)
-api_key = os.getenv("GEMINI_API_KEY") 
-
-if not api_key:
-    # Fallback untuk di laptop lokal (Ganti dengan key baru Anda jika testing lokal)
-    api_key = "AIzaSy..." 
-
-genai.configure(api_key=api_key)
-
-# Setup Model - GANTI KE 1.5 FLASH (Versi Paling Stabil di Cloud)
-model = genai.GenerativeModel('gemini-2.5-flash')
+from database import AsyncSessionLocal, Base, engine, SessionLocal, UserDB, get_async_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from data_index import GroupedTable, RowIndex
+from snapshot import DATA_DIR, TABLES, load_table, read_columns, read_meta, table_dir, write_columns
+from activity import LOGS_FILE, TABLE_NAME as ACTIVITY_TABLE, ActivityTable, load_activity, empty_activity
+from dataplane import PLANE_ENABLED, current_file, open_plane, publish
+from data_store import DataStore
+from security import DEFAULT_STUDENT_PASSWORD, HashPoolBusy, hash_password, hash_pool_stats, pending_hash_jobs, verify_password
+from seed import seed_users
+from cache import LRUCache, cache_stats
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
+from json_response import FastJSONResponse
+from metrics import MetricsMiddleware, phase, render_metrics, render_samples
+from profiler import PROFILING_ENABLED, ProfiledRoute, ProfilerMiddleware, list_profiles, profile_path
+import llm # Konfigurasi Gemini (API Key, model, thread pool) ada di llm.py
+import orjson
 
 # 1. SETUP
-app = FastAPI(title="EduPulse API", version="13.0 - Smart Context")
+app = FastAPI(title="EduPulse API", version="13.0 - Smart Context", default_response_class=FastJSONResponse)
+if PROFILING_ENABLED:
+    app.router.route_class = ProfiledRoute # Endpoint sync bisa ikut diprofile (lihat profiler.py)
 
 app.add_middleware(
     CORSMiddleware, allow_origins=["*"], allow_credentials=True, 
     allow_methods=["*"], allow_headers=["*"],
 )
+# Latency per route, in-flight & error count -> GET /metrics
+app.add_middleware(MetricsMiddleware)
 
 Base.metadata.create_all(bind=engine)
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 def get_db():
@@ -51,49 +57,66 @@ def get_db():
     finally: db.close()
 
 # 2. LOAD DATA
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-DATA_DIR = os.path.join(BASE_DIR, "data")
-
-try:
-    user_df = pd.read_csv(os.path.join(DATA_DIR, "user_level_features_final_for_ML.csv"))
-    score_df = pd.read_csv(os.path.join(DATA_DIR, "merged_score_data_cleaned.csv"), dtype={'final_quiz_grade': str})
-    
-    # Load Logs & Rename
-    logs_path = os.path.join(DATA_DIR, "merged_logs_data_cleaned.csv")
-    logs_df = pd.read_csv(logs_path, usecols=['actor_userid', 'Time_parsed'])
-    logs_df.rename(columns={'actor_userid': 'userid'}, inplace=True)
-    logs_df['hour'] = pd.to_datetime(logs_df['Time_parsed'], errors='coerce').dt.hour
-
-    # Cleaning
-    def clean_decimal(val):
-        if pd.isna(val): return np.nan
-        val_str = str(val).strip().replace(',', '.')
-        try: return float(val_str)
-        except: return np.nan
-
-    score_df['final_quiz_grade'] = score_df['final_quiz_grade'].apply(clean_decimal)
-    score_df['courseshortname'] = score_df['courseshortname'].astype(str).str.strip()
-    
-    with open(os.path.join(DATA_DIR, "recommendation_engine.pkl"), "rb") as f:
+# DATA_DIR default folder data/, bisa diganti lewat env EDUPULSE_DATA_DIR (lihat snapshot.py)
+# Semua data turunan disimpan di 1 objek Dataset (lihat bawah) yang bisa di-reload
+# tanpa restart lewat DataStore (data_store.py)
+# Multi-worker: EDUPULSE_DATA_PLANE=1 -> worker attach (mmap) ke Dataset yang dipublish dataplane.py
+ENGINE_FILE = "recommendation_engine.pkl"
+
+def read_data_tables(data_dir=DATA_DIR):
+    # Load dari snapshot kolom (mmap), fallback ke CSV jika snapshot belum ada / basi
+    # Cleaning nilai (koma desimal, strip kode kelas) sudah dilakukan di snapshot.py
+    user_df = load_table("users", data_dir)
+    score_df = load_table("scores", data_dir)
+    # Log aktivitas cukup disimpan sebagai histogram jam per user (bukan per baris)
+    activity = load_activity(data_dir)
+
+    with open(os.path.join(data_dir, ENGINE_FILE), "rb") as f:
         ml_data = pickle.load(f)
         cluster_labels = ml_data["cluster_labels"]
 
     if 'performance_category' not in user_df.columns:
         user_df['performance_category'] = user_df['mean_score_pct'].apply(lambda x: "High" if x>=80 else "Medium" if x>=60 else "Low")
-
-    print("✅ Data Loaded Successfully!")
-    
-except Exception as e:
-    print(f"❌ Error: {e}")
-    user_df, score_df, logs_df, cluster_labels = pd.DataFrame(), pd.DataFrame(), pd.DataFrame(), {}
+    return user_df, score_df, activity, cluster_labels
+
+REQUIRED_COLUMNS = {
+    "users": ['userid', 'cluster', 'mean_score_pct', 'engagement_score', 'performance_category'],
+    "scores": ['userid', 'courseshortname', 'coursefullname', 'quizid', 'quizname', 'final_quiz_grade'],
+}
+
+def validate_tables(user_df, score_df, cluster_labels):
+    # Data baru yang rusak ditolak sebelum menggantikan data yang sedang dipakai
+    for name, df in (("users", user_df), ("scores", score_df)):
+        if df.empty: raise ValueError(f"Tabel {name} kosong")
+        missing = [c for c in REQUIRED_COLUMNS[name] if c not in df.columns]
+        if missing: raise ValueError(f"Kolom {name} tidak ditemukan: {missing}")
+    if user_df['userid'].isna().any(): raise ValueError("Ada userid kosong di tabel users")
+    if not cluster_labels: raise ValueError("cluster_labels kosong")
 
 # --- HELPER FUNCTIONS ---
+def grade_values(grades):
+    # Nilai float32 (lihat snapshot.compact_dtypes) -> float64: 18.95 tersimpan 18.9500008,
+    # dibulatkan ke 5 desimal (selisih float32 < 4e-6 untuk nilai < 128) supaya rata-rata
+    # & pembulatan hasilnya sama persis dengan nilai float64 hasil parse CSV
+    vals = np.asarray(grades)
+    return np.round(vals.astype(float), 5) if vals.dtype == np.float32 else vals.astype(float)
+
 def fix_grade_value(grade):
     if pd.isna(grade): return 0
     val = float(grade)
+    if val == np.float32(val): val = round(val, 5)  # nilai asal float32, lihat grade_values
     if val > 100: return 100.0
     return round(val, 1)
 
+def fix_grade_column(grades):
+    # Versi vektor dari fix_grade_value untuk 1 kolom: NaN -> 0, >100 -> 100, bulat 1 desimal
+    vals = grade_values(grades)
+    rounded = np.round(vals, 1)
+    # np.round membulatkan x.x5 ke genap (38.45 -> 38.4), round() Python tidak -> samakan hasilnya
+    ties = np.flatnonzero(np.abs(vals * 10 % 1 - 0.5) < 1e-6)
+    rounded[ties] = [round(v, 1) for v in vals[ties].tolist()]
+    return np.where(np.isnan(vals), 0.0, np.where(vals > 100, 100.0, rounded))
+
 def clean_course_name(full_name):
     # Mengambil nama mata kuliah bersih tanpa kode dosen
     # Contoh: "MATEMATIKA DISKRIT IF-48-01 [DTO]" -> "Matematika Diskrit"
@@ -122,29 +145,412 @@ def generate_search_query(course, topic):
     # Contoh: "Tutorial Matematika Diskrit materi Pohon"
     return f"{course} materi {clean_topic}"
 
-# --- SEEDING & AUTH (SAMA SEPERTI SEBELUMNYA) ---
-def seed_users():
-    db = SessionLocal()
-    if not db.query(UserDB).filter(UserDB.username == "admin").first():
-        db.add(UserDB(username="admin", hashed_password=pwd_context.hash("admin123"), role="admin", full_name="Administrator"))
-    if not user_df.empty:
-        sample_id = str(user_df.iloc[0]['userid'])
-        if not db.query(UserDB).filter(UserDB.username == sample_id).first():
-            for _, row in user_df.iterrows():
-                uid = str(int(row['userid']))
-                if not db.query(UserDB).filter(UserDB.username == uid).first():
-                    db.add(UserDB(username=uid, hashed_password=pwd_context.hash("mhs123"), role="student", full_name=f"Mahasiswa {uid}", learning_style="Visual", interest="Computer Science"))
-            db.commit()
-    db.close()
-seed_users()
+# --- GROUPING KUIS UNTUK CHART (Dihitung sekali saat data di-load) ---
+def quiz_group_columns(quiz_names):
+    """
+    Versi vektor dari logika grouping chart: group_key, sort_val & label tampilan.
+    Dihitung per nama kuis unik lalu di-map ke semua baris.
+    """
+    # Kolom Categorical: factorize cukup memakai kodenya, tanpa hash per baris
+    codes, raw_names = pd.factorize(quiz_names, use_na_sentinel=False)
+    names = pd.Series([str(x) for x in raw_names], dtype=object)
+
+    # 1. LOGIKA GROUPING AGRESIF: semua varian UTS/UAS digabung jadi satu,
+    #    "Online Quiz 1: Logika (Remedial)" -> "Online Quiz 1: Logika"
+    is_uts = names.str.contains("Midterm", regex=False) | names.str.contains("UTS", regex=False)
+    is_uas = names.str.contains("Final", regex=False) | names.str.contains("UAS", regex=False)
+    is_quiz = names.str.contains("Online Quiz", regex=False)
+    group_key = pd.Series(np.select(
+        [is_uts, is_uas, is_quiz],
+        ["UTS", "UAS", names.str.split("(", n=1).str[0].str.strip()],
+        default=names,
+    ), dtype=object)
+
+    # 2. LOGIKA SORTING (Quiz Angka -> UTS -> UAS), quiz tanpa angka = 500
+    lower = group_key.str.lower()
+    first_num = pd.to_numeric(group_key.str.extract(r'(\d+)', expand=False), errors='coerce').fillna(500)
+    sort_val = np.select([lower == "uts", lower == "uas"], [1000, 2000], default=first_num).astype(np.int64)
+
+    # 3. FORMAT LABEL TAMPILAN: "Online Quiz 1: Logika" -> "Q1: Logika" (topik maks 15 huruf)
+    parts = group_key.str.replace("Online Quiz", "Q", regex=False).str.split(":")
+    head = parts.str[0].str.strip()
+    topic = parts.str[1].str.strip().str[:15]
+    quiz_label = np.select(
+        [group_key.isin(["UTS", "UAS"]), group_key.str.contains("Online Quiz", regex=False) & topic.notna(), group_key.str.contains("Online Quiz", regex=False)],
+        [group_key, head + ": " + topic, head],
+        default=group_key.str[:15],
+    )
+
+    table = pd.DataFrame({"group_key": group_key.to_numpy(), "sort_val": sort_val, "quiz_label": quiz_label})
+    return table.take(codes).set_index(quiz_names.index)
+
+QUIZ_DETAIL_FIELDS = ["quiz_name", "full_name", "score"]
+
+def build_quiz_detail_table(score_df):
+    # Hasil: userid -> record chart siap kirim (urut kelas lalu sort_val), difilter per kelas saat request
+    if score_df.empty: return GroupedTable.empty(["class_id"] + QUIZ_DETAIL_FIELDS)
+    df = score_df[['userid', 'courseshortname', 'final_quiz_grade']].join(quiz_group_columns(score_df['quizname']))
+
+    # GROUP BY & AMBIL NILAI MAX (Tryout 60, Real 80, Remedial 70 -> 80)
+    grouped = df.groupby(['userid', 'courseshortname', 'group_key', 'sort_val', 'quiz_label'], sort=False, observed=True)['final_quiz_grade'].max().reset_index()
+    grouped = grouped.sort_values(['userid', 'courseshortname', 'sort_val', 'group_key'], kind='stable')
+
+    table = pd.DataFrame({
+        "userid": grouped['userid'].to_numpy(),
+        "class_id": grouped['courseshortname'].to_numpy(),
+        "quiz_name": grouped['quiz_label'].to_numpy(),  # Label Pendek (X-Axis)
+        "full_name": grouped['group_key'].to_numpy(),   # Nama Lengkap (Tooltip)
+        "score": fix_grade_column(grouped['final_quiz_grade']),
+    })
+    return GroupedTable.from_frame(table, "userid", ["class_id"] + QUIZ_DETAIL_FIELDS)
+
+# --- AGREGAT ADMIN (Materialized per snapshot data, refresh per kelas) ---
+STUDENT_FIELDS = ["id", "cluster", "status", "score", "activities"]
+
+class AdminAggregates:
+    """
+    Hasil /api/admin/summary, /api/admin/classes & /api/admin/students_by_class
+    dihitung sekali per snapshot data (1 groupby untuk semua kelas). Jika hanya
+    sebagian baris nilai berubah, pakai updated() untuk menghitung ulang kelas
+    yang terdampak saja.
+    """
+    def __init__(self, user_df, score_df, cluster_labels):
+        self.cluster_labels = cluster_labels
+        self.refresh_users(user_df)
+        self.class_list = self._class_stats(score_df)  # record kelas, urut class_id lalu coursefullname
+        self.students = GroupedTable.from_frame(self._class_students(score_df), "class_id", STUDENT_FIELDS)  # urut skor tertinggi
+        self.student_courses = self._student_courses()
+
+    @classmethod
+    def attach(cls, user_df, cluster_labels, class_list, students, student_courses=None):
+        # Dari data plane (lihat Dataset.attach), tanpa groupby ulang
+        aggs = cls.__new__(cls)
+        aggs.cluster_labels, aggs.class_list, aggs.students = cluster_labels, class_list, students
+        aggs.student_courses = student_courses if student_courses is not None else aggs._student_courses()  # plane versi lama
+        aggs.refresh_users(user_df)
+        return aggs
+
+    def _student_courses(self):
+        # userid -> posisi baris di self.students (urut class_id), untuk export per mahasiswa
+        return GroupedTable.positions(self.students.columns["id"])
+
+    def updated(self, score_df, class_idx, class_ids):
+        # Salinan dengan kelas tertentu dihitung ulang; objek lama tetap utuh untuk request yang masih jalan
+        changed = set(class_ids)
+        rows = np.sort(np.concatenate([class_idx.get_positions(c) for c in changed] + [np.empty(0, dtype=np.intp)]))
+        class_data = score_df.iloc[rows]
+        aggs = copy.copy(self)
+        kept = [c for c in self.class_list if c["class_id"] not in changed]
+        aggs.class_list = sorted(kept + self._class_stats(class_data), key=lambda c: c["class_id"])
+        students = self.students.to_frame("class_id")
+        students = pd.concat([students[~students["class_id"].isin(changed)], self._class_students(class_data)], ignore_index=True)
+        aggs.students = GroupedTable.from_frame(students, "class_id", STUDENT_FIELDS)
+        aggs.student_courses = aggs._student_courses()
+        return aggs
+
+    def refresh_users(self, user_df):
+        self.user_info = user_df[['userid', 'cluster', 'performance_category']] if not user_df.empty else None
+        if user_df.empty:
+            self.summary = {"total_students": 0, "avg_gpa": 0, "at_risk_count": 0}
+        else:
+            self.summary = {"total_students": len(user_df), "avg_gpa": round(user_df["mean_score_pct"].mean() / 25, 2), "at_risk_count": len(user_df[user_df["performance_category"] == "Low"])}
+
+    def _class_stats(self, score_df):
+        if score_df.empty: return []
+        # observed=True: kelas/kuis Categorical hanya kombinasi yang ada di data
+        score_df = score_df.assign(final_quiz_grade=grade_values(score_df['final_quiz_grade']))
+        student_avgs = score_df.groupby(['courseshortname', 'coursefullname', 'userid'], observed=True)['final_quiz_grade'].mean().reset_index()
+        class_stats = student_avgs.groupby(['courseshortname', 'coursefullname'], observed=True).agg(student_count=('userid', 'count'), class_avg_score=('final_quiz_grade', 'mean')).reset_index()
+        return pd.DataFrame({
+            "class_id": class_stats['courseshortname'],
+            "class_name": class_stats['coursefullname'].map(clean_course_name),
+            "student_count": class_stats['student_count'],
+            "avg_score": fix_grade_column(class_stats['class_avg_score']),
+        }).to_dict("records")
+
+    def _class_students(self, score_df):
+        if self.user_info is None or score_df.empty: return pd.DataFrame(columns=["class_id"] + STUDENT_FIELDS)
+        score_df = score_df.assign(final_quiz_grade=grade_values(score_df['final_quiz_grade']))
+        user_stats = score_df.groupby(['courseshortname', 'userid'], observed=True).agg(avg_grade=('final_quiz_grade', 'mean'), activity_count=('quizid', 'count')).reset_index()
+        # _pos: urutan baris user_info, jadi skor seri tetap urut seperti merge per kelas
+        merged = pd.merge(self.user_info.assign(_pos=np.arange(len(self.user_info))), user_stats, on='userid', how='inner')
+        scores = fix_grade_column(merged['avg_grade'])
+        result = pd.DataFrame({
+            "class_id": merged['courseshortname'],
+            "id": merged['userid'],
+            "cluster": merged['cluster'].map(self.cluster_labels).fillna("Unknown"),
+            "status": np.where(scores < 50, "Berisiko", "Aman"),
+            "score": scores,
+            "activities": merged['activity_count'],
+            "_pos": merged['_pos'],
+        })
+        return result.sort_values(["class_id", "score", "_pos"], ascending=[True, False, True]).drop(columns="_pos")
+
+# --- POOL MENTOR & PEER (Untuk rekomendasi, dihitung sekali saat load) ---
+MENTOR_MIN_GRADE = 85
+
+def build_mentor_pool(score_df):
+    # class_id -> userid unik yang punya nilai > 85 di kelas tsb (urut kemunculan)
+    if score_df.empty: return GroupedTable.empty(["userid"])
+    experts = score_df.loc[score_df['final_quiz_grade'] > MENTOR_MIN_GRADE, ['courseshortname', 'userid']].drop_duplicates()
+    return GroupedTable.from_frame(experts, 'courseshortname', ['userid'])
+
+def build_peer_pool(user_df):
+    # cluster -> userid anggota cluster tsb
+    if user_df.empty: return GroupedTable.empty(["userid"])
+    return GroupedTable.from_frame(user_df, 'cluster', ['userid'])
+
+def draw_sample(pool, k, rng):
+    """Ambil k elemen acak tanpa pengembalian, O(k) berapapun ukuran pool."""
+    n = len(pool)
+    if n <= k: return list(pool)
+    picked = {}
+    while len(picked) < k:
+        picked.setdefault(rng.randrange(n), None)
+    return [pool[i] for i in picked]
+
+# --- KONTEKS CHAT (Kuis terlemah dihitung sekali saat load, teks disusun per request) ---
+def build_weakest_quiz(score_df):
+    # userid -> teks kuis nilai terendah (> 0) untuk blok konteks EduBot
+    if score_df.empty: return GroupedTable.empty(["weakness"])
+    valid = score_df[score_df['final_quiz_grade'] > 0].sort_values('final_quiz_grade', kind='stable')
+    worst_rows = valid.drop_duplicates('userid')
+    weakness = [
+        f"{clean_course_name(c_full)} (Topik: {extract_topic_from_quiz(quiz)}, Nilai: {fix_grade_value(grade)})"
+        for c_full, quiz, grade in zip(worst_rows['coursefullname'], worst_rows['quizname'], worst_rows['final_quiz_grade'])
+    ]
+    return GroupedTable.from_frame(pd.DataFrame({"userid": worst_rows['userid'].to_numpy(), "weakness": weakness}), "userid", ["weakness"])
+
+# --- DATASET (Semua data turunan 1 snapshot, diganti utuh saat reload) ---
+class Dataset:
+    """
+    Tabel, index & agregat hasil 1 kali load. Tidak diubah setelah dibangun:
+    reload membuat Dataset baru lalu ditukar (lihat data_store.py). Endpoint
+    mengambil store.current sekali di awal request.
+    """
+    generation = 0  # diisi DataStore saat swap
+
+    def __init__(self, user_df, score_df, activity, cluster_labels, meta=None, previous=None):
+        self.user_df, self.score_df, self.activity, self.cluster_labels = user_df, score_df, activity, cluster_labels
+        self.meta = meta or {}  # meta snapshot per tabel, untuk reload inkremental
+        # Lookup per user/kelas jadi O(baris milik user) bukan scan seluruh DataFrame
+        self.user_idx = RowIndex(user_df, "userid")
+        self.score_user_idx = RowIndex(score_df, "userid")
+        self.score_class_idx = RowIndex(score_df, "courseshortname")
+        self.quiz_detail_table = build_quiz_detail_table(score_df)
+
+        classes = appended_classes(previous, self) if previous is not None else None
+        if classes is None:
+            self.admin_aggs = AdminAggregates(user_df, score_df, cluster_labels)
+        else:
+            # Hanya ada segmen nilai baru (ingest.py --append) -> kelas terdampak saja
+            self.admin_aggs = previous.admin_aggs.updated(score_df, self.score_class_idx, classes)
+
+        self.mentor_pool = build_mentor_pool(score_df)
+        self.peer_pool = build_peer_pool(user_df)
+        self.weakest_quiz = build_weakest_quiz(score_df)
+        self.count_rows()
+
+    @functools.cached_property
+    def version(self):
+        # Identitas isi data (sama di semua worker untuk file data yang sama), dipakai cursor pagination
+        raw = json.dumps([self.meta, sorted(self.cluster_labels.items())], sort_keys=True, default=str)
+        return hashlib.sha1(raw.encode()).hexdigest()[:12]
+
+    def count_rows(self):
+        self.rows = {"users": len(self.user_df), "scores": len(self.score_df), "activity_users": len(self.activity), "classes": len(self.score_class_idx)}
+
+    def chat_context(self, user_id):
+        # Blok konteks mahasiswa untuk system prompt EduBot
+        # (tanpa baris gaya belajar, karena itu dikirim per request)
+        pos = self.user_idx.get_positions(user_id)
+        if not len(pos): return None
+        uid = int(self.user_df['userid'].iloc[pos[0]])
+        cluster_type = self.cluster_labels.get(int(self.user_df['cluster'].iloc[pos[0]]), "Unknown")
+        weakest = self.weakest_quiz.records(uid, ["weakness"])
+        return f"""
+        NAMA/ID MAHASISWA: Mahasiswa {uid}
+        STATUS AKADEMIK: {cluster_type}
+        RATA-RATA NILAI: {self.user_df['mean_score_pct'].iloc[pos[0]]}
+        KELEMAHAN UTAMA: {weakest[0]["weakness"] if weakest else "Tidak ada"}
+        GAYA BELAJAR: """
+
+    # --- DATA PLANE (lihat dataplane.py): semua isi Dataset jadi file .npy + manifest JSON ---
+    def groups(self):
+        return {"user_idx": self.user_idx.groups, "score_user_idx": self.score_user_idx.groups, "score_class_idx": self.score_class_idx.groups,
+                "quiz_detail": self.quiz_detail_table, "students": self.admin_aggs.students,
+                "student_courses": self.admin_aggs.student_courses, "mentor_pool": self.mentor_pool,
+                "peer_pool": self.peer_pool, "weakest_quiz": self.weakest_quiz}
+
+    def dump(self, directory):
+        tables = {}
+        for name, df in (("users", self.user_df), ("scores", self.score_df)):
+            os.makedirs(os.path.join(directory, name))
+            tables[name] = write_columns(os.path.join(directory, name), df)
+        np.save(os.path.join(directory, "activity.userid.npy"), np.asarray(self.activity.userids))
+        np.save(os.path.join(directory, "activity.hist.npy"), np.asarray(self.activity.hist))
+        return {
+            "tables": tables,
+            "groups": {name: group.dump(directory, name) for name, group in self.groups().items()},
+            "class_list": self.admin_aggs.class_list,
+            "cluster_labels": [[int(k), v] for k, v in self.cluster_labels.items()],
+            "meta": self.meta,
+        }
+
+    @classmethod
+    def attach(cls, directory, manifest):
+        # Semua array di-mmap dari plane, tidak ada groupby / index yang dibangun ulang
+        data = cls.__new__(cls)
+        data.user_df = read_columns(os.path.join(directory, "users"), manifest["tables"]["users"])
+        data.score_df = read_columns(os.path.join(directory, "scores"), manifest["tables"]["scores"])
+        load = lambda name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r")
+        data.activity = ActivityTable(load("activity.userid"), load("activity.hist"))
+        data.cluster_labels = {k: v for k, v in manifest["cluster_labels"]}
+        data.meta = manifest["meta"]
+        groups = {name: GroupedTable.load(directory, name, meta) for name, meta in manifest["groups"].items()}
+        data.user_idx = RowIndex(data.user_df, "userid", groups["user_idx"])
+        data.score_user_idx = RowIndex(data.score_df, "userid", groups["score_user_idx"])
+        data.score_class_idx = RowIndex(data.score_df, "courseshortname", groups["score_class_idx"])
+        data.quiz_detail_table = groups["quiz_detail"]
+        data.admin_aggs = AdminAggregates.attach(data.user_df, data.cluster_labels, manifest["class_list"], groups["students"], groups.get("student_courses"))
+        data.mentor_pool, data.peer_pool, data.weakest_quiz = groups["mentor_pool"], groups["peer_pool"], groups["weakest_quiz"]
+        data.count_rows()
+        return data
+
+def appended_classes(previous, new):
+    """
+    Kelas yang berubah jika data baru = data lama + segmen nilai baru saja.
+    None = ada perubahan lain, agregat admin dihitung ulang semua.
+    """
+    old_meta, new_meta = previous.meta, new.meta
+    if not old_meta.get("users") or old_meta.get("users") != new_meta.get("users"): return None
+    if previous.cluster_labels != new.cluster_labels: return None
+    old_s, new_s = old_meta.get("scores"), new_meta.get("scores")
+    if not old_s or not new_s or old_s.get("source") != new_s.get("source"): return None
+    old_segs, new_segs = old_s.get("segments", []), new_s.get("segments", [])
+    if new_segs[:len(old_segs)] != old_segs: return None
+    appends = {a["segment"]: a for a in new_s.get("appends", [])}
+    return sorted({c for seg in new_segs[len(old_segs):] for c in appends[seg]["classes"]})
+
+def empty_dataset():
+    return Dataset(pd.DataFrame(), pd.DataFrame(), empty_activity(), {})
+
+# System prompt per (user, gaya belajar) & jawaban untuk pertanyaan yang sama persis
+prompt_cache = LRUCache("chat_prompt", maxsize=int(os.getenv("CHAT_PROMPT_CACHE_SIZE", "2048")))
+reply_cache = LRUCache("chat_reply", maxsize=int(os.getenv("CHAT_REPLY_CACHE_SIZE", "1024")), ttl=float(os.getenv("CHAT_REPLY_CACHE_TTL", "600")))
+
+def normalize_question(message):
+    # "  Apa itu   GRAF??" -> "apa itu graf"
+    return " ".join(message.lower().split()).rstrip("?!. ")
+
+# --- LOAD & HOT RELOAD DATA ---
+# Seeding bulk (lihat seed.py): selalu saat data dibangun (startup & reload) supaya user baru bisa login.
+# EDUPULSE_SEED_ON_STARTUP=0 hanya melewati seeding saat attach ke data plane yang sudah
+# di-seed proses yang mempublishnya (loader dataplane.py / worker lain)
+SEED_USERS = os.getenv("EDUPULSE_SEED_ON_STARTUP", "1") != "0"
+RELOAD_WATCH = float(os.getenv("EDUPULSE_RELOAD_WATCH", "0"))  # detik, 0 = tanpa watcher
+
+def load_dataset(previous=None, data_dir=DATA_DIR):
+    if PLANE_ENABLED:
+        # Multi-worker: attach ke data plane yang dipublish loader (lihat dataplane.py)
+        plane = open_plane(file_signature(data_dir), data_dir)
+        if plane is not None:
+            dataset = Dataset.attach(*plane)
+            if SEED_USERS: seed_users(dataset.user_df)
+            return dataset
+        print("⚠️ Data plane belum ada / basi, data dibangun di proses ini")
+
+    user_df, score_df, activity, cluster_labels = read_data_tables(data_dir)
+    validate_tables(user_df, score_df, cluster_labels)
+    seed_users(user_df)
+    meta = {name: read_meta(name, data_dir) for name in TABLES}
+    dataset = Dataset(user_df, score_df, activity, cluster_labels, meta, previous)
+    if PLANE_ENABLED:
+        # Publish hasilnya supaya worker lain cukup attach, proses ini juga pindah ke versi mmap
+        try:
+            return Dataset.attach(*publish(dataset, file_signature(data_dir), data_dir))
+        except OSError as e:
+            print(f"⚠️ Data plane tidak bisa ditulis: {e}")
+    return dataset
+
+def stat_entry(path):
+    try:
+        st = os.stat(path)
+        return (path, st.st_size, st.st_mtime_ns)
+    except OSError:
+        return (path, None, None)
+
+def file_signature(data_dir=DATA_DIR):
+    # Berubah jika CSV / pkl diganti atau snapshot ditulis ulang (misal oleh ingest.py)
+    paths = [os.path.join(data_dir, f) for f in [src for src, _ in TABLES.values()] + [LOGS_FILE, ENGINE_FILE]]
+    paths += [os.path.join(table_dir(name, data_dir), "meta.json") for name in list(TABLES) + [ACTIVITY_TABLE]]
+    return [stat_entry(path) for path in paths]
+
+def data_signature(data_dir=DATA_DIR):
+    # + pointer plane terbaru: worker ikut reload jika loader / worker lain mempublish plane baru
+    return file_signature(data_dir) + ([stat_entry(current_file(data_dir))] if PLANE_ENABLED else [])
+
+def on_data_swap(dataset):
+    # Isi cache chat bergantung konteks mahasiswa dataset lama (key juga memuat generation)
+    prompt_cache.clear()
+    reply_cache.clear()
+
+store = DataStore(load_dataset, signature=data_signature, on_swap=on_data_swap)
+if store.load()["ok"]:
+    print("✅ Data Loaded Successfully!")
+else:
+    # Tetap jalan dengan data kosong; error terlihat di GET /api/admin/reload & /metrics
+    store.current = empty_dataset()
+    if SEED_USERS: seed_users(store.current.user_df)
+if RELOAD_WATCH > 0:
+    store.watch(RELOAD_WATCH)
+
+# --- AUTH ---
+
+# --- CACHE PROFIL USER (Write-through, hemat query SQL di dashboard) ---
+# TTL membatasi data basi jika ada beberapa worker (cache tiap worker terpisah)
+profile_cache = LRUCache("user_profile", maxsize=int(os.getenv("PROFILE_CACHE_SIZE", "4096")), ttl=float(os.getenv("PROFILE_CACHE_TTL", "300")))
+
+def profile_from_row(user):
+    return {"full_name": user.full_name, "learning_style": user.learning_style, "interest": user.interest}
+
+def get_profile(db, username):
+    profile = profile_cache.get(username)
+    if profile is None:
+        with phase("db"):
+            user = db.get(UserDB, username)
+        if user is None: return None
+        profile = profile_from_row(user)
+        profile_cache.set(username, profile)
+    return profile
+
+# --- CEK ADMIN (Token = username, lihat /token) ---
+async def is_admin_token(token):
+    async with AsyncSessionLocal() as db:
+        user = await db.get(UserDB, token)
+    return user is not None and user.role == "admin"
+
+async def require_admin(token: str = Depends(oauth2_scheme)):
+    if not await is_admin_token(token):
+        raise HTTPException(status_code=403, detail="Khusus admin")
+
+# Profiling per request: header "X-Profile: 1" / query "?profile=1" + token admin
+if PROFILING_ENABLED:
+    app.add_middleware(ProfilerMiddleware, is_admin=is_admin_token)
+
+# Pool bcrypt penuh -> 503 + Retry-After (back-pressure saat login massal)
+@app.exception_handler(HashPoolBusy)
+async def hash_pool_busy_handler(request: Request, exc: HashPoolBusy):
+    return JSONResponse(status_code=503, content={"detail": "Server sedang sibuk, coba lagi sebentar"}, headers={"Retry-After": "1"})
 
 class Token(BaseModel):
     access_token: str; token_type: str; role: str; user_id: str
 
 @app.post("/token", response_model=Token)
-async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(UserDB).filter(UserDB.username == form_data.username).first()
-    if not user or not pwd_context.verify(form_data.password, user.hashed_password):
+async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
+    with phase("db"):
+        user = await db.get(UserDB, form_data.username)
+    if not user or not await verify_password(form_data.password, user.hashed_password):
         raise HTTPException(status_code=400, detail="Username/Password salah")
     return {"access_token": user.username, "token_type": "bearer", "role": user.role, "user_id": user.username}
 
@@ -152,12 +558,15 @@ class ChangePasswordReq(BaseModel):
     user_id: str; old_password: str; new_password: str
 
 @app.put("/api/auth/change-password")
-def change_password(req: ChangePasswordReq, db: Session = Depends(get_db)):
-    user = db.query(UserDB).filter(UserDB.username == req.user_id).first()
-    if not user or not pwd_context.verify(req.old_password, user.hashed_password):
+async def change_password(req: ChangePasswordReq, db: AsyncSession = Depends(get_async_db)):
+    with phase("db"):
+        user = await db.get(UserDB, req.user_id)
+    if not user or not await verify_password(req.old_password, user.hashed_password):
         raise HTTPException(status_code=400, detail="Auth Failed")
-    user.hashed_password = pwd_context.hash(req.new_password)
-    db.commit()
+    user.hashed_password = await hash_password(req.new_password)
+    with phase("db"):
+        await db.commit()
+    profile_cache.pop(req.user_id)
     return {"msg": "Success"}
 
 class UpdateProfileReq(BaseModel):
@@ -165,139 +574,116 @@ class UpdateProfileReq(BaseModel):
 
 @app.put("/api/student/profile")
 def update_profile(req: UpdateProfileReq, db: Session = Depends(get_db)):
-    user = db.query(UserDB).filter(UserDB.username == req.user_id).first()
+    with phase("db"):
+        user = db.get(UserDB, req.user_id)
     if user:
         user.full_name = req.full_name
         user.learning_style = req.learning_style
         user.interest = req.interest
-        db.commit()
+        profile = profile_from_row(user)  # sebelum commit (setelah commit atribut expired -> query lagi)
+        with phase("db"):
+            db.commit()
+        profile_cache.set(req.user_id, profile)
     return {"msg": "Updated"}
 
 # --- ENDPOINTS DATA (REVISI DASHBOARD CHART & REKOMENDASI) ---
 
 # --- REVISI CHART CLEANING & GROUPING ---
+# Grouping, sorting & label sudah dihitung saat load (lihat build_quiz_detail_table)
 @app.get("/api/student/quiz_detail")
 def get_student_quiz_detail(user_id: int = Query(...), class_id: str = Query(...)):
     class_id_clean = class_id.strip()
-    
-    # 1. Filter Data
-    details = score_df[
-        (score_df["userid"] == user_id) & 
-        (score_df["courseshortname"] == class_id_clean)
-    ].copy()
-    
-    if details.empty: return []
-
-    # 2. LOGIKA GROUPING AGRESIF (PENTING!)
-    def get_grouping_key(raw_name):
-        name = str(raw_name)
-        # Gabung semua varian UTS (Tryout, Remedial, Real) jadi satu
-        if "Midterm" in name or "UTS" in name: return "UTS"
-        # Gabung semua varian UAS jadi satu
-        if "Final" in name or "UAS" in name: return "UAS"
-        
-        # Untuk Quiz, kita rapikan tapi biarkan topiknya ada
-        # "Online Quiz 1: Logika" -> Tetap unik per nomor
-        if "Online Quiz" in name:
-            # Hapus keterangan dalam kurung misal "(Remedial)"
-            return name.split("(")[0].strip()
-            
-        return name
-
-    # Terapkan Grouping Key
-    details['group_key'] = details['quizname'].apply(get_grouping_key)
-
-    # 3. GROUP BY & AMBIL NILAI MAX
-    # Jika ada 3 "UTS" (Tryout: 60, Real: 80, Remedial: 70), kita ambil 80.
-    grouped = details.groupby('group_key')['final_quiz_grade'].max().reset_index()
-
-    # 4. LOGIKA SORTING (Quiz Angka -> UTS -> UAS)
-    def sort_key(name):
-        name = name.lower()
-        if name == "uts": return 1000       # UTS di tengah
-        if name == "uas": return 2000       # UAS di akhir
-        # Ambil angka pertama yang muncul di string
-        import re
-        m = re.search(r'\d+', name)
-        return int(m.group()) if m else 500 # Quiz tanpa angka di awal
-
-    grouped['sort_val'] = grouped['group_key'].apply(sort_key)
-    grouped = grouped.sort_values('sort_val')
-
-    # 5. FORMAT LABEL TAMPILAN (Q1, Q2...)
-    def format_display_label(name):
-        if name in ["UTS", "UAS"]: return name
-        
-        if "Online Quiz" in name:
-            # Ubah "Online Quiz 1: Logika" -> "Q1: Logika"
-            # Split berdasarkan spasi dan titik dua
-            parts = name.replace("Online Quiz", "Q").split(":")
-            if len(parts) > 1:
-                # Ambil Q1 + Nama Topik (dipendekkan dikit)
-                return f"{parts[0].strip()}: {parts[1].strip()[:15]}"
-            return parts[0].strip()
-            
-        return name[:15]
-
-    quiz_list = []
-    for _, row in grouped.iterrows():
-        score_val = fix_grade_value(row['final_quiz_grade'])
-        
-        # Opsi: Hilangkan bar jika nilainya 0 (Kecuali UTS/UAS biar notice)
-        # if score_val == 0 and row['group_key'] not in ["UTS", "UAS"]: continue
+    return FastJSONResponse(store.current.quiz_detail_table.records(user_id, QUIZ_DETAIL_FIELDS, where=("class_id", class_id_clean)))
+
+# --- DASHBOARD MAHASISWA (Dipakai endpoint per user & batch admin) ---
+def course_performance(class_ids, full_names, scores):
+    # scores = rata-rata nilai per kelas yang sudah dibulatkan (fix_grade_column)
+    courses = [
+        {"class_id": cid, "subject": clean_course_name(c_full), "score": val} # Nama Bersih
+        for cid, c_full, val in zip(class_ids, full_names, scores.tolist())
+    ]
+    return courses, average_grade(scores)
+
+def average_grade(scores):
+    # Rata-rata nilai kelas yang > 0 (kelas tanpa nilai tidak dihitung)
+    graded = scores[scores > 0]
+    return round(float(graded.sum()) / len(graded), 1) if len(graded) else 0
+
+def dashboard_payload(user_id, student_data, profile, courses, real_avg):
+    cat = "Low" if real_avg < 50 else student_data["performance_category"]
+    return {
+        "user_id": int(student_data["userid"]),
+        "name": profile["full_name"] if profile else f"Mahasiswa {user_id}",
+        "learning_style": profile["learning_style"] if profile else "Visual",
+        "interest": profile["interest"] if profile else "Computer Science",
+        "gpa": round(real_avg / 25, 2),
+        "average_score": real_avg,
+        "engagement_score": int(student_data["engagement_score"]),
+        "performance_category": cat,
+        "courses": courses,
+        "cluster_id": int(student_data["cluster"])
+    }
 
-        quiz_list.append({
-            "quiz_name": format_display_label(row['group_key']), # Label Pendek (X-Axis)
-            "full_name": row['group_key'],                       # Nama Lengkap (Tooltip)
-            "score": score_val
-        })
-        
-    return quiz_list
+def batch_dashboards(data, user_ids):
+    """
+    Data dashboard banyak user sekaligus: 1 groupby untuk nilai semua user.
+    Hasil: {userid: (baris user, kursus, real_avg)}, user yang tidak ada dilewati.
+    """
+    found = [(uid, pos[0]) for uid in user_ids if len(pos := data.user_idx.get_positions(uid))]
+    if not found: return {}
+    students = data.user_df.iloc[[p for _, p in found]][['userid', 'cluster', 'engagement_score', 'performance_category']].to_dict("records")
+    score_pos = np.concatenate([data.score_user_idx.get_positions(uid) for uid, _ in found])
+    grades = data.score_df.iloc[score_pos][['userid', 'courseshortname', 'coursefullname', 'final_quiz_grade']]
+    grades = grades.assign(final_quiz_grade=grade_values(grades['final_quiz_grade']))
+    # Urut per userid lalu kelas, sama dengan groupby per user di get_student_dashboard
+    grouped = grades.groupby(['userid', 'courseshortname', 'coursefullname'], observed=True)['final_quiz_grade'].mean()
+    scores = fix_grade_column(grouped)
+    uids = grouped.index.get_level_values(0).to_numpy()
+    class_ids, full_names = grouped.index.get_level_values(1), grouped.index.get_level_values(2)
+
+    result = {}
+    for (uid, _), student in zip(found, students):
+        start, end = np.searchsorted(uids, uid), np.searchsorted(uids, uid, side="right")
+        result[uid] = (student, *course_performance(class_ids[start:end], full_names[start:end], scores[start:end]))
+    return result
+
+def get_profiles_batch(db, usernames):
+    # Cache dulu, sisanya 1 query IN (...) ke UserDB
+    profiles = {name: profile_cache.get(name) for name in usernames}
+    missing = [name for name, profile in profiles.items() if profile is None]
+    if missing:
+        with phase("db"):
+            rows = db.query(UserDB).filter(UserDB.username.in_(missing)).all()
+        for user in rows:
+            profiles[user.username] = profile_from_row(user)
+            profile_cache.set(user.username, profiles[user.username])
+    return profiles
 
 @app.get("/api/student/{user_id}")
 def get_student_dashboard(user_id: int, db: Session = Depends(get_db)):
-    student_csv = user_df[user_df["userid"] == user_id]
+    data = store.current
+    with phase("pandas"):
+        student_csv = data.user_idx.rows(user_id)
     if student_csv.empty: raise HTTPException(status_code=404)
     student_data = student_csv.iloc[0]
     
-    user_db = db.query(UserDB).filter(UserDB.username == str(user_id)).first()
+    profile = get_profile(db, str(user_id))
     
     # Hitung Nilai
-    grades_raw = score_df[score_df["userid"] == user_id]
-    course_performance = []
-    total_score, count = 0, 0
-
-    if not grades_raw.empty:
-        grouped = grades_raw.groupby(["courseshortname", "coursefullname"])['final_quiz_grade'].mean().reset_index()
-        for _, row in grouped.iterrows():
-            val = fix_grade_value(row['final_quiz_grade'])
-            if val > 0:
-                total_score += val
-                count += 1
-            course_performance.append({
-                "class_id": row["courseshortname"], 
-                "subject": clean_course_name(row["coursefullname"]), # Nama Bersih
-                "score": val
-            })
-    
-    real_avg = round(total_score / count, 1) if count > 0 else 0
-    cat = "Low" if real_avg < 50 else student_data["performance_category"]
+    courses, real_avg = [], 0
 
-    return {
-        "user_id": int(student_data["userid"]),
-        "name": user_db.full_name if user_db else f"Mahasiswa {user_id}",
-        "learning_style": user_db.learning_style if user_db else "Visual",
-        "interest": user_db.interest if user_db else "Computer Science",
-        "gpa": round(real_avg / 25, 2),
-        "average_score": real_avg,
-        "engagement_score": int(student_data["engagement_score"]),
-        "performance_category": cat,
-        "courses": course_performance,
-        "cluster_id": int(student_data["cluster"])
-    }
+    with phase("pandas"):
+        grades_raw = data.score_user_idx.rows(user_id)
+        if not grades_raw.empty:
+            grades_raw = grades_raw.assign(final_quiz_grade=grade_values(grades_raw['final_quiz_grade']))
+            grouped = grades_raw.groupby(["courseshortname", "coursefullname"], observed=True)['final_quiz_grade'].mean()
+            courses, real_avg = course_performance(grouped.index.get_level_values(0), grouped.index.get_level_values(1), fix_grade_column(grouped))
+
+    return FastJSONResponse(dashboard_payload(user_id, student_data, profile, courses, real_avg))
 
 class RecommendationRequest(BaseModel):
     user_id: int; learning_style: str; interest: str
+    seed: Optional[int] = None # Opsional: peer & mentor jadi deterministik (untuk testing)
 
 # --- SUPER AI V3 (WITH SCORES IN TIPS) ---
 # @app.post("/api/recommendation")
@@ -423,50 +809,53 @@ class RecommendationRequest(BaseModel):
 @app.post("/api/recommendation")
 def get_ai_recommendation(req: RecommendationRequest):
     # 1. Identifikasi User
-    student = user_df[user_df["userid"] == req.user_id]
+    data = store.current
+    with phase("pandas"):
+        student = data.user_idx.rows(req.user_id)
     if student.empty: raise HTTPException(status_code=404, detail="User Not Found")
     
     row = student.iloc[0]
     cluster_id = int(row["cluster"])
-    cluster_type = cluster_labels.get(cluster_id, "Unknown")
+    cluster_type = data.cluster_labels.get(cluster_id, "Unknown")
     engagement = int(row["engagement_score"])
     
     # 2. Logic Jadwal
     optimal_time = "Pagi Hari (08:00)"
-    user_logs = logs_df[logs_df['userid'] == req.user_id]
-    if not user_logs.empty:
-        h = user_logs['hour'].dropna().mode()
-        if not h.empty:
-            hour = int(h[0])
-            period = "Malam" if hour >= 18 else "Sore" if hour >= 15 else "Siang" if hour >= 12 else "Pagi"
-            optimal_time = f"{period} Hari (Sekitar jam {hour}:00)"
+    hour = data.activity.modal_hour(req.user_id)
+    if hour is not None:
+        period = "Malam" if hour >= 18 else "Sore" if hour >= 15 else "Siang" if hour >= 12 else "Pagi"
+        optimal_time = f"{period} Hari (Sekitar jam {hour}:00)"
 
     # 3. Deteksi Topik Lemah
     weak_subjects = []
-    student_scores = score_df[score_df["userid"] == req.user_id]
-    if not student_scores.empty:
-        valid = student_scores[student_scores['final_quiz_grade'] > 0].copy()
-        if not valid.empty:
-            valid = valid.sort_values('final_quiz_grade').head(2)
-            for _, bad_quiz in valid.iterrows():
-                c_name = clean_course_name(bad_quiz['coursefullname'])
-                raw_topic = extract_topic_from_quiz(bad_quiz['quizname'])
-                score = fix_grade_value(bad_quiz['final_quiz_grade'])
-                search_query = generate_search_query(c_name, raw_topic)
-                weak_subjects.append({"course": c_name, "topic": raw_topic, "score": score, "search_query": search_query})
+    with phase("pandas"):
+        student_scores = data.score_user_idx.rows(req.user_id)
+        if not student_scores.empty:
+            valid = student_scores[student_scores['final_quiz_grade'] > 0].copy()
+            if not valid.empty:
+                valid = valid.sort_values('final_quiz_grade').head(2)
+                for _, bad_quiz in valid.iterrows():
+                    c_name = clean_course_name(bad_quiz['coursefullname'])
+                    raw_topic = extract_topic_from_quiz(bad_quiz['quizname'])
+                    score = fix_grade_value(bad_quiz['final_quiz_grade'])
+                    search_query = generate_search_query(c_name, raw_topic)
+                    weak_subjects.append({"course": c_name, "topic": raw_topic, "score": score, "search_query": search_query})
 
     if not weak_subjects: 
         weak_subjects.append({"course": "Umum", "topic": "Materi Dasar", "score": 0, "search_query": "Materi Dasar Informatika"})
 
     # 4. Peer & Mentor
-    peer_list = [f"Mahasiswa {uid}" for uid in user_df[user_df['cluster'] == int(row["cluster"])].sample(min(3, len(user_df)))['userid'].values if uid != req.user_id]
+    rng = random.Random(req.seed) if req.seed is not None else random
+    peers = draw_sample(data.peer_pool.column(cluster_id, "userid"), 3, rng)
+    peer_list = [f"Mahasiswa {uid}" for uid in peers if uid != req.user_id]
     
     mentor_name = "Belum Tersedia"
-    weakest_course_id = student_scores.sort_values('final_quiz_grade').iloc[0]['courseshortname'] if not student_scores.empty else ""
+    with phase("pandas"):
+        weakest_course_id = student_scores.sort_values('final_quiz_grade').iloc[0]['courseshortname'] if not student_scores.empty else ""
     if weakest_course_id:
-        potential = score_df[(score_df['courseshortname'] == weakest_course_id) & (score_df['final_quiz_grade'] > 85)]['userid'].unique()
+        potential = data.mentor_pool.column(weakest_course_id, "userid")
         if len(potential) > 0: 
-            mentor_name = f"Mahasiswa {random.choice(potential.tolist())} (Expert)"
+            mentor_name = f"Mahasiswa {potential[rng.randrange(len(potential))]} (Expert)"
 
     # 5. MATERI REKOMENDASI (HYBRID: CURATED + SEARCH)
     style = req.learning_style.title()
@@ -520,41 +909,24 @@ class ChatRequest(BaseModel):
     message: str
     learning_style: str
 
-# 🌟 ENDPOINT CHATBOT (INI YANG HILANG) 🌟
-@app.post("/api/chat")
-async def chat_with_ai(req: ChatRequest):
-    # 1. Ambil Konteks Mahasiswa (Biar Chatbot Pinter)
-    student = user_df[user_df["userid"] == req.user_id]
+def build_chat_prompt(req: ChatRequest):
+    data = store.current
+    key = (data.generation, req.user_id, req.learning_style)
+    system_prompt = prompt_cache.get(key)
+    if system_prompt is None:
+        system_prompt = build_system_prompt(data, req.user_id, req.learning_style)
+        prompt_cache.set(key, system_prompt)
+    return f"{system_prompt}\n\nUSER BERTANYA: {req.message}"
+
+def build_system_prompt(data, user_id, learning_style):
+    # 1. Ambil Konteks Mahasiswa (lihat Dataset.chat_context)
     context_text = "Data profil tidak ditemukan."
-    
-    if not student.empty:
-        row = student.iloc[0]
-        # Ambil Cluster
-        cluster_type = cluster_labels.get(int(row["cluster"]), "Unknown")
-        avg_score = row['mean_score_pct']
-        
-        # Ambil Kelemahan (Topik nilai terendah)
-        weakest_subject = "Tidak ada"
-        student_scores = score_df[score_df["userid"] == req.user_id]
-        if not student_scores.empty:
-            valid_scores = student_scores[student_scores['final_quiz_grade'] > 0].sort_values('final_quiz_grade')
-            if not valid_scores.empty:
-                worst = valid_scores.iloc[0]
-                c_name = clean_course_name(worst['coursefullname'])
-                t_name = extract_topic_from_quiz(worst['quizname'])
-                s_val = fix_grade_value(worst['final_quiz_grade'])
-                weakest_subject = f"{c_name} (Topik: {t_name}, Nilai: {s_val})"
-
-        context_text = f"""
-        NAMA/ID MAHASISWA: Mahasiswa {req.user_id}
-        STATUS AKADEMIK: {cluster_type}
-        RATA-RATA NILAI: {avg_score}
-        KELEMAHAN UTAMA: {weakest_subject}
-        GAYA BELAJAR: {req.learning_style}
-        """
+    base_context = data.chat_context(user_id)
+    if base_context is not None:
+        context_text = f"{base_context}{learning_style}\n        "
 
     # 2. Susun Instruksi untuk AI (System Prompt)
-    system_prompt = f"""
+    return f"""
     Kamu adalah 'EduBot', asisten akademik personal dari aplikasi EduPulse.
     
     INFORMASI MAHASISWA LAWAN BICARAMU:
@@ -567,60 +939,245 @@ async def chat_with_ai(req: ChatRequest):
     4. Jika mahasiswa menyapa (Halo/Hi), sapa balik dengan menyebut ID atau Namanya dan singgung status akademiknya sedikit untuk basa-basi motivasi.
     """
 
+# 🌟 ENDPOINT CHATBOT 🌟
+@app.post("/api/chat")
+async def chat_with_ai(req: ChatRequest):
+    # Pertanyaan sama dari user yang sama (mis. FAQ) tidak perlu panggil AI lagi
+    cache_key = (store.generation, req.user_id, req.learning_style, normalize_question(req.message))
+    cached = reply_cache.get(cache_key)
+    if cached is not None:
+        return {"reply": cached}
+
+    prompt = build_chat_prompt(req)
     try:
-        # 3. Kirim ke Google Gemini
-        # Pastikan 'model' sudah didefinisikan di paling atas main.py (model = genai.GenerativeModel('gemini-pro'))
-        chat = model.start_chat(history=[])
-        response = chat.send_message(f"{system_prompt}\n\nUSER BERTANYA: {req.message}")
-        
-        # Kembalikan jawaban teks
-        return {"reply": response.text}
+        # 3. Kirim ke Google Gemini (di thread pool, event loop tetap bebas)
+        reply = await llm.ask(prompt)
+        reply_cache.set(cache_key, reply)
+        return {"reply": reply}
         
     except Exception as e:
-        print(f"❌ Error Gemini: {e}")
-        return {"reply": "Maaf, saya sedang pusing (Koneksi ke AI bermasalah). Coba tanya lagi nanti ya!"}
+        print(f"❌ Error Gemini: {e!r}")
+        return {"reply": llm.FALLBACK_REPLY}
+
+# Versi streaming (Server-Sent Events): frontend bisa render jawaban per potongan
+@app.post("/api/chat/stream")
+async def chat_with_ai_stream(req: ChatRequest):
+    cache_key = (store.generation, req.user_id, req.learning_style, normalize_question(req.message))
+    cached = reply_cache.get(cache_key)
+    prompt = build_chat_prompt(req) if cached is None else None
+
+    async def event_stream():
+        if cached is not None:
+            yield llm.sse_event({"delta": cached})
+            yield llm.sse_event({"done": True})
+            return
+        try:
+            parts = []
+            async for delta in llm.ask_stream(prompt):
+                parts.append(delta)
+                yield llm.sse_event({"delta": delta})
+            reply_cache.set(cache_key, "".join(parts))
+            yield llm.sse_event({"done": True})
+        except Exception as e:
+            print(f"❌ Error Gemini (stream): {e!r}")
+            yield llm.sse_event({"error": llm.FALLBACK_REPLY, "done": True})
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
     
 
+@app.get("/api/admin/cache_stats", dependencies=[Depends(require_admin)])
+def get_cache_stats():
+    return cache_stats()
+
+# Daftar & download hasil profiling (file .pstats)
+@app.get("/api/admin/profiles", dependencies=[Depends(require_admin)])
+def get_profiles(limit: int = 50):
+    return list_profiles(limit=limit)
+
+@app.get("/api/admin/profiles/{profile_id}", dependencies=[Depends(require_admin)])
+def download_profile(profile_id: str):
+    path = profile_path(profile_id)
+    if path is None: raise HTTPException(status_code=404, detail="Profile tidak ditemukan")
+    return FileResponse(path, media_type="application/octet-stream", filename=f"{profile_id}.prof")
+
+# Hot reload data (lihat data_store.py): reload jalan di background, status via GET
+@app.post("/api/admin/reload", status_code=202, dependencies=[Depends(require_admin)])
+def reload_data():
+    if not store.reload_in_background():
+        raise HTTPException(status_code=409, detail="Reload data sedang berjalan")
+    return {"msg": "Reload dimulai", "generation": store.generation}
+
+@app.get("/api/admin/reload", dependencies=[Depends(require_admin)])
+def get_reload_status():
+    return store.status()
+
+# Format Prometheus: latency per route & fase internal + statistik cache dan pool bcrypt
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    caches = cache_stats()
+    extra = []
+    for field in ("hits", "misses", "evictions"):
+        extra += render_samples(f"edupulse_cache_{field}_total", f"Cache {field}", "counter", [({"cache": name}, st[field]) for name, st in caches.items()])
+    extra += render_samples("edupulse_cache_size", "Jumlah entry cache", "gauge", [({"cache": name}, st["size"]) for name, st in caches.items()])
+    extra += render_samples("edupulse_bcrypt_jobs_total", "Job bcrypt per hasil", "counter", [({"result": k}, v) for k, v in hash_pool_stats.items()])
+    extra += render_samples("edupulse_bcrypt_pending_jobs", "Job bcrypt yang sedang antri/jalan", "gauge", [({}, pending_hash_jobs())])
+    extra += render_samples("edupulse_data_rows", "Jumlah baris data yang sedang dipakai", "gauge", [({"table": k}, v) for k, v in store.current.rows.items()])
+    extra += render_samples("edupulse_data_generation", "Nomor dataset (naik tiap reload berhasil)", "gauge", [({}, store.generation)])
+    extra += render_samples("edupulse_data_reloads_total", "Load/reload data per hasil", "counter", [({"result": k}, v) for k, v in store.results.items()])
+    if store.last_result:
+        extra += render_samples("edupulse_data_last_load_seconds", "Durasi load/reload data terakhir", "gauge", [({}, store.last_result["duration_s"])])
+    return PlainTextResponse(render_metrics(extra), media_type="text/plain; version=0.0.4")
+
+# Endpoint admin dilayani dari agregat materialized (lihat AdminAggregates)
 @app.get("/api/admin/summary")
 def get_admin_summary():
-    return {"total_students": len(user_df), "avg_gpa": round(user_df["mean_score_pct"].mean() / 25, 2), "at_risk_count": len(user_df[user_df["performance_category"] == "Low"])}
+    return store.current.admin_aggs.summary
 
 @app.get("/api/admin/classes")
 def get_class_list():
-    student_avgs = score_df.groupby(['courseshortname', 'coursefullname', 'userid'])['final_quiz_grade'].mean().reset_index()
-    class_stats = student_avgs.groupby(['courseshortname', 'coursefullname']).agg(student_count=('userid', 'count'), class_avg_score=('final_quiz_grade', 'mean')).reset_index()
-    classes_list = []
-    for _, row in class_stats.iterrows():
-        avg_score = fix_grade_value(row['class_avg_score']) if pd.notna(row['class_avg_score']) else 0
-        classes_list.append({"class_id": row['courseshortname'], "class_name": clean_course_name(row['coursefullname']), "student_count": int(row['student_count']), "avg_score": avg_score})
-    return classes_list
+    return FastJSONResponse(store.current.admin_aggs.class_list)
 
 @app.get("/api/admin/students_by_class")
 def get_students_by_class(class_id: str):
-    class_data = score_df[score_df['courseshortname'] == class_id]
-    user_stats = class_data.groupby('userid').agg(avg_grade=('final_quiz_grade', 'mean'), activity_count=('quizid', 'count')).reset_index()
-    enrolled_ids = user_stats['userid'].unique()
-    users_info = user_df[user_df['userid'].isin(enrolled_ids)][['userid', 'cluster', 'performance_category']]
-    merged = pd.merge(users_info, user_stats, on='userid', how='inner')
-    result = []
-    for _, row in merged.iterrows():
-        score_val = fix_grade_value(row['avg_grade']) if pd.notna(row['avg_grade']) else 0
-        result.append({"id": int(row["userid"]), "cluster": cluster_labels.get(row["cluster"], "Unknown"), "status": "Berisiko" if score_val < 50 else "Aman", "score": score_val, "activities": int(row['activity_count'])})
-    return sorted(result, key=lambda x: x['score'], reverse=True)
+    return FastJSONResponse(store.current.admin_aggs.students.records(class_id, STUDENT_FIELDS))
+
+# --- PAGINATION (Cursor = versi data + offset, halaman berikutnya tanpa build list penuh) ---
+PAGE_SIZE_MAX = 500
+
+def encode_cursor(data, offset):
+    return base64.urlsafe_b64encode(f"{data.version}:{offset}".encode()).decode()
+
+def decode_cursor(data, cursor):
+    if not cursor: return 0
+    try:
+        version, offset = base64.urlsafe_b64decode(cursor.encode()).decode().split(":")
+        offset = int(offset)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cursor tidak valid")
+    if version != data.version or offset < 0:
+        # Data sudah di-reload sejak halaman pertama, urutan lama tidak berlaku lagi
+        raise HTTPException(status_code=409, detail="Cursor kedaluwarsa, data sudah berubah. Ulangi dari halaman pertama")
+    return offset
+
+def page_response(data, items, offset, total):
+    end = offset + len(items)
+    return FastJSONResponse({"items": items, "total": total, "next_cursor": encode_cursor(data, end) if end < total else None})
+
+@app.get("/api/admin/classes/page")
+def get_class_list_page(limit: int = Query(50, ge=1, le=PAGE_SIZE_MAX), cursor: Optional[str] = None):
+    data = store.current
+    offset = decode_cursor(data, cursor)
+    classes = data.admin_aggs.class_list
+    return page_response(data, classes[offset:offset + limit], offset, len(classes))
+
+@app.get("/api/admin/students_by_class/page")
+def get_students_by_class_page(class_id: str, limit: int = Query(50, ge=1, le=PAGE_SIZE_MAX), cursor: Optional[str] = None):
+    data = store.current
+    offset = decode_cursor(data, cursor)
+    students = data.admin_aggs.students
+    start, end = students.bounds(class_id)
+    return page_response(data, students.records(class_id, STUDENT_FIELDS, offset=offset, limit=limit), offset, end - start)
+
+# Dashboard banyak mahasiswa sekaligus (panel admin): 1 groupby nilai + 1 query profil
+BATCH_DASHBOARD_MAX = int(os.getenv("BATCH_DASHBOARD_MAX", "1000"))
+
+class BatchDashboardReq(BaseModel):
+    user_ids: List[conint(ge=0, le=2**63 - 1)] = [] # Di luar int64 -> 422 (bukan 500 saat serialisasi)
+    class_id: Optional[str] = None # Semua mahasiswa kelas ini, urut seperti students_by_class
+
+@app.post("/api/admin/student_dashboards", dependencies=[Depends(require_admin)])
+def get_student_dashboards(req: BatchDashboardReq, db: Session = Depends(get_db)):
+    data = store.current
+    user_ids = list(req.user_ids)
+    if req.class_id is not None:
+        user_ids = data.admin_aggs.students.column(req.class_id.strip(), "id").tolist() + user_ids
+    user_ids = list(dict.fromkeys(user_ids))  # buang duplikat, urutan tetap
+    if len(user_ids) > BATCH_DASHBOARD_MAX:
+        raise HTTPException(status_code=422, detail=f"Maksimal {BATCH_DASHBOARD_MAX} mahasiswa per request")
+
+    with phase("pandas"):
+        found = batch_dashboards(data, user_ids)
+    profiles = get_profiles_batch(db, [str(uid) for uid in found])
+    return FastJSONResponse({
+        "students": [dashboard_payload(uid, student, profiles[str(uid)], courses, real_avg) for uid, (student, courses, real_avg) in found.items()],
+        "missing": [uid for uid in user_ids if uid not in found],
+    })
+
+# --- EXPORT COHORT (Streaming NDJSON/CSV, dibangun per potongan dari index) ---
+EXPORT_CHUNK = 1000  # mahasiswa per potongan
+EXPORT_CSV_COLUMNS = ["id", "cluster_id", "cluster", "status", "average_score", "class_id", "score", "activities"]
+
+def export_students(data, chunk=EXPORT_CHUNK):
+    """
+    Generator list record per potongan mahasiswa (urut userid): cluster, status
+    risiko, rata-rata & nilai per kelas. Memori hanya sebesar 1 potongan.
+    """
+    users, aggs = data.user_idx.groups, data.admin_aggs
+    students, by_user = aggs.students, aggs.student_courses
+    clusters = data.user_df['cluster'].to_numpy() if len(users) else None
+    for a in range(0, len(users), chunk):
+        b = min(a + chunk, len(users))
+        first_rows = users.columns["pos"][users.offsets[a:b]]  # baris pertama tiap user di user_df
+        records = []
+        for uid, cluster in zip(np.asarray(users.keys[a:b]).tolist(), clusters[first_rows].tolist()):
+            pos = by_user.column(uid, "pos")
+            # Baris students urut class_id -> key kelas = segmen offsets yang memuat baris tsb
+            class_keys = np.searchsorted(students.offsets, pos, side="right") - 1
+            scores = np.asarray(students.columns["score"])[pos]
+            average = average_grade(scores)
+            records.append({
+                "id": uid,
+                "cluster_id": int(cluster),
+                "cluster": data.cluster_labels.get(int(cluster), "Unknown"),
+                "status": "Berisiko" if average < 50 else "Aman",
+                "average_score": average,
+                "courses": [
+                    {"class_id": students.keys[k], "score": score, "activities": act}
+                    for k, score, act in zip(class_keys.tolist(), scores.tolist(), np.asarray(students.columns["activities"])[pos].tolist())
+                ],
+            })
+        yield records
+
+def export_ndjson(data):
+    for records in export_students(data):
+        yield b"".join(orjson.dumps(r, option=orjson.OPT_SERIALIZE_NUMPY) + b"\n" for r in records)
+
+def export_csv(data):
+    # 1 baris per mahasiswa-kelas, mahasiswa tanpa nilai tetap 1 baris (kolom kelas kosong)
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(EXPORT_CSV_COLUMNS)
+    for records in export_students(data):
+        for r in records:
+            head = [r["id"], r["cluster_id"], r["cluster"], r["status"], r["average_score"]]
+            writer.writerows([head + [c["class_id"], c["score"], c["activities"]] for c in r["courses"]] or [head + ["", "", ""]])
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+
+@app.get("/api/admin/export/students", dependencies=[Depends(require_admin)])
+def export_all_students(format: Literal["ndjson", "csv"] = "ndjson"):
+    data = store.current  # 1 snapshot untuk seluruh export, walau ada reload di tengah jalan
+    if format == "csv":
+        return StreamingResponse(export_csv(data), media_type="text/csv", headers={"Content-Disposition": "attachment; filename=students.csv"})
+    return StreamingResponse(export_ndjson(data), media_type="application/x-ndjson", headers={"Content-Disposition": "attachment; filename=students.ndjson"})
 
 
 
 # --- FITUR BARU: ADMIN RESET PASSWORD ---
 @app.put("/api/admin/reset-password/{target_user_id}")
-def admin_reset_password(target_user_id: str, db: Session = Depends(get_db)):
+async def admin_reset_password(target_user_id: str, db: AsyncSession = Depends(get_async_db)):
     # Cari user target
-    user = db.query(UserDB).filter(UserDB.username == target_user_id).first()
+    with phase("db"):
+        user = await db.get(UserDB, target_user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User mahasiswa tidak ditemukan")
     
     # Reset ke default "mhs123"
-    user.hashed_password = pwd_context.hash("mhs123")
-    db.commit()
+    user.hashed_password = await hash_password(DEFAULT_STUDENT_PASSWORD)
+    with phase("db"):
+        await db.commit()
+    profile_cache.pop(target_user_id)
     
     return {"message": f"Password mahasiswa {target_user_id} berhasil di-reset ke 'mhs123'"}
 
@@ -0,0 +1,151 @@
+# metrics.py
+# Metrik in-process format Prometheus (tanpa dependency tambahan):
+# histogram latency per route, request in-flight, jumlah error, dan histogram
+# durasi fase internal (pandas, db, bcrypt, gemini, kb). Dibaca lewat GET /metrics.
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Batas bucket (detik), cukup rapat di bawah 100 ms untuk endpoint data
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+METRICS = []
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _fmt_labels(names, values, extra=()):
+    parts = [f'{n}="{_escape(v)}"' for n, v in list(zip(names, values)) + list(extra)]
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+def _fmt_value(v):
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+class Counter:
+    def __init__(self, name, help_text, labels=()):
+        self.name, self.help, self.labels = name, help_text, tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+        METRICS.append(self)
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self, kind="counter"):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        lines += [f"{self.name}{_fmt_labels(self.labels, k)} {_fmt_value(v)}" for k, v in items]
+        return lines
+
+class Gauge(Counter):
+    def __init__(self, name, help_text, labels=()):
+        super().__init__(name, help_text, labels)
+        if not self.labels: self._values[()] = 0  # tetap tampil walau belum pernah berubah
+
+    def dec(self, *label_values):
+        self.inc(*label_values, amount=-1)
+
+    def render(self):
+        return super().render("gauge")
+
+class Histogram:
+    def __init__(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name, self.help, self.labels = name, help_text, tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}  # label values -> [count per bucket (+Inf terakhir), sum]
+        self._lock = threading.Lock()
+        METRICS.append(self)
+
+    def observe(self, seconds, *label_values):
+        i = bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][i] += 1
+            series[1] += seconds
+
+    @contextmanager
+    def time(self, *label_values):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t0, *label_values)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((k, (list(c), s)) for k, (c, s) in self._series.items())
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{self.name}_bucket{_fmt_labels(self.labels, key, [('le', le)])} {cumulative}")
+            lines.append(f"{self.name}_sum{_fmt_labels(self.labels, key)} {total!r}")
+            lines.append(f"{self.name}_count{_fmt_labels(self.labels, key)} {cumulative}")
+        return lines
+
+# --- METRIK HTTP & FASE INTERNAL ---
+REQUEST_LATENCY = Histogram("edupulse_http_request_duration_seconds", "Latency request HTTP per route (sampai body selesai dikirim)", ("method", "route"))
+REQUESTS_TOTAL = Counter("edupulse_http_requests_total", "Jumlah request HTTP per route & status", ("method", "route", "status"))
+REQUEST_ERRORS = Counter("edupulse_http_request_errors_total", "Request yang berakhir 5xx atau exception", ("method", "route"))
+REQUESTS_IN_FLIGHT = Gauge("edupulse_http_requests_in_flight", "Request yang sedang diproses")
+PHASE_LATENCY = Histogram("edupulse_phase_duration_seconds", "Durasi fase internal: pandas, db, bcrypt, gemini, kb", ("phase",))
+
+def phase(name):
+    """Context manager pengukur durasi 1 fase, contoh: with phase("pandas"): ..."""
+    return PHASE_LATENCY.time(name)
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI murni (bukan BaseHTTPMiddleware) supaya StreamingResponse
+    tidak di-buffer. Label route memakai template path ("/api/student/{user_id}"),
+    bukan path asli, supaya jumlah series tidak meledak.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        method = scope["method"]
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        # Route baru diketahui setelah routing, jadi in-flight dicatat total saja
+        REQUESTS_IN_FLIGHT.inc()
+        t0 = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - t0
+            REQUESTS_IN_FLIGHT.dec()
+            route = scope.get("route")
+            label = getattr(route, "path", None) or "unmatched"
+            REQUEST_LATENCY.observe(elapsed, method, label)
+            REQUESTS_TOTAL.inc(method, label, str(status[0]))
+            if status[0] >= 500:
+                REQUEST_ERRORS.inc(method, label)
+
+def render_samples(name, help_text, kind, samples):
+    """Metrik yang nilainya dibaca dari luar (stats cache, pool bcrypt). samples: [(dict label, nilai)]"""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    lines += [f"{name}{_fmt_labels(labels.keys(), labels.values())} {_fmt_value(v)}" for labels, v in samples]
+    return lines
+
+def render_metrics(extra_lines=()):
+    lines = []
+    for metric in METRICS:
+        lines += metric.render()
+    lines += extra_lines
+    return "\n".join(lines) + "\n"
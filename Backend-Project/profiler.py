@@ -0,0 +1,173 @@
+# profiler.py
+# Profiling opt-in per request (khusus admin): kirim header "X-Profile: 1" atau
+# query "?profile=1" bersama token admin, request itu dijalankan di bawah cProfile
+# dan hasilnya disimpan sebagai file .prof (pstats) di PROFILE_DIR.
+# Buka dengan: python -m pstats <file>, snakeviz <file>, atau flameprof <file> > flame.svg
+#
+# Default mati: aktifkan dengan EDUPULSE_PROFILING=1. Saat mati, route & middleware
+# tidak dipasang sama sekali (tanpa overhead). Saat aktif, request tanpa flag hanya cek header.
+#
+# Catatan: profiler event loop merekam semua coroutine yang jalan di loop selama
+# request diprofile (termasuk request lain yang bersamaan), bukan hanya handler-nya.
+# Endpoint sync diprofile di thread-nya sendiri sehingga bersih dari request lain.
+import contextvars
+import cProfile
+import functools
+import inspect
+import json
+import os
+import pstats
+import re
+import threading
+import time
+import uuid
+
+from fastapi.routing import APIRoute
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PROFILING_ENABLED = os.getenv("EDUPULSE_PROFILING", "0") == "1"
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(BASE_DIR, "profiles"))
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "50"))  # file lama dihapus otomatis
+
+# Profiler thread pool milik request yang sedang diprofile (None = tidak diprofile)
+_thread_profiles = contextvars.ContextVar("thread_profiles", default=None)
+_lock = threading.Lock()
+_active = [False]  # cProfile tidak bisa dipasang 2x di thread yang sama -> 1 profile sekaligus
+
+def _profile_in_thread(endpoint):
+    # Endpoint "def" jalan di thread pool, cProfile hanya melihat thread tempat
+    # ia di-enable -> profiler terpisah di thread itu, digabung saat request selesai
+    @functools.wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        profiles = _thread_profiles.get()
+        if profiles is None:
+            return endpoint(*args, **kwargs)
+        prof = cProfile.Profile()
+        try:
+            return prof.runcall(endpoint, *args, **kwargs)
+        finally:
+            with _lock: profiles.append(prof)
+    return wrapper
+
+class ProfiledRoute(APIRoute):
+    """route_class FastAPI: endpoint sync dibungkus supaya bisa ikut diprofile."""
+    def __init__(self, path, endpoint, **kwargs):
+        if not inspect.iscoroutinefunction(endpoint):
+            endpoint = _profile_in_thread(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+def _wants_profile(scope):
+    for name, value in scope["headers"]:
+        if name == b"x-profile" and value in (b"1", b"true"):
+            return True
+    qs = scope.get("query_string", b"")
+    return b"profile=" in qs and re.search(rb"(^|&)profile=(1|true)(&|$)", qs) is not None
+
+def _bearer_token(scope):
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            return token.strip() if scheme.lower() == "bearer" else None
+    return None
+
+def _prune(directory, keep):
+    files = sorted((f for f in os.listdir(directory) if f.endswith(".prof")), reverse=True)
+    for old in files[keep:]:
+        for path in (old, old[:-5] + ".json"):
+            try: os.remove(os.path.join(directory, path))
+            except OSError: pass
+
+def new_profile_id(method):
+    # Urut waktu supaya listing & pruning cukup sort nama file
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{method}-{uuid.uuid4().hex[:8]}"
+
+def save_profile(profile_id, profiles, meta, directory=PROFILE_DIR, keep=PROFILE_KEEP):
+    os.makedirs(directory, exist_ok=True)
+    stats = pstats.Stats(profiles[0])
+    for prof in profiles[1:]:
+        stats.add(prof)
+    stats.dump_stats(os.path.join(directory, profile_id + ".prof"))
+    with open(os.path.join(directory, profile_id + ".json"), "w") as f:
+        json.dump(dict(meta, id=profile_id), f)
+    _prune(directory, keep)
+
+def list_profiles(directory=PROFILE_DIR, limit=50):
+    if not os.path.isdir(directory): return []
+    result = []
+    for name in sorted((f for f in os.listdir(directory) if f.endswith(".json")), reverse=True)[:limit]:
+        try:
+            with open(os.path.join(directory, name)) as f:
+                meta = json.load(f)
+            meta["size_bytes"] = os.path.getsize(os.path.join(directory, name[:-5] + ".prof"))
+            result.append(meta)
+        except (OSError, ValueError):
+            continue
+    return result
+
+def profile_path(profile_id, directory=PROFILE_DIR):
+    # id hanya boleh karakter nama file yang dibuat save_profile (cegah path traversal)
+    if not re.fullmatch(r"[A-Za-z0-9_\-]+", profile_id): return None
+    path = os.path.join(directory, profile_id + ".prof")
+    return path if os.path.isfile(path) else None
+
+async def _send_json(send, status, body):
+    await send({"type": "http.response.start", "status": status, "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]})
+    await send({"type": "http.response.body", "body": body})
+
+class ProfilerMiddleware:
+    """
+    Middleware ASGI. is_admin: async fn(token) -> bool, dipanggil hanya jika
+    request membawa flag profile. Flag dari non-admin ditolak 403.
+    """
+    def __init__(self, app, is_admin):
+        self.app = app
+        self.is_admin = is_admin
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _wants_profile(scope):
+            return await self.app(scope, receive, send)
+
+        token = _bearer_token(scope)
+        if not token or not await self.is_admin(token):
+            return await _send_json(send, 403, b'{"detail":"Profiling hanya untuk admin"}')
+        if _active[0]:
+            return await _send_json(send, 429, b'{"detail":"Profiler sedang dipakai request lain"}')
+        _active[0] = True
+
+        profile_id = new_profile_id(scope["method"])
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                # File baru ditulis setelah request selesai, lihat GET /api/admin/profiles
+                message = dict(message, headers=list(message.get("headers", [])) + [(b"x-profile-id", profile_id.encode())])
+            await send(message)
+
+        thread_profiles = []
+        ctx_token = _thread_profiles.set(thread_profiles)
+        loop_prof = cProfile.Profile()
+        t0 = time.perf_counter()
+        loop_prof.enable()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            loop_prof.disable()
+            elapsed = time.perf_counter() - t0
+            _thread_profiles.reset(ctx_token)
+            _active[0] = False
+            route = scope.get("route")
+            meta = {
+                "method": scope["method"],
+                "route": getattr(route, "path", None) or scope["path"],
+                "path": scope["path"],
+                "query": scope.get("query_string", b"").decode("latin-1"),
+                "status": status[0],
+                "duration_ms": round(elapsed * 1000, 2),
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            }
+            try:
+                save_profile(profile_id, [loop_prof] + thread_profiles, meta)
+                print(f"🔬 Profile disimpan: {profile_id} ({meta['duration_ms']} ms)")
+            except OSError as e:
+                print(f"⚠️ Profile gagal disimpan ({profile_id}): {e}")
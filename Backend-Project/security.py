@@ -0,0 +1,53 @@
+# security.py
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from passlib.context import CryptContext
+
+from metrics import phase
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# Password default mahasiswa (dipakai saat seeding & reset oleh admin)
+DEFAULT_STUDENT_PASSWORD = "mhs123"
+
+# --- POOL BCRYPT (Hash/verify tidak jalan di event loop) ---
+# Library bcrypt melepas GIL selama hashing, jadi thread pool sudah bisa
+# memakai semua core. Jumlah job yang antri dibatasi: jika penuh, request
+# langsung ditolak (503) daripada menumpuk dan membuat semua login timeout.
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", str(os.cpu_count() or 2)))
+HASH_MAX_PENDING = int(os.getenv("HASH_MAX_PENDING", str(HASH_WORKERS * 16)))
+
+_executor = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="bcrypt")
+_lock = threading.Lock()
+_pending = 0
+hash_pool_stats = {"completed": 0, "rejected": 0}
+
+class HashPoolBusy(Exception):
+    """Antrian hashing penuh, client sebaiknya coba lagi sebentar."""
+
+async def _run_in_pool(fn, *args):
+    global _pending
+    with _lock:
+        if _pending >= HASH_MAX_PENDING:
+            hash_pool_stats["rejected"] += 1
+            raise HashPoolBusy()
+        _pending += 1
+    try:
+        with phase("bcrypt"):  # termasuk waktu antri di pool
+            return await asyncio.get_running_loop().run_in_executor(_executor, fn, *args)
+    finally:
+        with _lock:
+            _pending -= 1
+            hash_pool_stats["completed"] += 1
+
+async def verify_password(plain, hashed):
+    return await _run_in_pool(pwd_context.verify, plain, hashed)
+
+async def hash_password(plain):
+    return await _run_in_pool(pwd_context.hash, plain)
+
+def pending_hash_jobs():
+    return _pending
@@ -0,0 +1,62 @@
+# seed.py
+# Seeding akun admin & mahasiswa ke SQLite secara bulk.
+# Bisa dipanggil dari main.py saat startup, atau manual di luar web process:
+#   python seed.py [--unique-salts] [--workers N]
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from database import Base, engine, SessionLocal, UserDB
+from security import pwd_context, DEFAULT_STUDENT_PASSWORD
+
+def _hash_one(password):
+    return pwd_context.hash(password)
+
+def hash_passwords(password, n, unique_salts=False, workers=None):
+    """
+    Default: hash bcrypt sekali lalu dipakai semua akun baru (password sama).
+    unique_salts=True: salt beda per akun, dihitung paralel di process pool.
+    """
+    if n == 0: return []
+    if not unique_salts:
+        return [pwd_context.hash(password)] * n
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_hash_one, [password] * n, chunksize=16))
+
+def seed_users(user_df, unique_salts=False, workers=None):
+    db = SessionLocal()
+    try:
+        # 1 query untuk semua username yang sudah ada, selisihnya dihitung di memori
+        existing = {u for (u,) in db.query(UserDB.username).all()}
+        rows = []
+        if "admin" not in existing:
+            rows.append({"username": "admin", "hashed_password": pwd_context.hash("admin123"), "role": "admin", "full_name": "Administrator"})
+
+        new_ids = []
+        if not user_df.empty:
+            new_ids = sorted({str(int(uid)) for uid in user_df['userid'].dropna()} - existing, key=int)
+        hashes = hash_passwords(DEFAULT_STUDENT_PASSWORD, len(new_ids), unique_salts, workers)
+        for uid, hashed in zip(new_ids, hashes):
+            rows.append({"username": uid, "hashed_password": hashed, "role": "student", "full_name": f"Mahasiswa {uid}", "learning_style": "Visual", "interest": "Computer Science"})
+
+        # 1 bulk insert dalam 1 transaksi
+        if rows:
+            db.bulk_insert_mappings(UserDB, rows)
+            db.commit()
+        return len(rows)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    from snapshot import DATA_DIR, load_table
+
+    workers = None
+    if "--workers" in sys.argv:
+        workers = int(sys.argv[sys.argv.index("--workers") + 1])
+
+    Base.metadata.create_all(bind=engine)
+    t0 = time.time()
+    user_df = load_table("users", DATA_DIR)
+    added = seed_users(user_df, unique_salts="--unique-salts" in sys.argv, workers=workers)
+    print(f"✅ Seeding selesai: {added} akun baru ({time.time() - t0:.1f}s)")
@@ -0,0 +1,269 @@
+# snapshot.py
+# Snapshot kolom (.npy) dari CSV hasil cleaning, supaya startup tidak perlu
+# parsing ulang CSV ratusan MB. Kolom angka di-load pakai mmap (halaman memori
+# dibagi antar worker lewat page cache OS), kolom teks disimpan sebagai
+# kode integer + daftar kategori.
+#
+# Build manual: python snapshot.py [--force]
+# Snapshot juga bisa dibangun langsung dari export xlsx Moodle: python ingest.py
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# EDUPULSE_DATA_DIR: pakai folder data lain (misal data sintetis dari gen_data.py)
+DATA_DIR = os.getenv("EDUPULSE_DATA_DIR", os.path.join(BASE_DIR, "data"))
+SNAPSHOT_VERSION = 1
+
+# --- TIPE KOLOM RINGKAS ---
+# ID muat di int32, nilai cukup float32, dan nama kelas/kuis yang berulang di
+# tiap baris disimpan sebagai Categorical (kode int + daftar nama, urut abjad)
+ID_COLUMNS = ("courseid", "userid", "quizid")
+GRADE_COLUMNS = ("final_quiz_grade", "raw_quiz_score", "max_quiz_score")
+CATEGORY_COLUMNS = ("courseshortname", "coursefullname", "quizname")
+INT32 = np.iinfo(np.int32)
+
+def compact_dtypes(df):
+    for col in ID_COLUMNS:
+        # Kolom dengan NaN (float) atau nilai di luar int32 dibiarkan
+        if col in df.columns and df[col].dtype.kind in "iu" and len(df) and INT32.min <= df[col].min() and df[col].max() <= INT32.max:
+            df[col] = df[col].astype(np.int32)
+    for col in GRADE_COLUMNS:
+        if col in df.columns and df[col].dtype.kind == "f":
+            df[col] = df[col].astype(np.float32)
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    return df
+
+# --- READER CSV (Dipakai saat build snapshot & fallback) ---
+def clean_decimal(val):
+    if pd.isna(val): return np.nan
+    val_str = str(val).strip().replace(',', '.')
+    try: return float(val_str)
+    except: return np.nan
+
+def parse_decimal(values):
+    """Versi vektor clean_decimal untuk 1 kolom teks: "75,5" -> 75.5, gagal -> NaN."""
+    text = values.str.replace(',', '.', regex=False)
+    try:
+        # Jalur cepat: semua teks valid (aturannya sama dengan float(), spasi di tepi diabaikan)
+        return text.astype(float)
+    except ValueError:
+        pass
+    # Ada teks rusak ("-", "abc") -> NaN. Sisa yang gagal to_numeric tapi valid
+    # untuk float() (misal "1_000") dicek satu per satu
+    parsed = pd.to_numeric(text, errors='coerce')
+    rest = parsed.isna() & text.notna()
+    if rest.any(): parsed[rest] = text[rest].map(clean_decimal)
+    return parsed
+
+def read_users_csv(path):
+    return compact_dtypes(pd.read_csv(path))
+
+def read_scores_csv(path):
+    df = pd.read_csv(path, dtype={'final_quiz_grade': str})
+    df['final_quiz_grade'] = parse_decimal(df['final_quiz_grade'])
+    df['courseshortname'] = df['courseshortname'].astype(str).str.strip()
+    return compact_dtypes(df)
+
+# nama tabel -> (file CSV sumber, fungsi reader)
+TABLES = {
+    "users": ("user_level_features_final_for_ML.csv", read_users_csv),
+    "scores": ("merged_score_data_cleaned.csv", read_scores_csv),
+}
+# Catatan: log aktivitas tidak disnapshot per baris, tapi diagregasi jadi
+# histogram jam per user oleh activity.py
+
+# --- CEK FRESHNESS (mtime/size, fallback ke hash isi file) ---
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def source_stat(path):
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+def table_dir(name, data_dir=DATA_DIR):
+    return os.path.join(data_dir, "snapshot", name)
+
+def read_meta(name, data_dir=DATA_DIR):
+    try:
+        with open(os.path.join(table_dir(name, data_dir), "meta.json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def write_meta(name, meta, data_dir=DATA_DIR):
+    # Tulis ke file sementara lalu rename, reader tidak pernah lihat meta setengah jadi
+    path = os.path.join(table_dir(name, data_dir), "meta.json")
+    with open(path + ".tmp", "w") as f:
+        json.dump(meta, f, default=str)
+    os.replace(path + ".tmp", path)
+
+def source_meta(src_path):
+    return {**source_stat(src_path), "sha256": file_sha256(src_path)}
+
+def is_fresh(name, data_dir=DATA_DIR, src=None):
+    meta = read_meta(name, data_dir)
+    if not meta or meta.get("version") != SNAPSHOT_VERSION: return False
+    # Snapshot hasil ingest.py (dari xlsx) tidak punya CSV sumber, dipakai sampai --force
+    if meta.get("origin") == "ingest": return True
+    src = src or os.path.join(data_dir, TABLES[name][0])
+    if not os.path.exists(src): return False
+    stat = source_stat(src)
+    if stat["size"] != meta["source"]["size"]: return False
+    if stat["mtime_ns"] == meta["source"]["mtime_ns"]: return True
+    # mtime berubah (misal habis git checkout) tapi isi bisa saja sama
+    if file_sha256(src) != meta["source"]["sha256"]: return False
+    # Simpan mtime baru supaya boot berikutnya tidak perlu hash ulang
+    meta["source"]["mtime_ns"] = stat["mtime_ns"]
+    try:
+        write_meta(name, meta, data_dir)
+    except OSError:
+        pass
+    return True
+
+# --- TULIS & BACA SNAPSHOT ---
+def new_table_dir(name, data_dir=DATA_DIR):
+    tmp_dir = f"{table_dir(name, data_dir)}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    return tmp_dir
+
+def commit_table_dir(name, tmp_dir, meta, data_dir=DATA_DIR):
+    with open(os.path.join(tmp_dir, "meta.json"), "w") as f:
+        json.dump(meta, f, default=str)
+
+    # Ganti snapshot lama secara atomik per tabel
+    final_dir = table_dir(name, data_dir)
+    old_dir = f"{final_dir}.old-{os.getpid()}"
+    if os.path.exists(final_dir):
+        os.rename(final_dir, old_dir)
+    os.rename(tmp_dir, final_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+def write_columns(directory, df):
+    """Simpan tiap kolom df ke <i>.npy di directory. Hasil: list meta kolom."""
+    columns = []
+    for i, col in enumerate(df.columns):
+        values = df[col]
+        fname = f"{i}.npy"
+        if values.dtype.kind in "biufM":
+            np.save(os.path.join(directory, fname), values.to_numpy())
+            columns.append({"name": col, "kind": "num", "file": fname})
+        else:
+            # Kolom teks -> kode int32 (NaN = -1) + daftar kategori (urut abjad)
+            codes, cats = pd.factorize(values, sort=True)
+            np.save(os.path.join(directory, fname), codes.astype(np.int32))
+            columns.append({"name": col, "kind": "cat", "file": fname, "categories": cats.tolist()})
+    return columns
+
+def write_table(name, df, src_path, data_dir=DATA_DIR):
+    tmp_dir = new_table_dir(name, data_dir)
+    meta = {
+        "version": SNAPSHOT_VERSION,
+        "rows": len(df),
+        "columns": write_columns(tmp_dir, df),
+        "source": source_meta(src_path),
+    }
+    commit_table_dir(name, tmp_dir, meta, data_dir)
+
+# --- SEGMENT APPEND (ingest.py --append) ---
+# Baris baru ditulis sebagai segmen terpisah ("0.npy" -> "0.1.npy", "0.2.npy", ...)
+# dan didaftarkan di meta["segments"]; file lama tidak pernah ditulis ulang.
+# Baris lama yang diganti export baru (upsert) hanya dicatat posisinya di meta["dropped"].
+def segment_file(fname, seg):
+    base, ext = os.path.splitext(fname)
+    return f"{base}.{seg}{ext}"
+
+def load_segments(tdir, fname, segments):
+    arrays = [np.load(os.path.join(tdir, fname), mmap_mode="r")]
+    arrays += [np.load(os.path.join(tdir, segment_file(fname, seg)), mmap_mode="r") for seg in segments]
+    return arrays[0] if len(arrays) == 1 else np.concatenate(arrays)
+
+def read_columns(directory, columns, segments=(), dropped=()):
+    data = {}
+    hidden = np.concatenate([np.load(os.path.join(directory, f)) for f in dropped]) if dropped else None
+    for col in columns:
+        arr = load_segments(directory, col["file"], segments)
+        if hidden is not None: arr = np.delete(arr, hidden)
+        if col["kind"] == "num":
+            data[col["name"]] = arr
+            continue
+        cats = pd.Index(col["categories"])
+        values = pd.Categorical.from_codes(arr, cats)
+        if col["name"] not in CATEGORY_COLUMNS:
+            data[col["name"]] = values.astype(object)
+        elif cats.is_monotonic_increasing:
+            data[col["name"]] = values
+        else:
+            # Snapshot lama / segmen append: kategori diurutkan supaya groupby & sort tetap urut nama
+            data[col["name"]] = values.reorder_categories(cats.sort_values())
+    return pd.DataFrame(data, copy=False)
+
+def read_table(name, data_dir=DATA_DIR, columns=None):
+    # columns: hanya baca sebagian kolom (None = semua)
+    meta = read_meta(name, data_dir)
+    cols = [c for c in meta["columns"] if columns is None or c["name"] in columns]
+    return read_columns(table_dir(name, data_dir), cols, meta.get("segments", []), meta.get("dropped", []))
+
+def load_table(name, data_dir=DATA_DIR):
+    """
+    Load tabel dari snapshot jika masih fresh, kalau tidak baca CSV
+    lalu coba tulis ulang snapshot untuk boot berikutnya.
+    """
+    if is_fresh(name, data_dir):
+        return read_table(name, data_dir)
+
+    src_file, reader = TABLES[name]
+    src = os.path.join(data_dir, src_file)
+    df = reader(src)
+    try:
+        write_table(name, df, src, data_dir)
+    except OSError as e:
+        # Misal filesystem read-only, tetap jalan pakai hasil CSV
+        print(f"⚠️ Snapshot {name} tidak bisa ditulis: {e}")
+    return df
+
+def build_snapshot(data_dir=DATA_DIR, force=False):
+    ok = True
+    for name, (src_file, reader) in TABLES.items():
+        if not force and is_fresh(name, data_dir):
+            print(f"✅ {name}: snapshot masih fresh")
+            continue
+        t0 = time.time()
+        try:
+            src = os.path.join(data_dir, src_file)
+            df = reader(src)
+            write_table(name, df, src, data_dir)
+            print(f"✅ {name}: {len(df)} baris ({time.time() - t0:.1f}s)")
+        except Exception as e:
+            ok = False
+            print(f"❌ {name}: {e}")
+
+    # Histogram aktivitas dari log (lihat activity.py)
+    from activity import TABLE_NAME, LOGS_FILE, build_activity
+    if not force and is_fresh(TABLE_NAME, data_dir, src=os.path.join(data_dir, LOGS_FILE)):
+        print(f"✅ {TABLE_NAME}: snapshot masih fresh")
+    else:
+        t0 = time.time()
+        try:
+            table = build_activity(data_dir)
+            print(f"✅ {TABLE_NAME}: {len(table)} user ({time.time() - t0:.1f}s)")
+        except Exception as e:
+            ok = False
+            print(f"❌ {TABLE_NAME}: {e}")
+    return ok
+
+if __name__ == "__main__":
+    sys.exit(0 if build_snapshot(force="--force" in sys.argv) else 1)
@@ -28,8 +28,16 @@ const ChatBot: React.FC<ChatBotProps> = ({ user }) => {
     setMessages(prev => [...prev, { sender: 'user', text: userMessage }]);
     setLoading(true);
 
+    // Tambah bubble bot kosong, lalu isi per potongan teks dari stream (SSE)
+    const appendToBot = (delta: string) => {
+      setMessages(prev => {
+        const last = prev[prev.length - 1];
+        return [...prev.slice(0, -1), { ...last, text: last.text + delta }];
+      });
+    };
+
     try {
-      const res = await fetch('https://riodino14-edupulse-backend.hf.space/api/chat', {
+      const res = await fetch('https://riodino14-edupulse-backend.hf.space/api/chat/stream', {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({
@@ -38,9 +46,28 @@ const ChatBot: React.FC<ChatBotProps> = ({ user }) => {
           learning_style: user.learning_style || "Visual"
         })
       });
+      if (!res.ok || !res.body) throw new Error(`HTTP ${res.status}`);
+
+      setMessages(prev => [...prev, { sender: 'bot', text: "" }]);
+      setLoading(false);
 
-      const data = await res.json();
-      setMessages(prev => [...prev, { sender: 'bot', text: data.reply }]);
+      const reader = res.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = "";
+      while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        // Event SSE dipisah baris kosong: "data: {...}\n\n"
+        const events = buffer.split("\n\n");
+        buffer = events.pop() || "";
+        for (const evt of events) {
+          if (!evt.startsWith("data: ")) continue;
+          const payload = JSON.parse(evt.slice(6));
+          if (payload.delta) appendToBot(payload.delta);
+          if (payload.error) appendToBot(payload.error);
+        }
+      }
     } catch (error) {
       setMessages(prev => [...prev, { sender: 'bot', text: "Maaf, koneksi server terputus." }]);
     } finally {